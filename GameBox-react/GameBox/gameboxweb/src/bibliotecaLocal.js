@@ -0,0 +1,54 @@
+// Cópia local da biblioteca do usuário (localStorage), mantida em dia por
+// /api/biblioteca/sync: ao voltar para a página só vem o que mudou desde a
+// última visita, em vez da biblioteca inteira.
+const CHAVE = 'gamebox:biblioteca';
+
+function lerCopia() {
+    try {
+        return JSON.parse(localStorage.getItem(CHAVE));
+    } catch {
+        return null;
+    }
+}
+
+// URL de /api/biblioteca/sync com o cursor da cópia guardada (se houver)
+export function urlSincronizacao() {
+    const copia = lerCopia();
+    return copia?.cursor
+        ? `/api/biblioteca/sync?since=${encodeURIComponent(copia.cursor)}`
+        : '/api/biblioteca/sync';
+}
+
+// Junta a resposta de urlSincronizacao() à cópia guardada e devolve a
+// biblioteca em ordem de adição (como /api/biblioteca)
+export function aplicarSincronizacao(data) {
+    const copia = lerCopia();
+    // Com completo=true o servidor mandou tudo: a cópia antiga é descartada
+    const jogos = new Map(data.completo || !copia ? [] : copia.jogos.map((jogo) => [jogo.id, jogo]));
+    data.removidos.forEach((id) => jogos.delete(id));
+    data.jogos.forEach((jogo) => jogos.set(jogo.id, jogo));
+    const lista = [...jogos.values()].sort((a, b) => (a.data_adicao < b.data_adicao ? -1 : a.data_adicao > b.data_adicao ? 1 : 0));
+
+    try {
+        localStorage.setItem(CHAVE, JSON.stringify({ cursor: data.cursor, jogos: lista }));
+    } catch {
+        // Sem espaço no localStorage: na próxima vez vem a biblioteca inteira
+    }
+    return lista;
+}
+
+// Devolve a biblioteca atualizada
+export async function carregarBiblioteca() {
+    const response = await fetch(urlSincronizacao(), { credentials: 'include' });
+    const data = await response.json();
+
+    if (!response.ok) {
+        throw new Error(data.erro || 'Falha ao carregar a biblioteca. Talvez você precise fazer login.');
+    }
+    return aplicarSincronizacao(data);
+}
+
+// Chamado no logout: a cópia é de quem estava logado
+export function esquecerBiblioteca() {
+    localStorage.removeItem(CHAVE);
+}
@@ -33,9 +33,9 @@ function Body() {// Estado local que armazena a lista de jogos retornada pela AP
         <div className="grid-jogos">
           {jogos.map((jogo) => (
             <div key={jogo.id} className="card-jogo">
-              {/* Exibe a capa do jogo; se não houver imagem, usa uma padrão */}
+              {/* Exibe a miniatura local da capa (capa_url); se não houver imagem, usa uma padrão */}
               <img
-                src={jogo.image_url || '/../img/default.png'}
+                src={jogo.capa_url || jogo.image_url || '/../img/default.png'}
                 alt={jogo.nome_jogo}
               />
               {/* Informações básicas do jogo para o card */}
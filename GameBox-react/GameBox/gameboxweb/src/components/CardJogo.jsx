@@ -1,7 +1,7 @@
 function CardJogo({ jogo }) {
   return (
     <div className="CardJogo">
-      <img src={jogo.image_url} alt={jogo.nome_jogo} className="CardImage" />
+      <img src={jogo.capa_url || jogo.image_url} alt={jogo.nome_jogo} loading="lazy" className="CardImage" />
       <div className="CardInfo">
         <h3 className="CardTitle">{jogo.nome_jogo}</h3>
         <p className="CardPlatform">{jogo.plataforma}</p>
@@ -2,6 +2,7 @@ import { useState } from 'react';
 import { useNavigate } from 'react-router-dom';
 import '../styles/Header.css'; // Certifique-se de que o caminho está correto
 import logo from '../img/logo.png';
+import { esquecerBiblioteca } from '../bibliotecaLocal';
 
 function Header() {
   const navigate = useNavigate();
@@ -31,6 +32,7 @@ function Header() {
     } finally {
       // Limpa o estado local e redireciona para a página inicial
       localStorage.removeItem('user');
+      esquecerBiblioteca(); // A cópia local da biblioteca é do usuário que saiu
       navigate('/'); // Redireciona para a home após o logout
       window.location.reload(); // Recarrega para atualizar o estado do componente
     }
@@ -1,4 +1,5 @@
 import React, { useState, useEffect } from 'react';
+import { carregarBiblioteca } from '../bibliotecaLocal';
 
 // Componente responsável por exibir a biblioteca pessoal do usuário.
 // Ele busca os jogos adicionados à biblioteca e os exibe de forma simples na tela.
@@ -11,14 +12,9 @@ function MyLibraryPage() {
         setLoading(true);
         setError(null);
         try {
-            // Chamada à API protegida: o backend requer que o usuário esteja logado
-            const response = await fetch('/api/biblioteca'); 
-            const data = await response.json();
-
-            if (!response.ok) {
-                // Se a resposta do backend indicar erro (ex: 401 Unauthorized), lança exceção
-                throw new Error(data.erro || 'Falha ao carregar a biblioteca. Talvez você precise fazer login.');
-            }
+            // Chamada à API protegida: o backend requer que o usuário esteja logado.
+            // Só baixa o que mudou desde a última visita (ver bibliotecaLocal.js)
+            const data = await carregarBiblioteca();
 
             setLibrary(data);// Atualiza o estado local com os jogos retornados
         } catch (err) {
@@ -53,7 +49,7 @@ function MyLibraryPage() {
             {/* Mapeia cada jogo retornado e o exibe com suas informações básicas */}
             {library.map(game => (
                 <div key={game.id} style={{ border: '1px solid #ccc', margin: '10px', padding: '10px' }}>
-                    <img src={game.image_url} alt={game.nome_jogo} style={{ width: '100px' }} />
+                    <img src={game.capa_url || game.image_url} alt={game.nome_jogo} loading="lazy" style={{ width: '100px' }} />
                     <h2>{game.nome_jogo}</h2>
                     <p>Status: <strong>{game.status}</strong></p>
                     <p>Lançamento: {game.ano_lancamento}</p>
@@ -1,5 +1,6 @@
 import { useState, useEffect } from 'react';
 import '../styles/UserProfile.css';
+import { aplicarSincronizacao, urlSincronizacao } from '../bibliotecaLocal';
 
 // Componente responsável por exibir o perfil do usuário logado.
 // Mostra informações básicas (nickname e email) e também a lista de jogos da biblioteca.
@@ -11,40 +12,35 @@ function UserProfile() {
 
     // useEffect roda ao montar o componente — responsável por buscar os dados iniciais
     useEffect(() => {
-        const fetchUserProfile = fetch('/api/user_profile', {// --- Requisição 1: Buscar informações do perfil ---
-            method: 'GET',
+        // Perfil e biblioteca (só o que mudou desde a última visita) numa
+        // requisição só, pelo lote de leituras do backend
+        fetch('/api/batch', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
             credentials: 'include',// Inclui cookies de sessão, se houver
+            body: JSON.stringify({ requisicoes: ['/api/user_profile', urlSincronizacao()] }),
         })
             .then((response) => {
                 if (!response.ok) {
-                    throw new Error('Usuário não autenticado ou erro ao buscar dados');
+                    throw new Error('Erro ao buscar dados do perfil');
                 }
                 return response.json();
             })
-            .then((data) => {
-                setUserData(data);
-            });
+            .then(({ respostas: [perfil, biblioteca] }) => {
+                if (perfil.status !== 200) {
+                    throw new Error('Usuário não autenticado ou erro ao buscar dados');
+                }
+                setUserData(perfil.corpo);
 
-        // Função para buscar a biblioteca do usuário
-        const fetchUserLibrary = fetch('/api/biblioteca', {
-            method: 'GET',
-            credentials: 'include',
-        })
-            .then((response) => {
-                if (!response.ok) {
-                    // A falha na biblioteca não impede o carregamento do perfil
-                    console.error("Erro ao buscar biblioteca:", response.statusText);
-                    return [];
+                // A falha na biblioteca não impede o carregamento do perfil
+                if (biblioteca.status === 200) {
+                    setLibrary(aplicarSincronizacao(biblioteca.corpo));
+                } else {
+                    console.error("Erro ao buscar biblioteca:", biblioteca.corpo?.erro);
+                    setLibrary([]);
                 }
-                return response.json();
+                setLoading(false);
             })
-            .then((data) => {
-                setLibrary(data);
-            });
-
-        // Executa ambas as requisições em paralelo e trata resultados
-        Promise.all([fetchUserProfile, fetchUserLibrary])
-            .then(() => setLoading(false))
             .catch((err) => {
                 setError(err.message);
                 setLoading(false);
@@ -107,7 +103,7 @@ function UserProfile() {
                         {library.length > 0 ? (
                             library.map((game) => (
                                 <div key={game.id} className="game-card">
-                                    <img src={game.image_url || '/path/to/default/image.png'} alt={game.nome_jogo} className="game-image" />
+                                    <img src={game.capa_url || game.image_url || '/path/to/default/image.png'} alt={game.nome_jogo} loading="lazy" className="game-image" />
                                     <div className="game-details">
                                         <h3>{game.nome_jogo}</h3>
                                         <p>Status: {game.status}</p>
@@ -13,6 +13,13 @@ Aenean nec mi nec augue vestibulum ornare. Phasellus augue sapien, convallis et
 Duis ut cursus ligula. Vestibulum faucibus pretium commodo. Morbi arcu est, lacinia at scelerisque eget, lacinia et nisl. Morbi sit amet ante eget leo finibus tincidunt vitae sit amet orci. Aliquam vel tellus ac mi fringilla ultricies. Aenean placerat ultrices leo, tempus venenatis urna sodales et. Nunc pellentesque vitae arcu non iaculis. Fusce tincidunt risus sed purus rhoncus, fringilla vehicula urna fermentum. Aliquam venenatis dui eget purus tristique, at ultrices tortor imperdiet.
 `.trim();
 
+// Miniatura grande da capa: capa_url pode já trazer ?v=<versão>
+function capaGrande(capaUrl) {
+  const url = new URL(capaUrl, window.location.origin);
+  url.searchParams.set('tamanho', 'grande');
+  return url.pathname + url.search;
+}
+
 function PagJogo() {
   const { id } = useParams();// useParams() captura o ID do jogo a partir da URL
   const [gameData, setGameData] = useState(null);// Dados do jogo
@@ -80,7 +87,7 @@ function PagJogo() {
           {/* Imagem principal e lista de plataformas */}
           <div className="ImageAndPlatforms">
             <img
-              src={gameData.image_url || personaCapa}
+              src={(gameData.capa_url && capaGrande(gameData.capa_url)) || gameData.image_url || personaCapa}
               alt={gameData.nome_jogo}
               className="GameCover"
             />
@@ -0,0 +1,2 @@
+# Benchmarks do backend. Rode a partir de gamebox-flask/gamebox, ex.:
+#   python -m benchmarks.busca --jogos 100000
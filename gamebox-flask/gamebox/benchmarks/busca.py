@@ -0,0 +1,84 @@
+# benchmarks/busca.py
+# Compara a pesquisa antiga (ILIKE '%termo%' sem limite) com o índice FTS5 e o
+# autocomplete em memória, num banco SQLite temporário com N jogos sintéticos.
+import argparse
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import insert
+
+import busca
+from db import db
+from main import create_app
+from models import Jogos
+
+PALAVRAS = [
+    "Dark", "Souls", "Hollow", "Knight", "Legend", "Zelda", "Witcher", "Red",
+    "Dead", "Redemption", "God", "War", "Persona", "Final", "Fantasy", "Super",
+    "Mario", "Metroid", "Celeste", "Hades", "Elden", "Ring", "Star", "Space",
+]
+PLATAFORMAS = ["PC", "PlayStation 4", "PlayStation 5", "Xbox One", "Switch"]
+
+
+def popular(n, semente=42):
+    rnd = random.Random(semente)
+    linhas = [
+        {
+            "nome_jogo": " ".join(rnd.sample(PALAVRAS, 3)) + f" {i}",
+            "ano_lancamento": rnd.randint(1985, 2025),
+            "plataforma": rnd.choice(PLATAFORMAS),
+            "avaliacao_media": round(rnd.uniform(1, 10), 1),
+        }
+        for i in range(n)
+    ]
+    busca.usa_fts()  # cria tabela e triggers antes da carga
+    for i in range(0, n, 10000):
+        db.session.execute(insert(Jogos), linhas[i : i + 10000])
+    db.session.commit()
+
+
+def medir(funcao, termos, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        for termo in termos:
+            inicio = time.perf_counter()
+            funcao(termo)
+            tempos.append((time.perf_counter() - inicio) * 1000)
+    tempos.sort()
+    return statistics.median(tempos), tempos[int(len(tempos) * 0.95) - 1]
+
+
+def ilike_antigo(termo):
+    return Jogos.query.filter(Jogos.nome_jogo.ilike(f"%{termo}%")).all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da pesquisa de jogos")
+    parser.add_argument("--jogos", type=int, default=100000)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{pasta}/bench.db"})
+        with app.app_context():
+            db.create_all()
+            popular(args.jogos)
+
+            termos = ["Knight", "Zelda", "Souls Hollow", "Redemption", "ring"]
+            prefixos = ["Da", "Hollow K", "Sup", "Z", "Elden Ring"]
+            busca.autocomplete("aquecimento")  # carrega o índice de prefixos
+
+            print(f"{args.jogos} jogos — mediana / p95 em ms")
+            for nome, funcao, entradas in [
+                ("ILIKE (antigo)", ilike_antigo, termos),
+                ("FTS5 ranqueado", busca.pesquisar, termos),
+                ("autocomplete", busca.autocomplete, prefixos),
+            ]:
+                mediana, p95 = medir(funcao, entradas, args.repeticoes)
+                print(f"  {nome:<16} {mediana:9.3f} {p95:9.3f}")
+
+
+if __name__ == "__main__":
+    main()
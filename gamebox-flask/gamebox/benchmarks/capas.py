@@ -0,0 +1,116 @@
+# benchmarks/capas.py
+# Cache de capas contra uma origem HTTP local (stub no lugar da Wikipedia):
+# tempo para baixar e gerar as miniaturas de N capas com 1 e com W threads,
+# tamanho médio do original vs. das miniaturas e latência de
+# GET /api/jogos/<id>/capa com e sem If-None-Match (304). Precisa do Pillow.
+#   python -m benchmarks.capas --capas 200 --workers 4
+import argparse
+import functools
+import os
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import capas
+from db import db
+from main import create_app
+from models import CapaJogo, Jogos
+
+
+class _Origem(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def criar_imagens(pasta, quantidade, largura, altura):
+    Image = capas._pillow()[0]
+    bytes_total = 0
+    for i in range(quantidade):
+        # Gradiente com ruído: comprime como uma foto, não como uma cor sólida
+        imagem = Image.linear_gradient("L").resize((largura, altura)).convert("RGB")
+        imagem = Image.blend(imagem, Image.effect_noise((largura, altura), 64).convert("RGB"), 0.25)
+        caminho = os.path.join(pasta, f"capa{i}.jpg")
+        imagem.save(caminho, quality=90)
+        bytes_total += os.path.getsize(caminho)
+    return bytes_total / quantidade
+
+
+def medir_rota(cliente, ids, tamanho, repeticoes, condicional):
+    url = "/api/jogos/{}/capa?tamanho=" + tamanho
+    etags = {i: cliente.get(url.format(i)).headers["ETag"] for i in ids}
+    tempos, tamanhos = [], []
+    for n in range(repeticoes):
+        jogo_id = ids[n % len(ids)]
+        cabecalhos = {"If-None-Match": etags[jogo_id]} if condicional else {}
+        inicio = time.perf_counter()
+        corpo = cliente.get(url.format(jogo_id), headers=cabecalhos).get_data()
+        tempos.append(time.perf_counter() - inicio)
+        tamanhos.append(len(corpo))
+    return statistics.median(tempos) * 1000, statistics.mean(tamanhos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do cache de capas")
+    parser.add_argument("--capas", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--largura", type=int, default=600)
+    parser.add_argument("--altura", type=int, default=900)
+    parser.add_argument("--repeticoes", type=int, default=500)
+    args = parser.parse_args()
+    if capas._pillow()[0] is None:
+        raise SystemExit("Este benchmark precisa do Pillow (pip install pillow).")
+
+    with tempfile.TemporaryDirectory() as pasta:
+        origem = os.path.join(pasta, "origem")
+        os.makedirs(os.path.join(origem, "wiki"))
+        media_original = criar_imagens(
+            os.path.join(origem, "wiki"), args.capas, args.largura, args.altura
+        )
+        servidor = ThreadingHTTPServer(
+            ("127.0.0.1", 0), functools.partial(_Origem, directory=origem)
+        )
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+
+        app = create_app({
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{pasta}/bench.db",
+            "METRICAS_MODO": "desligado",
+            "CAPAS_DIRETORIO": os.path.join(pasta, "cache"),
+            "CAPAS_ORIGEM": f"http://127.0.0.1:{servidor.server_address[1]}",
+        })
+        with app.app_context():
+            db.create_all()
+            db.session.add_all(
+                Jogos(nome_jogo=f"Jogo {i}", image_url=f"https://upload.wikimedia.org/wiki/capa{i}.jpg")
+                for i in range(args.capas)
+            )
+            db.session.commit()
+
+            print(f"{args.capas} capas {args.largura}x{args.altura}, {os.cpu_count()} núcleo(s)")
+            for workers in sorted({1, args.workers}):
+                shutil.rmtree(app.config["CAPAS_DIRETORIO"], ignore_errors=True)
+                db.session.query(CapaJogo).delete()
+                db.session.commit()
+                r = capas.gerar_todas(workers=workers)
+                print(
+                    f"  gerar-capas, {workers} thread(s): {r['segundos']:6.2f} s "
+                    f"({r['baixadas'] / r['segundos']:6.1f} capas/s, {r['erros']} erros)"
+                )
+
+        cliente = app.test_client()
+        ids = list(range(1, min(args.capas, 50) + 1))
+        print(f"  original (origem remota){'':<13} {media_original / 1024:8.1f} KiB")
+        for tamanho, (largura, altura) in capas.TAMANHOS.items():
+            ms, media = medir_rota(cliente, ids, tamanho, args.repeticoes, condicional=False)
+            ms_304, _ = medir_rota(cliente, ids, tamanho, args.repeticoes, condicional=True)
+            print(
+                f"  miniatura {tamanho:<8} {largura}x{altura:<14} {media / 1024:8.1f} KiB"
+                f"   200: {ms:6.3f} ms   304: {ms_304:6.3f} ms"
+            )
+        servidor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# benchmarks/concorrencia.py
+# Leitores x escritor no SQLite: mede a latência de GET /api/jogos enquanto um
+# escritor mantém transações de escrita abertas, com journal_mode DELETE (o
+# padrão antigo) e WAL (o padrão configurado em config.py).
+#   python -m benchmarks.concorrencia --leitores 8 --segundos 3
+import argparse
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+from sqlalchemy import insert
+
+from db import db
+from main import create_app
+from models import Jogos
+
+
+def escritor(caminho, parar, segura_ms, contagem):
+    # Conexão crua em autocommit para controlar o BEGIN: cada transação segura
+    # o lock de escrita por `segura_ms`, como uma gravação longa faria.
+    conn = sqlite3.connect(caminho, isolation_level=None, timeout=30)
+    i = 0
+    while not parar.is_set():
+        conn.execute("BEGIN EXCLUSIVE")
+        conn.execute("INSERT INTO jogos (nome_jogo) VALUES (?)", (f"escrita {i}",))
+        time.sleep(segura_ms / 1000)
+        conn.execute("COMMIT")
+        contagem[0] += 1
+        i += 1
+        time.sleep(0.005)
+    conn.close()
+
+
+def leitor(app, parar, tempos, erros):
+    cliente = app.test_client()
+    while not parar.is_set():
+        inicio = time.perf_counter()
+        resposta = cliente.get("/api/jogos?limit=50")
+        tempos.append((time.perf_counter() - inicio) * 1000)
+        if resposta.status_code != 200:
+            erros[0] += 1
+
+
+def rodar(modo, leitores, segundos, segura_ms):
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = f"{pasta}/bench.db"
+        app = create_app(
+            {
+                "SQLALCHEMY_DATABASE_URI": f"sqlite:///{caminho}",
+                "SQLITE_JOURNAL_MODE": modo,
+                "CACHE_CATALOGO_MAX_ENTRADAS": 0,  # toda leitura vai ao banco
+            }
+        )
+        with app.app_context():
+            db.create_all()
+            db.session.execute(
+                insert(Jogos), [{"nome_jogo": f"Jogo {i}"} for i in range(5000)]
+            )
+            db.session.commit()
+
+        parar = threading.Event()
+        tempos, erros, escritas = [], [0], [0]
+        threads = [
+            threading.Thread(target=leitor, args=(app, parar, tempos, erros))
+            for _ in range(leitores)
+        ]
+        threads.append(
+            threading.Thread(target=escritor, args=(caminho, parar, segura_ms, escritas))
+        )
+        for t in threads:
+            t.start()
+        time.sleep(segundos)
+        parar.set()
+        for t in threads:
+            t.join()
+
+        with app.app_context():
+            db.engine.dispose()
+
+    tempos.sort()
+    return {
+        "leituras": len(tempos),
+        "escritas": escritas[0],
+        "erros": erros[0],
+        "p50": statistics.median(tempos),
+        "p99": tempos[int(len(tempos) * 0.99) - 1],
+        "max": tempos[-1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Leitores x escritor no SQLite")
+    parser.add_argument("--leitores", type=int, default=4)
+    parser.add_argument("--segundos", type=float, default=3.0)
+    parser.add_argument("--segura-ms", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{args.leitores} leitores, escritor segurando o lock {args.segura_ms} ms — ms")
+    for modo in ("DELETE", "WAL"):
+        r = rodar(modo, args.leitores, args.segundos, args.segura_ms)
+        print(
+            f"  {modo:<7} leituras={r['leituras']:<6} escritas={r['escritas']:<4} "
+            f"erros={r['erros']:<3} p50={r['p50']:8.2f} p99={r['p99']:8.2f} max={r['max']:8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,367 @@
+# benchmarks/endpoints.py
+# Roda todas as rotas /api/* pelo test client do Flask sobre um banco gerado
+# por gerar_dados.py e mede, por rota: latência (p50/p90/p99), vazão, número
+# de queries SQL por requisição e pico de memória (tracemalloc). O resultado
+# vai para um JSON que serve de baseline para comparações futuras:
+#   python -m benchmarks.endpoints --escala pequena --saida baseline.json
+#   python -m benchmarks.endpoints --escala pequena --comparar baseline.json
+import argparse
+import base64
+import itertools
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy import event, select
+
+import capas
+import gerar_dados
+import recomendacoes
+from db import criar_indices, db
+from main import create_app
+from models import Biblioteca, Jogos, Usuario
+
+# Capa PNG 1x1 servida pela pasta local (CAPAS_DIRETORIO_LOCAL), sem rede
+CAPA_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAIAAACQd1PeAAAADElEQVR4nGOIsukBAAIWASOcw9lzAAAAAElFTkSuQmCC"
+)
+JOGOS_COM_CAPA = 100
+
+# Tolerâncias para acusar regressão em relação à baseline
+TOLERANCIA_LATENCIA = 1.25  # p50 até 25% mais lento
+TOLERANCIA_QUERIES = 0  # nenhuma query a mais por requisição
+
+
+class Cenario:
+    """Uma rota a medir. `requisicao(i)` devolve (método, url, corpo_json)."""
+
+    def __init__(self, nome, rota, requisicao, logado=True, antes=None):
+        self.nome = nome
+        self.rota = rota  # regra do url_map coberta por este cenário
+        self.requisicao = requisicao
+        self.logado = logado
+        self.antes = antes  # antes(cliente): preparo fora da medição
+
+
+def cenarios(ctx):
+    jogos = ctx["jogos"]
+    livres = ctx["jogos_fora_da_biblioteca"]
+    na_biblioteca = ctx["jogos_na_biblioteca"]
+    ciclo = lambda lista: (lambda i: lista[i % len(lista)])  # noqa: E731
+    livre, presente = ciclo(livres), ciclo(na_biblioteca)
+
+    def cursor_sync(cliente):
+        # Cliente que já tem a biblioteca guardada: sincroniza a partir daqui
+        if "cursor_sync" not in ctx:
+            ctx["cursor_sync"] = cliente.get("/api/biblioteca/sync?fields=id").get_json()["cursor"]
+
+    return [
+        Cenario("home", "/api/home", lambda i: ("GET", "/api/home", None), logado=False),
+        Cenario("login", "/api/login", lambda i: ("POST", "/api/login", ctx["credenciais"]), logado=False),
+        Cenario(
+            "logout", "/api/logout", lambda i: ("POST", "/api/logout", None),
+            antes=lambda cliente: cliente.post("/api/login", json=ctx["credenciais"]),
+        ),
+        Cenario(
+            "registro", "/api/registro",
+            lambda i: ("POST", "/api/registro", {
+                "email": f"bench{i}@exemplo.com", "senha": "x", "username": f"bench{i}",
+            }),
+            logado=False,
+        ),
+        Cenario("user_profile", "/api/user_profile", lambda i: ("GET", "/api/user_profile", None)),
+        Cenario("user_profile_stats", "/api/user_profile/stats", lambda i: ("GET", "/api/user_profile/stats", None)),
+        Cenario(
+            "criar_jogo", "/api/jogos",
+            lambda i: ("POST", "/api/jogos", {"nome_jogo": f"Bench {time.time_ns()} {i}"}),
+            logado=False,
+        ),
+        Cenario(
+            "importar_jogos", "/api/jogos/importar",
+            lambda i: ("POST", "/api/jogos/importar?formato=jsonl&modo=inserir",
+                       "\n".join(json.dumps({"nome_jogo": f"Import {i} {n}"}) for n in range(100))),
+        ),
+        Cenario("listar_jogos", "/api/jogos", lambda i: ("GET", "/api/jogos", None), logado=False),
+        Cenario(
+            "listar_jogos_pagina", "/api/jogos",
+            lambda i: ("GET", f"/api/jogos?limit=50&ordem=-avaliacao_media&n={i % 20}", None),
+            logado=False,
+        ),
+        Cenario(
+            "catalogo", "/api/jogos/catalogo",
+            lambda i: ("GET", "/api/jogos/catalogo?limit=50&ordem=-avaliacao_media&plataforma="
+                       + ("PC", "Switch", "PC,Switch")[i % 3], None),
+            logado=False,
+        ),
+        Cenario("jogos_recentes", "/api/jogos/recentes", lambda i: ("GET", "/api/jogos/recentes", None), logado=False),
+        Cenario(
+            "jogos_populares", "/api/jogos/populares",
+            lambda i: ("GET", "/api/jogos/populares?limit=20", None),
+            logado=False,
+        ),
+        Cenario(
+            "pesquisa", "/api/jogos/pesquisa",
+            lambda i: ("GET", f"/api/jogos/pesquisa?q={gerar_dados.NUCLEOS[i % len(gerar_dados.NUCLEOS)]}", None),
+            logado=False,
+        ),
+        Cenario(
+            "autocomplete", "/api/jogos/pesquisa/autocomplete",
+            lambda i: ("GET", f"/api/jogos/pesquisa/autocomplete?q={gerar_dados.PREFIXOS[i % len(gerar_dados.PREFIXOS)][:3]}", None),
+            logado=False,
+        ),
+        Cenario(
+            "obter_jogo", "/api/jogos/<int:id>",
+            lambda i: ("GET", f"/api/jogos/{jogos[i % len(jogos)]}", None),
+            logado=False,
+        ),
+        Cenario(
+            "jogos_similares", "/api/jogos/<int:id>/similares",
+            lambda i: ("GET", f"/api/jogos/{jogos[i % len(jogos)]}/similares", None),
+            logado=False,
+        ),
+        Cenario(
+            "capa", "/api/jogos/<int:id>/capa",
+            lambda i: ("GET", f"/api/jogos/{ctx['jogos_com_capa'][i % JOGOS_COM_CAPA]}/capa", None),
+            logado=False,
+        ),
+        Cenario("cache_estatisticas", "/api/cache/estatisticas", lambda i: ("GET", "/api/cache/estatisticas", None), logado=False),
+        Cenario("metricas", "/api/metrics", lambda i: ("GET", "/api/metrics", None), logado=False),
+        Cenario("biblioteca", "/api/biblioteca", lambda i: ("GET", "/api/biblioteca", None)),
+        Cenario(
+            "biblioteca_pagina", "/api/biblioteca",
+            lambda i: ("GET", "/api/biblioteca?limit=50&status=jogando&ordem=-data_adicao", None),
+        ),
+        Cenario(
+            "sync_completo", "/api/biblioteca/sync",
+            lambda i: ("GET", "/api/biblioteca/sync", None),
+        ),
+        Cenario(
+            "sync_delta", "/api/biblioteca/sync",
+            lambda i: ("GET", f"/api/biblioteca/sync?since={ctx['cursor_sync']}", None),
+            antes=cursor_sync,
+        ),
+        Cenario(
+            "recomendacoes", "/api/biblioteca/recomendacoes",
+            lambda i: ("GET", "/api/biblioteca/recomendacoes", None),
+        ),
+        Cenario(
+            "adicionar", "/api/biblioteca/adicionar",
+            lambda i: ("POST", "/api/biblioteca/adicionar", {"jogo_id": livre(i)}),
+        ),
+        Cenario(
+            "atualizar_status", "/api/biblioteca/status/<int:jogo_id>",
+            lambda i: ("PUT", f"/api/biblioteca/status/{presente(i)}",
+                       {"status": gerar_dados.STATUS[i % len(gerar_dados.STATUS)][0]}),
+        ),
+        Cenario(
+            "remover", "/api/biblioteca/remover/<int:jogo_id>",
+            lambda i: ("DELETE", f"/api/biblioteca/remover/{livre(i)}", None),
+        ),
+        Cenario(
+            "batch_biblioteca", "/api/biblioteca/batch",
+            lambda i: ("POST", "/api/biblioteca/batch", {"operacoes": [
+                {"op": "adicionar" if i % 2 == 0 else "remover", "jogo_id": livre(i * 100 + n)}
+                for n in range(100)
+            ]}),
+        ),
+        Cenario(
+            "batch_perfil", "/api/batch",
+            lambda i: ("POST", "/api/batch", {"requisicoes": [
+                "/api/user_profile", "/api/biblioteca/sync", "/api/jogos/recentes",
+            ]}),
+        ),
+    ]
+
+
+# ---------------- PREPARAÇÃO ----------------
+def preparar(app, escala, semente):
+    with app.app_context():
+        db.create_all()
+        criar_indices()
+        gerar_dados.gerar(**gerar_dados.ESCALAS[escala], semente=semente)
+        recomendacoes.recalcular_completo()
+
+        # Alguns jogos com capa já baixada e miniaturas geradas
+        com_capa = db.session.execute(select(Jogos.id).limit(JOGOS_COM_CAPA)).scalars().all()
+        with open(app.config["CAPAS_DIRETORIO_LOCAL"] + "/capa.png", "wb") as f:
+            f.write(CAPA_PNG)
+        db.session.execute(
+            Jogos.__table__.update()
+            .where(Jogos.id.in_(com_capa))
+            .values(image_url="https://exemplo.invalid/capa.png")
+        )
+        db.session.commit()
+        capas.gerar_todas(workers=1)
+
+        # O usuário medido é o que tem a maior biblioteca (pior caso realista)
+        usuario_id = db.session.execute(
+            select(Biblioteca.usuario_id)
+            .group_by(Biblioteca.usuario_id)
+            .order_by(db.func.count().desc())
+            .limit(1)
+        ).scalar()
+        usuario = db.session.get(Usuario, usuario_id)
+        na_biblioteca = db.session.execute(
+            select(Biblioteca.jogo_id).where(Biblioteca.usuario_id == usuario_id)
+        ).scalars().all()
+        todos = db.session.execute(select(Jogos.id)).scalars().all()
+        presentes = set(na_biblioteca)
+        return {
+            "credenciais": {"email": usuario.email, "senha": usuario.senha},
+            "jogos": todos,
+            "jogos_na_biblioteca": na_biblioteca,
+            "jogos_fora_da_biblioteca": [j for j in todos if j not in presentes][:5000],
+            "jogos_com_capa": com_capa,
+        }
+
+
+def _percentil(ordenados, p):
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+
+def medir(app, cenario, ctx, iteracoes, contador):
+    cliente = app.test_client()
+    if cenario.logado:
+        cliente.post("/api/login", json=ctx["credenciais"])
+
+    def chamar(i):
+        metodo, url, corpo = cenario.requisicao(i)
+        if isinstance(corpo, str):
+            return cliente.open(url, method=metodo, data=corpo)
+        return cliente.open(url, method=metodo, json=corpo)
+
+    if cenario.antes:
+        cenario.antes(cliente)
+    chamar(-1)  # aquecimento (caches, índices em memória)
+    tempos, queries, status = [], [], set()
+    contador_iter = itertools.count()
+    inicio_total = time.perf_counter()
+    for _ in range(iteracoes):
+        i = next(contador_iter)
+        if cenario.antes:
+            cenario.antes(cliente)
+        antes = contador[0]
+        inicio = time.perf_counter()
+        resposta = chamar(i)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+        queries.append(contador[0] - antes)
+        status.add(resposta.status_code)
+    total = time.perf_counter() - inicio_total
+
+    # Memória numa passada separada: o tracemalloc deixa tudo mais lento
+    tracemalloc.start()
+    for _ in range(min(5, iteracoes)):
+        if cenario.antes:
+            cenario.antes(cliente)
+        chamar(next(contador_iter))
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    tempos.sort()
+    return {
+        "rota": cenario.rota,
+        "iteracoes": iteracoes,
+        "status": sorted(status),
+        "p50_ms": round(_percentil(tempos, 0.50), 3),
+        "p90_ms": round(_percentil(tempos, 0.90), 3),
+        "p99_ms": round(_percentil(tempos, 0.99), 3),
+        "req_por_s": round(iteracoes / total, 1),
+        "queries_por_req": round(sum(queries) / len(queries), 2),
+        "pico_memoria_kb": round(pico / 1024, 1),
+    }
+
+
+def comparar(atual, baseline):
+    """Lista de regressões (latência p50 ou queries por requisição)."""
+    regressoes = []
+    for nome, r in atual["endpoints"].items():
+        base = baseline.get("endpoints", {}).get(nome)
+        if not base:
+            continue
+        if r["p50_ms"] > base["p50_ms"] * TOLERANCIA_LATENCIA:
+            regressoes.append(f"{nome}: p50 {base['p50_ms']} -> {r['p50_ms']} ms")
+        if r["queries_por_req"] > base["queries_por_req"] + TOLERANCIA_QUERIES:
+            regressoes.append(
+                f"{nome}: queries {base['queries_por_req']} -> {r['queries_por_req']}"
+            )
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark das rotas /api/*")
+    parser.add_argument("--escala", choices=sorted(gerar_dados.ESCALAS), default="pequena")
+    parser.add_argument("--iteracoes", type=int, default=200)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--apenas", nargs="*", help="Nomes de cenários a rodar.")
+    parser.add_argument("--sem-cache", action="store_true", help="Desliga o cache do catálogo.")
+    parser.add_argument("--saida", help="Grava o resultado (baseline) neste JSON.")
+    parser.add_argument("--comparar", help="Baseline JSON para detectar regressões.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        config = {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{pasta}/bench.db",
+            "CAPAS_DIRETORIO": f"{pasta}/capas",
+            "CAPAS_DIRETORIO_LOCAL": pasta,
+            "CAPAS_BAIXAR_REMOTO": False,
+        }
+        if args.sem_cache:
+            config["CACHE_CATALOGO_MAX_ENTRADAS"] = 0
+        app = create_app(config)
+        ctx = preparar(app, args.escala, args.semente)
+
+        contador = [0]
+        with app.app_context():
+            event.listen(
+                db.engine, "before_cursor_execute",
+                lambda *a: contador.__setitem__(0, contador[0] + 1),
+            )
+
+        lista = cenarios(ctx)
+        cobertas = {c.rota for c in lista}
+        faltando = sorted(
+            r.rule for r in app.url_map.iter_rules()
+            if r.rule.startswith("/api/") and r.rule not in cobertas
+        )
+        if faltando:
+            print("Rotas sem cenário:", ", ".join(faltando), file=sys.stderr)
+
+        resultados = {}
+        for cenario in lista:
+            if args.apenas and cenario.nome not in args.apenas:
+                continue
+            r = medir(app, cenario, ctx, args.iteracoes, contador)
+            resultados[cenario.nome] = r
+            print(
+                f"{cenario.nome:<22} p50={r['p50_ms']:8.3f} p99={r['p99_ms']:8.3f} ms "
+                f"{r['req_por_s']:8.1f} req/s  {r['queries_por_req']:5.2f} q/req  "
+                f"{r['pico_memoria_kb']:9.1f} KiB  {r['status']}"
+            )
+
+        with app.app_context():
+            db.engine.dispose()
+
+    saida = {
+        "escala": args.escala,
+        "iteracoes": args.iteracoes,
+        "sem_cache": args.sem_cache,
+        "python": platform.python_version(),
+        "endpoints": resultados,
+    }
+    if args.saida:
+        with open(args.saida, "w") as f:
+            json.dump(saida, f, indent=2, ensure_ascii=False)
+
+    if args.comparar:
+        with open(args.comparar) as f:
+            regressoes = comparar(saida, json.load(f))
+        for linha in regressoes:
+            print("REGRESSÃO:", linha, file=sys.stderr)
+        sys.exit(1 if regressoes else 0)
+
+
+if __name__ == "__main__":
+    main()
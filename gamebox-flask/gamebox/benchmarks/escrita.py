@@ -0,0 +1,114 @@
+# benchmarks/escrita.py
+# Vazão de escrita na biblioteca com várias threads ao mesmo tempo: cada
+# thread, logada como um usuário, adiciona e remove jogos pelas rotas
+# individuais. Compara o modo direto (um commit por requisição) com a escrita
+# agrupada (escritor.py) e, no fim, confere os contadores de estatisticas.py
+# contra a tabela biblioteca. Com --mesmo-usuario todas as threads usam a
+# mesma conta e disputam os mesmos jogos (conflitos em _usuario_jogo_uc).
+#   python -m benchmarks.escrita --threads 16 --duracao 5 --synchronous FULL
+import argparse
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from sqlalchemy import select
+
+import estatisticas
+import gerar_dados
+from db import db
+from inicializacao import iniciar_banco
+from main import create_app
+from models import Usuario
+
+ESCALA = {"jogos": 2000, "usuarios": 64, "biblioteca": 0}
+
+
+def _trabalhar(app, usuario, jogos, fim, resultado):
+    cliente = app.test_client()
+    cliente.post("/api/login", json={"email": usuario, "senha": gerar_dados.SENHA_PADRAO})
+    tempos, codigos = [], Counter()
+    i = 0
+    while time.perf_counter() < fim:
+        jogo_id = jogos[(i // 2) % len(jogos)]
+        inicio = time.perf_counter()
+        if i % 2 == 0:
+            resposta = cliente.post("/api/biblioteca/adicionar", json={"jogo_id": jogo_id})
+        else:
+            resposta = cliente.delete(f"/api/biblioteca/remover/{jogo_id}")
+        tempos.append(time.perf_counter() - inicio)
+        codigos[resposta.status_code] += 1
+        i += 1
+    resultado.append((tempos, codigos))
+
+
+def rodar(agrupada, args):
+    with tempfile.TemporaryDirectory() as pasta:
+        app = create_app({
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{pasta}/bench.db",
+            "METRICAS_MODO": "desligado",
+            "SQLITE_SYNCHRONOUS": args.synchronous,
+            "ESCRITA_AGRUPADA": agrupada,
+            "ESCRITA_JANELA_MS": args.janela_ms,
+        })
+        with app.app_context():
+            iniciar_banco()
+            gerar_dados.gerar(**ESCALA)
+            emails = db.session.execute(select(Usuario.email).order_by(Usuario.id)).scalars().all()
+
+        resultados = []
+        fim = time.perf_counter() + args.duracao
+        threads = []
+        for n in range(args.threads):
+            usuario = emails[0] if args.mesmo_usuario else emails[n % len(emails)]
+            # Com usuários diferentes cada thread começa num trecho do catálogo
+            jogos = list(range(1, ESCALA["jogos"] + 1))  # ids sequenciais num banco novo
+            if not args.mesmo_usuario:
+                jogos = jogos[n * 31 :] + jogos[: n * 31]
+            threads.append(threading.Thread(target=_trabalhar, args=(app, usuario, jogos, fim, resultados)))
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        tempos = sorted(t for r in resultados for t in r[0])
+        codigos = sum((r[1] for r in resultados), Counter())
+        with app.app_context():
+            divergencias = estatisticas.verificar()
+            escrita = app.test_client().get("/api/cache/estatisticas").get_json()["escrita"]
+            db.engine.dispose()
+        return {
+            "req_por_s": len(tempos) / args.duracao,
+            "p50_ms": tempos[len(tempos) // 2] * 1000,
+            "p99_ms": tempos[min(len(tempos) - 1, int(len(tempos) * 0.99))] * 1000,
+            "codigos": dict(sorted(codigos.items())),
+            "divergencias": len(divergencias),
+            "por_lote": escrita["pedidos_por_lote"] if escrita else 1,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de escrita na biblioteca")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--duracao", type=float, default=5.0, help="Segundos por modo.")
+    parser.add_argument("--synchronous", default="NORMAL", help="PRAGMA synchronous do SQLite.")
+    parser.add_argument("--janela-ms", type=float, default=2.0)
+    parser.add_argument("--mesmo-usuario", action="store_true")
+    args = parser.parse_args()
+
+    print(
+        f"{os.cpu_count()} núcleo(s), {args.threads} threads, {args.duracao:.0f} s por modo, "
+        f"synchronous={args.synchronous}, janela {args.janela_ms} ms"
+    )
+    for nome, agrupada in (("direto", False), ("agrupada", True)):
+        r = rodar(agrupada, args)
+        print(
+            f"  {nome:<9} {r['req_por_s']:8.1f} req/s  p50 {r['p50_ms']:7.2f} ms  "
+            f"p99 {r['p99_ms']:7.2f} ms  {r['por_lote']:6.1f} pedidos/commit  "
+            f"status {r['codigos']}  divergências {r['divergencias']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
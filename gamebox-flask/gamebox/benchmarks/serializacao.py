@@ -0,0 +1,97 @@
+# benchmarks/serializacao.py
+# Compara o caminho antigo das listas de jogos (instâncias ORM -> dict montado
+# à mão -> jsonify) com o novo (colunas projetadas -> dict das tuplas ->
+# RespostaJSON), com todos os campos e com ?fields= de grade. Mede CPU por
+# linha e pico de memória (tracemalloc) do passo de consulta + codificação:
+#   python -m benchmarks.serializacao --jogos 100000
+import argparse
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from flask import jsonify
+from sqlalchemy import select
+
+import gerar_dados
+import serializacao
+from db import db
+from main import create_app
+from models import Jogos
+from serializacao import RespostaJSON, colunas, para_dicts
+
+CAMPOS_GRADE = ("id", "nome_jogo", "image_url")
+
+
+def antigo():
+    jogos = Jogos.query.all()
+    lista = [
+        {
+            "id": j.id,
+            "nome_jogo": j.nome_jogo,
+            "ano_lancamento": j.ano_lancamento,
+            "plataforma": j.plataforma,
+            "avaliacao_media": j.avaliacao_media,
+            "image_url": j.image_url,
+        }
+        for j in jogos
+    ]
+    resposta = jsonify(lista)
+    db.session.expunge_all()  # não deixa o identity map crescer entre rodadas
+    return resposta
+
+
+def projetado(campos):
+    def funcao():
+        linhas = db.session.execute(select(*colunas(campos)))
+        return RespostaJSON(para_dicts(linhas, campos))
+
+    return funcao
+
+
+def medir(funcao, repeticoes):
+    funcao()  # aquecimento (compilação do SQL, cache de páginas)
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        tamanho = len(funcao().get_data())
+        tempos.append(time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    funcao()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(tempos), pico, tamanho
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da serialização de jogos")
+    parser.add_argument("--jogos", type=int, default=100000)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        app = create_app(
+            {"SQLALCHEMY_DATABASE_URI": f"sqlite:///{pasta}/bench.db", "METRICAS_MODO": "desligado"}
+        )
+        with app.test_request_context():
+            db.create_all()
+            gerar_dados.gerar(jogos=args.jogos)
+
+            encoder = "orjson" if serializacao.orjson is not None else "json (stdlib)"
+            print(f"{args.jogos} jogos, encoder {encoder} — mediana por requisição")
+            print(f"  {'caminho':<26} {'total ms':>9} {'µs/linha':>9} {'pico MiB':>9} {'bytes/linha':>11}")
+            for nome, funcao in [
+                ("ORM + jsonify (antigo)", antigo),
+                (f"projetado, {len(serializacao.CAMPOS_JOGO)} campos", projetado(tuple(serializacao.CAMPOS_JOGO))),
+                ("projetado, ?fields= grade", projetado(CAMPOS_GRADE)),
+            ]:
+                mediana, pico, tamanho = medir(funcao, args.repeticoes)
+                print(
+                    f"  {nome:<26} {mediana * 1000:9.1f} {mediana * 1e6 / args.jogos:9.2f} "
+                    f"{pico / 2**20:9.1f} {tamanho / args.jogos:11.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
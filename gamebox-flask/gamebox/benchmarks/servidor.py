@@ -0,0 +1,163 @@
+# benchmarks/servidor.py
+# Compara o servidor de debug (flask run --debug, o antigo `python main.py`)
+# com o gunicorn (gunicorn.conf.py desta pasta): tempo de partida a frio até a
+# primeira resposta 200 e vazão/latência com vários clientes HTTP reais em
+# processos separados. Com --recarregar manda SIGHUP no meio da carga e conta
+# as requisições que falharam durante a troca de workers.
+#   python -m benchmarks.servidor --escala pequena --workers 4 --threads 4
+import argparse
+import http.client
+import multiprocessing
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import gerar_dados
+from inicializacao import iniciar_banco
+from main import create_app
+
+ROTAS = [
+    "/api/jogos?limit=50&ordem=-avaliacao_media",
+    "/api/jogos/recentes",
+    "/api/jogos/pesquisa?q=Knight",
+    "/api/jogos/pesquisa/autocomplete?q=Dar",
+    "/api/jogos/populares",
+    "/api/jogos/{id}",
+]
+
+
+def _porta_livre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _get(porta, caminho, timeout=10):
+    conexao = http.client.HTTPConnection("127.0.0.1", porta, timeout=timeout)
+    try:
+        conexao.request("GET", caminho)
+        resposta = conexao.getresponse()
+        resposta.read()
+        return resposta.status
+    finally:
+        conexao.close()
+
+
+def iniciar(modo, porta, env, workers, threads):
+    """Sobe o servidor e devolve (processo, segundos até a primeira resposta 200)."""
+    if modo == "debug":
+        comando = [
+            sys.executable, "-m", "flask", "--app", "main", "run", "--debug", "--port", str(porta),
+        ]
+    else:  # lê o gunicorn.conf.py do diretório atual
+        comando = [
+            sys.executable, "-m", "gunicorn", "--bind", f"127.0.0.1:{porta}",
+            "--workers", str(workers), "--threads", str(threads),
+        ]
+    inicio = time.perf_counter()
+    processo = subprocess.Popen(
+        comando, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        start_new_session=True,  # para poder encerrar o grupo (reloader/workers)
+    )
+    while time.perf_counter() - inicio < 60:
+        try:
+            if _get(porta, "/api/jogos/recentes", timeout=1) == 200:
+                return processo, time.perf_counter() - inicio
+        except OSError:
+            time.sleep(0.01)
+    parar(processo)
+    raise RuntimeError(f"{modo} não respondeu em 60 s")
+
+
+def parar(processo):
+    try:
+        os.killpg(processo.pid, signal.SIGTERM)
+        processo.wait(timeout=30)
+    except (ProcessLookupError, subprocess.TimeoutExpired):
+        os.killpg(processo.pid, signal.SIGKILL)
+
+
+def _cliente(argumentos):
+    porta, duracao, semente, max_id = argumentos
+    tempos, erros, i = [], 0, semente
+    fim = time.perf_counter() + duracao
+    while time.perf_counter() < fim:
+        caminho = ROTAS[i % len(ROTAS)].format(id=i % max_id + 1)
+        i += 1
+        inicio = time.perf_counter()
+        try:
+            ok = _get(porta, caminho) == 200
+        except OSError:
+            ok = False
+        tempos.append(time.perf_counter() - inicio)
+        erros += not ok
+    return tempos, erros
+
+
+def carga(porta, clientes, duracao, max_id, processo=None, recarregar=False):
+    with multiprocessing.Pool(clientes) as pool:
+        pendente = pool.map_async(
+            _cliente, [(porta, duracao, n * 7919, max_id) for n in range(clientes)]
+        )
+        if recarregar and processo is not None:
+            time.sleep(duracao / 2)
+            os.kill(processo.pid, signal.SIGHUP)
+        resultados = pendente.get()
+    tempos = sorted(t for r in resultados for t in r[0])
+    erros = sum(r[1] for r in resultados)
+    percentil = lambda p: tempos[min(len(tempos) - 1, int(len(tempos) * p))] * 1000  # noqa: E731
+    return {
+        "requisicoes": len(tempos),
+        "req_por_s": len(tempos) / duracao,
+        "p50_ms": percentil(0.50),
+        "p99_ms": percentil(0.99),
+        "erros": erros,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do servidor de produção")
+    parser.add_argument("--escala", choices=sorted(gerar_dados.ESCALAS), default="pequena")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--clientes", type=int, default=8, help="Processos clientes.")
+    parser.add_argument("--duracao", type=float, default=5.0, help="Segundos de carga.")
+    parser.add_argument("--modos", nargs="*", default=["debug", "gunicorn"])
+    parser.add_argument("--recarregar", action="store_true", help="SIGHUP no meio da carga.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        url = f"sqlite:///{pasta}/bench.db"
+        app = create_app({"SQLALCHEMY_DATABASE_URI": url})
+        with app.app_context():
+            iniciar_banco()
+            gerar_dados.gerar(**gerar_dados.ESCALAS[args.escala])
+        env = dict(os.environ, GAMEBOX_DATABASE_URL=url, GAMEBOX_METRICAS_MODO="leve")
+        max_id = gerar_dados.ESCALAS[args.escala]["jogos"]
+
+        print(
+            f"{os.cpu_count()} núcleo(s), {args.clientes} clientes, {args.duracao:.0f} s de carga; "
+            f"gunicorn = {args.workers} worker(s) × {args.threads} thread(s)"
+        )
+        for modo in args.modos:
+            porta = _porta_livre()
+            processo, partida = iniciar(modo, porta, env, args.workers, args.threads)
+            try:
+                r = carga(
+                    porta, args.clientes, args.duracao, max_id, processo,
+                    args.recarregar and modo == "gunicorn",
+                )
+            finally:
+                parar(processo)
+            print(
+                f"  {modo:<8} partida {partida * 1000:7.0f} ms  {r['req_por_s']:8.1f} req/s  "
+                f"p50 {r['p50_ms']:7.2f} ms  p99 {r['p99_ms']:7.2f} ms  erros {r['erros']}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+# biblioteca.py
+# Consultas da biblioteca do usuário: uma única query com JOIN e só as colunas
+# usadas na resposta (sem carregar Biblioteca/Jogos nem disparar lazy loads).
+# Também aplica as alterações (adicionar/atualizar/remover) em lote, numa
+# única transação.
+from datetime import datetime
+
+from sqlalchemy import delete, select
+
+import estatisticas
+import recomendacoes
+import sincronizacao
+from db import blocos, db, iniciar_escrita, insert_com_conflito
+from models import Biblioteca, Jogos
+from paginacao import (
+    ParametroInvalido,
+    codificar_cursor,
+    decodificar_cursor,
+    filtro_keyset,
+    ler_campos,
+    ler_limite,
+    ler_ordenacao,
+    ordenar_keyset,
+)
+from serializacao import CAMPOS_BIBLIOTECA, colunas, para_dicts
+
+COLUNAS_ORDENACAO = {
+    "data_adicao": Biblioteca.data_adicao,
+    "nome_jogo": Jogos.nome_jogo,
+    "ano_lancamento": Jogos.ano_lancamento,
+}
+
+def ler_status(args):
+    """?status=jogando ou ?status=jogando,na fila"""
+    bruto = args.get("status")
+    if not bruto:
+        return None
+    return [s.strip() for s in bruto.split(",") if s.strip()] or None
+
+
+def consulta_biblioteca(usuario_id, status=None, colunas_select=None):
+    # Usa o índice (usuario_id, status, data_adicao) tanto no filtro quanto na ordem
+    stmt = (
+        select(*(colunas_select or colunas(CAMPOS_BIBLIOTECA)))
+        .select_from(Biblioteca)
+        .join(Jogos, Jogos.id == Biblioteca.jogo_id)
+        .where(Biblioteca.usuario_id == usuario_id)
+    )
+    if status:
+        stmt = stmt.where(Biblioteca.status.in_(status))
+    return stmt
+
+
+def paginado(args):
+    return "limit" in args or "cursor" in args
+
+
+def listar_biblioteca(usuario_id, args):
+    """Sem ?limit/?cursor devolve a lista inteira; senão (itens, proximo_cursor)."""
+    status = ler_status(args)
+    ordem, desc = ler_ordenacao(args, COLUNAS_ORDENACAO, "data_adicao")
+    campos = ler_campos(args, CAMPOS_BIBLIOTECA)
+    coluna = COLUNAS_ORDENACAO[ordem]
+    # (ordem, id da entrada) vão no fim da linha só para montar o cursor
+    extras = (coluna, Biblioteca.id)
+    stmt = consulta_biblioteca(usuario_id, status, colunas(campos, CAMPOS_BIBLIOTECA, extras))
+
+    if args.get("cursor"):
+        valor, ultimo_id = decodificar_cursor(args["cursor"])
+        if ordem == "data_adicao" and valor is not None:
+            try:
+                valor = datetime.fromisoformat(valor)
+            except (TypeError, ValueError):
+                raise ParametroInvalido("cursor inválido")
+        stmt = stmt.where(filtro_keyset(coluna, Biblioteca.id, desc, valor, ultimo_id))
+    stmt = stmt.order_by(*ordenar_keyset(coluna, Biblioteca.id, desc))
+
+    if not paginado(args):
+        return para_dicts(db.session.execute(stmt), campos), None
+
+    limite = ler_limite(args)
+    linhas = db.session.execute(stmt.limit(limite + 1)).all()
+    itens = para_dicts(linhas[:limite], campos)
+
+    proximo = None
+    if len(linhas) > limite:
+        ultima = linhas[limite - 1]
+        valor = ultima[-2]
+        if isinstance(valor, datetime):
+            valor = valor.isoformat()
+        proximo = codificar_cursor(valor, ultima[-1])
+    return itens, proximo
+
+
+# ---------------- ALTERAÇÕES EM LOTE ----------------
+MAX_OPERACOES = 10000
+OPERACOES = ("adicionar", "atualizar", "remover")
+
+# resultado de cada operação -> código HTTP equivalente nas rotas individuais
+CODIGOS_HTTP = {
+    "adicionado": 201,
+    "ja_existe": 200,
+    "atualizado": 200,
+    "removido": 200,
+    "invalido": 400,
+    "jogo_nao_encontrado": 404,
+    "nao_esta_na_biblioteca": 404,
+}
+
+
+def _validar(op):
+    if not isinstance(op, dict):
+        return None, "operação deve ser um objeto"
+    tipo = op.get("op")
+    if tipo not in OPERACOES:
+        return None, "op deve ser adicionar, atualizar ou remover"
+    jogo_id = op.get("jogo_id")
+    if isinstance(jogo_id, str) and jogo_id.isdigit():
+        jogo_id = int(jogo_id)
+    if not isinstance(jogo_id, int) or isinstance(jogo_id, bool):
+        return None, "ID do jogo é obrigatório"
+    if tipo == "atualizar" and not op.get("status"):
+        return None, "Novo status é obrigatório"
+    status = op.get("status") or "na fila"
+    if tipo != "remover" and (
+        not isinstance(status, str) or status not in estatisticas.STATUS_CONHECIDOS
+    ):
+        return None, "status deve ser um de: " + ", ".join(estatisticas.STATUS_CONHECIDOS)
+    return (tipo, jogo_id, status), None
+
+
+def aplicar_operacoes(usuario_id, operacoes, commit=True):
+    """Aplica operações na biblioteca do usuário e devolve um resultado por operação.
+
+    As operações são avaliadas em ordem sobre o estado atual (carregado com uma
+    query para os jogos e outra para a biblioteca); depois o estado final é
+    gravado com um DELETE e um upsert em _usuario_jogo_uc, num único commit
+    junto com os deltas dos contadores de estatisticas.py e o log de
+    alterações de sincronizacao.py. Com commit=False a transação fica aberta
+    para quem chamou confirmar (escritor.py grava vários pedidos num commit só).
+    """
+    validas = []
+    resultados = []
+    # O estado lido abaixo não muda até o commit (com commit=False quem chamou
+    # já abriu a transação; em outros bancos trava este usuário nela)
+    iniciar_escrita(usuario_id)
+    for indice, op in enumerate(operacoes):
+        valida, erro = _validar(op)
+        resultados.append({"indice": indice, "op": op.get("op") if isinstance(op, dict) else None})
+        if erro:
+            resultados[-1].update(resultado="invalido", erro=erro)
+        else:
+            resultados[-1]["jogo_id"] = valida[1]
+            validas.append((indice, valida))
+
+    ids = {jogo_id for _, (_, jogo_id, _) in validas}
+    nomes = {}
+    inicial = {}  # jogo_id -> status atual na biblioteca
+    for bloco in blocos(ids):
+        nomes.update(
+            db.session.execute(
+                select(Jogos.id, Jogos.nome_jogo).where(Jogos.id.in_(bloco))
+            ).all()
+        )
+        inicial.update(
+            db.session.execute(
+                select(Biblioteca.jogo_id, Biblioteca.status).where(
+                    Biblioteca.usuario_id == usuario_id, Biblioteca.jogo_id.in_(bloco)
+                )
+            ).all()
+        )
+
+    estado = dict(inicial)
+    readicionados = set()  # removidos e adicionados de novo: ganham nova data_adicao
+    for indice, (tipo, jogo_id, status) in validas:
+        resultado = resultados[indice]
+        if tipo == "adicionar":
+            if jogo_id not in nomes:
+                resultado.update(resultado="jogo_nao_encontrado", erro="Jogo não encontrado")
+            elif estado.get(jogo_id) is not None:
+                resultado.update(
+                    resultado="ja_existe", mensagem="Jogo já está na sua biblioteca"
+                )
+            else:
+                if jogo_id in inicial:
+                    readicionados.add(jogo_id)
+                estado[jogo_id] = status
+                resultado.update(
+                    resultado="adicionado",
+                    mensagem=f'Jogo "{nomes[jogo_id]}" adicionado à biblioteca com status "{status}"',
+                )
+        elif estado.get(jogo_id) is None:
+            resultado.update(
+                resultado="nao_esta_na_biblioteca",
+                erro="Jogo não encontrado na sua biblioteca",
+            )
+        elif tipo == "atualizar":
+            estado[jogo_id] = status
+            resultado.update(
+                resultado="atualizado",
+                mensagem=f'Status do jogo (ID: {jogo_id}) atualizado para "{status}"',
+            )
+        else:
+            estado[jogo_id] = None
+            readicionados.discard(jogo_id)
+            resultado.update(
+                resultado="removido",
+                mensagem=f"Jogo (ID: {jogo_id}) removido da biblioteca",
+            )
+
+    remover = [
+        j for j, s in estado.items()
+        if j in inicial and (s is None or j in readicionados)
+    ]
+    gravar = [
+        {"usuario_id": usuario_id, "jogo_id": j, "status": s}
+        for j, s in estado.items()
+        if s is not None and (j not in inicial or j in readicionados or s != inicial[j])
+    ]
+
+    por_status, por_jogo = estatisticas.deltas(inicial, estado)
+
+    try:
+        for bloco in blocos(remover):
+            db.session.execute(
+                delete(Biblioteca).where(
+                    Biblioteca.usuario_id == usuario_id, Biblioteca.jogo_id.in_(bloco)
+                )
+            )
+        if gravar:
+            stmt = insert_com_conflito(Biblioteca.__table__)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["usuario_id", "jogo_id"],
+                set_={"status": stmt.excluded.status},
+            )
+            db.session.execute(stmt, gravar)
+        estatisticas.aplicar_deltas({usuario_id: por_status} if por_status else {}, por_jogo)
+        recomendacoes.marcar_pendentes(por_jogo)
+        sincronizacao.registrar(usuario_id, inicial, estado, readicionados)
+        if commit:
+            db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return resultados
@@ -0,0 +1,326 @@
+# busca.py
+# Pesquisa indexada do catálogo: índice FTS5 (trigram) no SQLite para busca por
+# trecho com ranking, e um índice de prefixos em memória para o autocomplete.
+import bisect
+import heapq
+import logging
+import threading
+import time
+from itertools import product
+
+from sqlalchemy import and_, column, event, inspect, not_, or_, select, table, text, union_all
+
+from db import db
+from models import Jogos
+from serializacao import CAMPOS_JOGO, colunas, para_dicts
+
+log = logging.getLogger("gamebox.busca")
+
+LIMITE_PADRAO = 20
+LIMITE_MAXIMO = 100
+AUTOCOMPLETE_PADRAO = 8
+AUTOCOMPLETE_MAXIMO = 20
+INTERVALO_REVALIDACAO = 5.0  # segundos entre checagens de jogos novos no banco
+
+# O tokenizer trigram só encontra termos com 3+ caracteres
+TAMANHO_MINIMO_FTS = 3
+
+# Tabela FTS com conteúdo externo (não duplica os dados de "jogos") e
+# triggers que a mantêm sincronizada em qualquer INSERT/UPDATE/DELETE.
+DDL_FTS = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS jogos_fts USING fts5(
+        nome_jogo, plataforma,
+        content='jogos', content_rowid='id', tokenize='trigram'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS jogos_fts_ai AFTER INSERT ON jogos BEGIN
+        INSERT INTO jogos_fts(rowid, nome_jogo, plataforma)
+        VALUES (new.id, new.nome_jogo, new.plataforma);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS jogos_fts_ad AFTER DELETE ON jogos BEGIN
+        INSERT INTO jogos_fts(jogos_fts, rowid, nome_jogo, plataforma)
+        VALUES ('delete', old.id, old.nome_jogo, old.plataforma);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS jogos_fts_au AFTER UPDATE ON jogos BEGIN
+        INSERT INTO jogos_fts(jogos_fts, rowid, nome_jogo, plataforma)
+        VALUES ('delete', old.id, old.nome_jogo, old.plataforma);
+        INSERT INTO jogos_fts(rowid, nome_jogo, plataforma)
+        VALUES (new.id, new.nome_jogo, new.plataforma);
+    END""",
+]
+
+# Remoções e renomeações não aparecem para quem só olha ids novos: o mesmo
+# caminho dos triggers do FTS incrementa uma geração que o autocomplete
+# confere a cada revalidação (mudou = recarrega os nomes).
+DDL_GERACAO_NOMES = [
+    """CREATE TABLE IF NOT EXISTS jogos_nomes_geracao (
+        id INTEGER PRIMARY KEY CHECK (id = 1), geracao INTEGER NOT NULL
+    )""",
+    "INSERT OR IGNORE INTO jogos_nomes_geracao (id, geracao) VALUES (1, 0)",
+    """CREATE TRIGGER IF NOT EXISTS jogos_nomes_ad AFTER DELETE ON jogos BEGIN
+        UPDATE jogos_nomes_geracao SET geracao = geracao + 1 WHERE id = 1;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS jogos_nomes_au AFTER UPDATE OF nome_jogo ON jogos
+    WHEN old.nome_jogo IS NOT new.nome_jogo BEGIN
+        UPDATE jogos_nomes_geracao SET geracao = geracao + 1 WHERE id = 1;
+    END""",
+]
+
+_fts_pronto = {}  # url do banco -> bool (FTS disponível)
+_lock_fts = threading.Lock()
+
+
+def usa_fts():
+    """Garante (uma vez por processo/banco) que o índice FTS exista."""
+    engine = db.engine
+    chave = str(engine.url)
+    if chave in _fts_pronto:
+        return _fts_pronto[chave]
+
+    with _lock_fts:
+        if chave not in _fts_pronto:
+            _fts_pronto[chave] = _criar_indice_fts(engine)
+    return _fts_pronto[chave]
+
+
+def _criar_indice_fts(engine):
+    if engine.dialect.name != "sqlite":
+        return False
+    try:
+        with engine.begin() as conn:
+            existia = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE name = 'jogos_fts'")
+            ).first()
+            for ddl in DDL_FTS + DDL_GERACAO_NOMES:
+                conn.execute(text(ddl))
+            if not existia:  # popula o índice com os jogos que já estavam no banco
+                conn.execute(text("INSERT INTO jogos_fts(jogos_fts) VALUES ('rebuild')"))
+        return True
+    except Exception:
+        log.exception("FTS5 indisponível, usando ILIKE")
+        return False
+
+
+def reconstruir_indice_fts():
+    if usa_fts():
+        with db.engine.begin() as conn:
+            conn.execute(text("INSERT INTO jogos_fts(jogos_fts) VALUES ('rebuild')"))
+
+
+# ---------------- PESQUISA RANQUEADA ----------------
+_FTS = table("jogos_fts", column("rowid"))
+
+
+def _expressao_fts(termo):
+    # Frase entre aspas: o trigram casa o trecho em qualquer posição do texto
+    return '"' + termo.replace('"', '""') + '"'
+
+
+def pesquisar(termo, limite=LIMITE_PADRAO, offset=0, campos=tuple(CAMPOS_JOGO)):
+    """Retorna uma página de jogos que contêm `termo`, mais relevantes primeiro."""
+    termo = (termo or "").strip()
+    if not termo:
+        stmt = select(*colunas(campos)).order_by(Jogos.id).limit(limite).offset(offset)
+        return para_dicts(db.session.execute(stmt), campos)
+
+    if len(termo) >= TAMANHO_MINIMO_FTS and usa_fts():
+        # Nome pesa 10x mais que a plataforma no bm25 (menor = mais relevante).
+        stmt = (
+            select(*colunas(campos))
+            .select_from(_FTS)
+            .join(Jogos, Jogos.id == _FTS.c.rowid)
+            .where(text("jogos_fts MATCH :q").bindparams(q=_expressao_fts(termo)))
+            .order_by(text("bm25(jogos_fts, 10.0, 1.0)"), Jogos.id)
+            .limit(limite)
+            .offset(offset)
+        )
+        return para_dicts(db.session.execute(stmt), campos)
+
+    if len(termo) < TAMANHO_MINIMO_FTS:
+        return _pesquisa_curta(termo, limite, offset, campos)
+
+    # Banco sem FTS: ILIKE limitado, quem começa com o termo primeiro
+    padrao = _escapar_like(termo)
+    stmt = (
+        select(*colunas(campos))
+        .where(
+            Jogos.nome_jogo.ilike(f"%{padrao}%", escape="\\")
+            | Jogos.plataforma.ilike(f"%{padrao}%", escape="\\")
+        )
+        .order_by(Jogos.nome_jogo.ilike(f"{padrao}%", escape="\\").desc(), Jogos.nome_jogo)
+        .limit(limite)
+        .offset(offset)
+    )
+    return para_dicts(db.session.execute(stmt), campos)
+
+
+# ---------------- TERMOS CURTOS ----------------
+# Com 1-2 caracteres o trigram não ajuda e '%termo%' varreria o catálogo a
+# cada tecla: vale o nome que começa com o termo (faixa no índice único de
+# nome_jogo, uma por combinação de maiúsculas/minúsculas) e, depois, a
+# plataforma igual ao termo (ix_jogos_plataforma_nome), ex.: q=PC.
+def _escapar_like(termo):
+    return termo.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _variantes(termo):
+    return {"".join(p) for p in product(*({c.lower(), c.upper()} for c in termo))}
+
+
+def _prefixo(coluna, variante):
+    # [variante, próximo) no índice; o LIKE confere o prefixo em qualquer collation
+    proximo = variante[:-1] + chr(ord(variante[-1]) + 1)
+    return and_(
+        coluna >= variante,
+        coluna < proximo,
+        coluna.like(_escapar_like(variante) + "%", escape="\\"),
+    )
+
+
+def _em_ordem_de_nome(condicoes, campos, n):
+    """Até n jogos que atendem a alguma condição, por nome: um ramo por
+    condição lido em ordem do índice e a junção dos primeiros n (como
+    catalogo._por_plataforma), sem ordenar todos os que casam."""
+    ramos = [
+        select(*colunas(campos, extras=(Jogos.nome_jogo,))).where(c).order_by(Jogos.nome_jogo).limit(n)
+        for c in condicoes
+    ]
+    uniao = union_all(*(select(r.subquery()) for r in ramos)).subquery()
+    stmt = select(uniao).order_by(list(uniao.c)[-1]).limit(n)
+    return db.session.execute(stmt).all()
+
+
+def _pesquisa_curta(termo, limite, offset, campos):
+    variantes = sorted(_variantes(termo))
+    por_nome = [_prefixo(Jogos.nome_jogo, v) for v in variantes]
+    n = offset + limite
+    linhas = _em_ordem_de_nome(por_nome, campos, n)
+    if len(linhas) < n:  # acabaram os nomes: completa com a plataforma
+        fora = not_(or_(*por_nome))
+        linhas += _em_ordem_de_nome(
+            [and_(Jogos.plataforma == v, fora) for v in variantes], campos, n - len(linhas)
+        )
+    return para_dicts(linhas[offset:], campos)
+
+
+# ---------------- AUTOCOMPLETE ----------------
+class IndicePrefixo:
+    """Nomes de jogos ordenados em memória; busca de prefixo com bisect, O(log n).
+
+    buscar() lê sem lock: as duas listas são trocadas juntas, numa atribuição
+    só, e nunca alteradas depois de publicadas (adicionar() monta listas novas).
+    """
+
+    def __init__(self):
+        # (nomes em minúsculas ordenados, (id, nome_jogo) na mesma ordem)
+        self.dados = ([], [])
+        self.ultimo_id = 0
+        self.geracao = -1  # jogos_nomes_geracao na última carga; -1 = recarregar
+        self.verificado_em = 0.0
+        self.lock = threading.Lock()  # serializa quem escreve
+
+    def carregar(self, linhas):
+        pares = sorted((nome.casefold(), (id_, nome)) for id_, nome in linhas)
+        self._publicar(pares)
+        self.ultimo_id = max((item[0] for _, item in pares), default=0)
+
+    def adicionar(self, linhas):
+        """Junta um lote de jogos novos: ordena o lote e faz um merge só, O(n + m log m)."""
+        novos = sorted((nome.casefold(), (id_, nome)) for id_, nome in linhas)
+        if not novos:
+            return
+        self._publicar(list(heapq.merge(zip(*self.dados), novos)))
+        self.ultimo_id = max(self.ultimo_id, max(item[0] for _, item in novos))
+
+    def _publicar(self, pares):
+        self.dados = ([chave for chave, _ in pares], [item for _, item in pares])
+
+    def buscar(self, prefixo, n):
+        chaves, itens = self.dados
+        prefixo = prefixo.casefold()
+        inicio = bisect.bisect_left(chaves, prefixo)
+        out = []
+        for i in range(inicio, min(inicio + n, len(chaves))):
+            if not chaves[i].startswith(prefixo):
+                break
+            id_, nome = itens[i]
+            out.append({"id": id_, "nome_jogo": nome})
+        return out
+
+
+_indices_prefixo = {}  # url do banco -> IndicePrefixo
+
+
+def _indice_prefixo():
+    chave = str(db.engine.url)
+    indice = _indices_prefixo.get(chave)
+    if indice is None:
+        indice = _indices_prefixo.setdefault(chave, IndicePrefixo())
+
+    agora = time.monotonic()
+    if agora - indice.verificado_em < INTERVALO_REVALIDACAO:
+        return indice
+
+    with indice.lock:
+        if agora - indice.verificado_em >= INTERVALO_REVALIDACAO:
+            geracao = _geracao_nomes()
+            if geracao != indice.geracao:  # nomes removidos ou alterados
+                indice.carregar(db.session.execute(select(Jogos.id, Jogos.nome_jogo)).all())
+                indice.geracao = geracao
+            else:
+                novos = db.session.execute(
+                    select(Jogos.id, Jogos.nome_jogo)
+                    .where(Jogos.id > indice.ultimo_id)
+                    .order_by(Jogos.id)
+                ).all()
+                if indice.ultimo_id == 0 or len(novos) > 1000:
+                    indice.carregar(indice.dados[1] + [tuple(r) for r in novos])
+                elif novos:
+                    indice.adicionar(novos)
+            indice.verificado_em = agora
+    return indice
+
+
+def _geracao_nomes():
+    """Contador dos triggers de remoção/renomeação, ou None sem eles (sem FTS)."""
+    if not usa_fts():
+        return None
+    return db.session.execute(text("SELECT geracao FROM jogos_nomes_geracao")).scalar()
+
+
+def autocomplete(prefixo, n=AUTOCOMPLETE_PADRAO):
+    prefixo = (prefixo or "").strip()
+    if not prefixo:
+        return []
+    return _indice_prefixo().buscar(prefixo, n)
+
+
+def registrar_jogo(jogo):
+    """Chamado após criar um jogo: deixa o autocomplete atualizado neste processo."""
+    indice = _indices_prefixo.get(str(db.engine.url))
+    if indice is None or indice.ultimo_id == 0:
+        return
+    with indice.lock:
+        if jogo.id == indice.ultimo_id + 1:
+            indice.adicionar([(jogo.id, jogo.nome_jogo)])
+        else:  # outro processo inseriu jogos no meio: recarrega na próxima busca
+            indice.verificado_em = 0.0
+
+
+# Remoção/renomeação pelo ORM neste processo: não espera a próxima
+# revalidação (nem depende dos triggers, que só existem no SQLite)
+@event.listens_for(Jogos, "after_delete")
+def _jogo_removido(mapper, connection, jogo):
+    _recarregar_nomes(connection)
+
+
+@event.listens_for(Jogos, "after_update")
+def _jogo_alterado(mapper, connection, jogo):
+    if inspect(jogo).attrs.nome_jogo.history.has_changes():
+        _recarregar_nomes(connection)
+
+
+def _recarregar_nomes(connection):
+    indice = _indices_prefixo.get(str(connection.engine.url))
+    if indice is not None:
+        indice.geracao = -1
+        indice.verificado_em = 0.0
@@ -0,0 +1,172 @@
+# cache.py
+# Cache em processo das respostas do catálogo (corpo já serializado), com
+# despejo LRU limitado por bytes/entradas e invalidação por versão do catálogo.
+import functools
+import os
+import secrets
+import threading
+import zlib
+from collections import OrderedDict
+
+from flask import current_app, request
+
+MAX_BYTES_PADRAO = 32 * 1024 * 1024
+MAX_ENTRADAS_PADRAO = 1024
+ARQUIVO_VERSAO = "catalogo.versao"
+
+
+# ---------------- VERSÃO DO CATÁLOGO ----------------
+# A versão fica num arquivo da pasta instance/ para ser a mesma em todos os
+# processos do servidor. O conteúdo é "<época>:<contador>": a época aleatória
+# evita reaproveitar ETags antigas se o arquivo for apagado e recriado.
+def _caminho_versao():
+    return os.path.join(current_app.instance_path, ARQUIVO_VERSAO)
+
+
+def versao_catalogo():
+    caminho = _caminho_versao()
+    try:
+        with open(caminho) as f:
+            versao = f.read().strip()
+        if versao:
+            return versao
+    except FileNotFoundError:
+        pass
+    return _gravar_versao(caminho, f"{secrets.token_hex(4)}:0")
+
+
+def incrementar_versao():
+    """Chamado pelas rotas de escrita do catálogo: invalida todo o cache."""
+    caminho = _caminho_versao()
+    epoca, _, contador = versao_catalogo().partition(":")
+    return _gravar_versao(caminho, f"{epoca}:{int(contador or 0) + 1}")
+
+
+def _gravar_versao(caminho, versao):
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    temporario = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temporario, "w") as f:
+        f.write(versao)
+    os.replace(temporario, caminho)  # troca atômica: leitores nunca veem arquivo vazio
+    return versao
+
+
+# ---------------- LRU ----------------
+class CacheLRU:
+    def __init__(self, max_bytes=MAX_BYTES_PADRAO, max_entradas=MAX_ENTRADAS_PADRAO):
+        self.max_bytes = max_bytes
+        self.max_entradas = max_entradas
+        self.entradas = OrderedDict()  # chave -> (corpo, mimetype)
+        self.bytes = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.nao_modificados = 0
+        self.despejos = 0
+
+    def obter(self, chave):
+        with self.lock:
+            valor = self.entradas.get(chave)
+            if valor is None:
+                self.misses += 1
+                return None
+            self.entradas.move_to_end(chave)
+            self.hits += 1
+            return valor
+
+    def guardar(self, chave, corpo, mimetype):
+        tamanho = len(corpo)
+        if tamanho > self.max_bytes:
+            return
+        with self.lock:
+            antigo = self.entradas.pop(chave, None)
+            if antigo is not None:
+                self.bytes -= len(antigo[0])
+            self.entradas[chave] = (corpo, mimetype)
+            self.bytes += tamanho
+            while self.bytes > self.max_bytes or len(self.entradas) > self.max_entradas:
+                _, (corpo_antigo, _) = self.entradas.popitem(last=False)
+                self.bytes -= len(corpo_antigo)
+                self.despejos += 1
+
+    def registrar_304(self):
+        with self.lock:
+            self.nao_modificados += 1
+
+    def limpar(self):
+        with self.lock:
+            self.entradas.clear()
+            self.bytes = 0
+
+    def estatisticas(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "nao_modificados": self.nao_modificados,
+                "despejos": self.despejos,
+                "taxa_acerto": round(self.hits / total, 4) if total else 0.0,
+                "entradas": len(self.entradas),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "max_entradas": self.max_entradas,
+            }
+
+
+cache_catalogo = CacheLRU()
+
+
+def init_cache(app):
+    cache_catalogo.max_bytes = app.config.get("CACHE_CATALOGO_MAX_BYTES", MAX_BYTES_PADRAO)
+    cache_catalogo.max_entradas = app.config.get(
+        "CACHE_CATALOGO_MAX_ENTRADAS", MAX_ENTRADAS_PADRAO
+    )
+
+
+# ---------------- DECORATOR ----------------
+def _etag(versao, caminho):
+    # Mesmo catálogo + mesma URL => mesmos bytes, então a ETag pode ser forte e
+    # calculada sem consultar o banco nem serializar nada.
+    return "c%s-%08x" % (versao.replace(":", "."), zlib.crc32(caminho.encode()))
+
+
+def cache_por_versao(view):
+    """Cacheia respostas 200 de GET que dependem só do catálogo de jogos."""
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if request.method != "GET" or request.args.get("stream"):
+            return view(*args, **kwargs)
+
+        versao = versao_catalogo()
+        caminho = request.full_path
+        etag = _etag(versao, caminho)
+
+        if etag in request.if_none_match:
+            cache_catalogo.registrar_304()
+            return _resposta_304(etag)
+
+        chave = (current_app.instance_path, versao, caminho)
+        guardado = cache_catalogo.obter(chave)
+        if guardado is not None:
+            corpo, mimetype = guardado
+            resposta = current_app.response_class(corpo, mimetype=mimetype)
+        else:
+            resposta = current_app.make_response(view(*args, **kwargs))
+            if resposta.status_code != 200 or resposta.is_streamed:
+                return resposta
+            cache_catalogo.guardar(chave, resposta.get_data(), resposta.mimetype)
+
+        resposta.set_etag(etag)
+        resposta.headers["Cache-Control"] = "no-cache"  # sempre revalida com If-None-Match
+        return resposta
+
+    return wrapper
+
+
+def _resposta_304(etag):
+    resposta = current_app.response_class(status=304)
+    resposta.set_etag(etag)
+    resposta.headers["Cache-Control"] = "no-cache"
+    return resposta
@@ -0,0 +1,398 @@
+# capas.py
+# Cache local das capas dos jogos. O arquivo baixado de Jogos.image_url fica em
+# <CAPAS_DIRETORIO>/originais/ endereçado pelo sha256 do conteúdo (a mesma
+# imagem é guardada uma vez só, e dois processos gravando o mesmo arquivo não
+# conflitam) e as miniaturas de tamanho fixo são geradas por um pool de
+# threads em segundo plano. GET /api/jogos/<id>/capa serve o arquivo local com
+# Cache-Control longo e ETag/Last-Modified (304); enquanto ele não existe,
+# redireciona para a URL original e agenda o download.
+#
+# Sem rede, as imagens vêm de uma pasta local (CAPAS_DIRETORIO_LOCAL, pelo nome
+# do arquivo da URL) ou de outra origem HTTP (CAPAS_ORIGEM troca o host da URL,
+# ex.: um servidor estático de testes). Sem Pillow, serve o original sem
+# redimensionar.
+#
+# image_url vem de usuários (POST /api/jogos, importação): o download direto só
+# conversa com endereços públicos, conferidos no socket já conectado (vale para
+# redirecionamentos e não depende de uma resolução de DNS anterior). A
+# CAPAS_ORIGEM é configurada pelo operador e não passa por essa trava.
+import hashlib
+import http.client
+import io
+import ipaddress
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from urllib.parse import unquote, urlsplit
+from urllib.request import HTTPHandler, HTTPSHandler, ProxyHandler, Request, build_opener, urlopen
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import or_, select
+
+from cache import incrementar_versao
+from db import db, insert_com_conflito
+from models import CapaJogo, Jogos
+from serializacao import TAMANHO_VERSAO_CAPA
+
+log = logging.getLogger("gamebox.capas")
+
+# Miniaturas recortadas para a mesma proporção (capas de jogo ~5:7)
+TAMANHOS = {"pequena": (200, 280), "grande": (480, 672)}
+TAMANHO_PADRAO = "pequena"
+QUALIDADE = 80
+METODO_WEBP = 2  # 0 (rápido) a 6 (menor): o padrão 4 leva ~2x mais tempo para ~mesmo tamanho
+FILA_MAXIMA = 1000  # downloads pendentes por processo; além disso só redireciona
+AGENTE = "GameBox/1.0 (cache de capas)"
+
+_TIPOS = {
+    "image/png": (b"\x89PNG\r\n\x1a\n",),
+    "image/jpeg": (b"\xff\xd8\xff",),
+    "image/gif": (b"GIF87a", b"GIF89a"),
+}
+_FORMATOS = {"webp": ("WEBP", "image/webp"), "jpeg": ("JPEG", "image/jpeg")}
+
+Capa = namedtuple("Capa", "caminho mimetype etag provisoria url_origem versao")
+
+
+class ErroCapa(Exception):
+    pass
+
+
+def _pillow():
+    """Módulo PIL.Image e PIL.ImageOps, ou (None, None) sem Pillow instalado."""
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:  # opcional: pip install pillow
+        return None, None
+    return Image, ImageOps
+
+
+# ---------------- ARQUIVOS ----------------
+def _raiz():
+    return current_app.config["CAPAS_DIRETORIO"] or os.path.join(
+        current_app.instance_path, "capas"
+    )
+
+
+def _formato():
+    """(formato do Pillow, mimetype, extensão) das miniaturas."""
+    nome = current_app.config["CAPAS_FORMATO"].lower()
+    if nome == "webp":
+        from PIL import features
+
+        if not features.check("webp"):
+            nome = "jpeg"
+    formato, mimetype = _FORMATOS[nome]
+    return formato, mimetype, nome
+
+
+def caminho_original(sha):
+    return os.path.join(_raiz(), "originais", sha[:2], sha)
+
+
+def caminho_miniatura(sha, tamanho):
+    largura, altura = TAMANHOS[tamanho]
+    extensao = _formato()[2]
+    pasta = f"{tamanho}-{largura}x{altura}"
+    return os.path.join(_raiz(), "miniaturas", pasta, sha[:2], f"{sha}.{extensao}")
+
+
+def _gravar(caminho, dados):
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    temporario = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temporario, "wb") as f:
+        f.write(dados)
+    os.replace(temporario, caminho)  # leitores nunca veem um arquivo pela metade
+
+
+def tipo_imagem(dados):
+    """Mimetype pelos primeiros bytes, ou None se não for uma imagem conhecida."""
+    if dados[:4] == b"RIFF" and dados[8:12] == b"WEBP":
+        return "image/webp"
+    for tipo, assinaturas in _TIPOS.items():
+        if dados.startswith(assinaturas):
+            return tipo
+    return None
+
+
+# ---------------- ORIGEM ----------------
+def _checar_endereco(conexao):
+    """Fecha a conexão se o outro lado não é um endereço público."""
+    endereco = conexao.sock.getpeername()[0]
+    ip = ipaddress.ip_address(endereco.split("%")[0])
+    ip = getattr(ip, "ipv4_mapped", None) or ip
+    if not ip.is_global or ip.is_multicast:  # privado, loopback, link-local, reservado...
+        conexao.close()
+        raise ErroCapa(f"endereço não permitido para {conexao.host}: {ip}")
+
+
+class _ConexaoHTTP(http.client.HTTPConnection):
+    def connect(self):
+        super().connect()
+        _checar_endereco(self)
+
+
+class _ConexaoHTTPS(http.client.HTTPSConnection):
+    def connect(self):
+        super().connect()  # TCP + handshake TLS; nada da requisição foi enviado ainda
+        _checar_endereco(self)
+
+
+class _HTTPPublico(HTTPHandler):
+    def http_open(self, req):
+        return self.do_open(_ConexaoHTTP, req)
+
+
+class _HTTPSPublico(HTTPSHandler):
+    def https_open(self, req):
+        return self.do_open(_ConexaoHTTPS, req, context=self._context)
+
+
+# Sem proxy do ambiente: o endereço conferido tem que ser o do servidor da imagem
+_opener_publico = build_opener(ProxyHandler({}), _HTTPPublico, _HTTPSPublico)
+
+
+def _ler_limitado(arquivo):
+    maximo = current_app.config["CAPAS_MAX_BYTES"]
+    dados = arquivo.read(maximo + 1)
+    if len(dados) > maximo:
+        raise ErroCapa(f"imagem maior que {maximo} bytes")
+    return dados
+
+
+def ler_origem(url):
+    """Bytes da imagem: da pasta local, da origem configurada ou da própria URL."""
+    config = current_app.config
+    partes = urlsplit(url)
+    nome = os.path.basename(unquote(partes.path))
+
+    local = config["CAPAS_DIRETORIO_LOCAL"]
+    if local and nome and os.path.isfile(os.path.join(local, nome)):
+        with open(os.path.join(local, nome), "rb") as f:
+            return _ler_limitado(f)
+    if partes.scheme not in ("http", "https"):
+        # Arquivos locais só pela pasta acima: image_url vem de usuários
+        raise ErroCapa(f"capa não encontrada: {url}")
+
+    abrir = _opener_publico.open
+    if config["CAPAS_ORIGEM"]:
+        url = config["CAPAS_ORIGEM"].rstrip("/") + partes.path
+        if partes.query:
+            url += "?" + partes.query
+        abrir = urlopen  # origem do operador: pode ser local
+    elif not config["CAPAS_BAIXAR_REMOTO"]:
+        raise ErroCapa("download remoto desligado (CAPAS_BAIXAR_REMOTO)")
+
+    with abrir(Request(url, headers={"User-Agent": AGENTE}), timeout=config["CAPAS_TIMEOUT"]) as r:
+        return _ler_limitado(r)
+
+
+# ---------------- MINIATURAS ----------------
+def _gerar_miniatura(dados, tamanho):
+    Image, ImageOps = _pillow()
+    largura, altura = TAMANHOS[tamanho]
+    formato = _formato()[0]
+    with Image.open(io.BytesIO(dados)) as imagem:
+        imagem.draft("RGB", (largura * 2, altura * 2))  # JPEG: decodifica já reduzido
+        imagem = ImageOps.exif_transpose(imagem).convert("RGB")
+        imagem = ImageOps.fit(imagem, (largura, altura), Image.Resampling.LANCZOS)
+        saida = io.BytesIO()
+        imagem.save(saida, formato, quality=QUALIDADE, method=METODO_WEBP)
+    return saida.getvalue()
+
+
+def completar_miniaturas(sha, dados=None):
+    """Gera as miniaturas que ainda não existem para o original `sha`."""
+    if _pillow()[0] is None:
+        return 0
+    geradas = 0
+    for tamanho in TAMANHOS:
+        caminho = caminho_miniatura(sha, tamanho)
+        if os.path.exists(caminho):
+            continue
+        if dados is None:
+            with open(caminho_original(sha), "rb") as f:
+                dados = f.read()
+        _gravar(caminho, _gerar_miniatura(dados, tamanho))
+        geradas += 1
+    return geradas
+
+
+def processar(jogo_id, url):
+    """Baixa a capa, guarda o original e as miniaturas e registra em capas_jogos."""
+    anterior = db.session.execute(
+        select(CapaJogo.sha256).where(CapaJogo.jogo_id == jogo_id)
+    ).scalar()
+    linha = {"jogo_id": jogo_id, "url_origem": url, "atualizado_em": datetime.utcnow()}
+    try:
+        dados = ler_origem(url)
+        tipo = tipo_imagem(dados)
+        if tipo is None:
+            raise ErroCapa("o conteúdo não é uma imagem")
+        sha = hashlib.sha256(dados).hexdigest()
+        if not os.path.exists(caminho_original(sha)):
+            _gravar(caminho_original(sha), dados)
+        completar_miniaturas(sha, dados)
+        linha.update(sha256=sha, tipo=tipo, erro=None)
+    except Exception as e:  # rede, arquivo, imagem corrompida: fica registrado
+        linha.update(sha256=None, tipo=None, erro=f"{type(e).__name__}: {e}"[:255])
+
+    stmt = insert_com_conflito(CapaJogo.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["jogo_id"], set_={k: stmt.excluded[k] for k in linha if k != "jogo_id"}
+    )
+    try:
+        db.session.execute(stmt, linha)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    if anterior and linha["sha256"] and linha["sha256"] != anterior:
+        incrementar_versao()  # respostas em cache ainda trazem a capa_url antiga
+    return linha
+
+
+# ---------------- POOL EM SEGUNDO PLANO ----------------
+_pool = None
+_pendentes = set()
+_lock = threading.Lock()
+
+
+def _executar(app, chave, funcao, args):
+    try:
+        with app.app_context():
+            funcao(*args)
+    except Exception:
+        log.exception("Erro ao processar capa %s", chave)
+    finally:
+        with _lock:
+            _pendentes.discard(chave)
+
+
+def agendar(chave, funcao, *args):
+    """Roda funcao(*args) no pool, uma vez por chave até terminar."""
+    global _pool
+    app = current_app._get_current_object()
+    with _lock:
+        if chave in _pendentes or len(_pendentes) >= FILA_MAXIMA:
+            return False
+        _pendentes.add(chave)
+        if _pool is None:  # criado no primeiro uso: depois do fork dos workers
+            _pool = ThreadPoolExecutor(app.config["CAPAS_WORKERS"], thread_name_prefix="capas")
+    _pool.submit(_executar, app, chave, funcao, args)
+    return True
+
+
+# ---------------- LEITURA ----------------
+def localizar(jogo_id, tamanho=TAMANHO_PADRAO):
+    """Capa a servir para o jogo, ou None se ele não existe ou não tem image_url.
+
+    Sem arquivo local (Capa.caminho None), agenda o download e o chamador
+    redireciona para Capa.url_origem.
+    """
+    linha = db.session.execute(
+        select(Jogos.image_url, CapaJogo.url_origem, CapaJogo.sha256, CapaJogo.tipo,
+               CapaJogo.atualizado_em)
+        .outerjoin(CapaJogo, CapaJogo.jogo_id == Jogos.id)
+        .where(Jogos.id == jogo_id)
+    ).first()
+    if linha is None or not linha.image_url:
+        return None
+
+    url = linha.image_url
+    if linha.url_origem != url or linha.sha256 is None:
+        espera = timedelta(seconds=current_app.config["CAPAS_NOVA_TENTATIVA"])
+        if linha.url_origem != url or datetime.utcnow() - linha.atualizado_em > espera:
+            agendar(jogo_id, processar, jogo_id, url)
+        return Capa(None, None, None, True, url, None)
+
+    sha = linha.sha256
+    versao = sha[:TAMANHO_VERSAO_CAPA]  # o ?v= da capa_url (ver serializacao.py)
+    if _pillow()[0] is not None:
+        caminho = caminho_miniatura(sha, tamanho)
+        if os.path.exists(caminho):
+            return Capa(caminho, _formato()[1], f"{sha[:20]}-{tamanho}", False, url, versao)
+        agendar(sha, completar_miniaturas, sha)
+        provisoria = True  # serve o original até a miniatura ficar pronta
+    else:
+        provisoria = False
+    caminho = caminho_original(sha)
+    if not os.path.exists(caminho):  # pasta apagada: baixa de novo
+        agendar(jogo_id, processar, jogo_id, url)
+        return Capa(None, None, None, True, url, None)
+    return Capa(caminho, linha.tipo, f"{sha[:20]}-original", provisoria, url, versao)
+
+
+# ---------------- CLI ----------------
+def gerar_todas(workers=None, refazer=False, progresso=None):
+    """Baixa e gera, com `workers` threads, as capas que faltam (ou todas)."""
+    inicio = time.perf_counter()
+    stmt = (
+        select(Jogos.id, Jogos.image_url, CapaJogo.sha256)
+        .outerjoin(CapaJogo, CapaJogo.jogo_id == Jogos.id)
+        .where(Jogos.image_url.is_not(None), Jogos.image_url != "")
+    )
+    if not refazer:
+        stmt = stmt.where(
+            or_(CapaJogo.sha256.is_(None), CapaJogo.url_origem != Jogos.image_url)
+        )
+    linhas = db.session.execute(stmt).all()
+    db.session.remove()
+
+    app = current_app._get_current_object()
+
+    def tarefa(linha):
+        with app.app_context():
+            return processar(linha.id, linha.image_url)
+
+    relatorio = {"jogos": len(linhas), "baixadas": 0, "erros": 0}
+    workers = workers or app.config["CAPAS_WORKERS"]
+    with ThreadPoolExecutor(workers, thread_name_prefix="capas") as pool:
+        for resultado in pool.map(tarefa, linhas):
+            relatorio["erros" if resultado["erro"] else "baixadas"] += 1
+            if progresso:
+                progresso(relatorio)
+
+    # Capas já em cache sem alguma miniatura (tamanho ou formato novo)
+    def completar(sha):
+        with app.app_context():
+            return completar_miniaturas(sha) if os.path.exists(caminho_original(sha)) else 0
+
+    relatorio["miniaturas"] = 0
+    if _pillow()[0] is not None:
+        shas = db.session.execute(
+            select(CapaJogo.sha256).where(CapaJogo.sha256.is_not(None)).distinct()
+        ).scalars().all()
+        with ThreadPoolExecutor(workers, thread_name_prefix="capas") as pool:
+            relatorio["miniaturas"] = sum(pool.map(completar, shas))
+    if relatorio["baixadas"]:
+        incrementar_versao()  # as respostas em cache passam a trazer a capa_url com ?v=
+    relatorio["segundos"] = round(time.perf_counter() - inicio, 2)
+    return relatorio
+
+
+@click.command("gerar-capas")
+@click.option("--workers", type=int, help="Threads (padrão: CAPAS_WORKERS).")
+@click.option("--refazer", is_flag=True, help="Baixa de novo também as que já estão em cache.")
+@with_appcontext
+def comando_gerar_capas(workers, refazer):
+    """Baixa as capas dos jogos e gera as miniaturas."""
+    db.create_all()
+
+    def progresso(r):
+        click.echo(f"\r{r['baixadas']} baixadas, {r['erros']} erros de {r['jogos']}", nl=False, err=True)
+
+    relatorio = gerar_todas(workers, refazer, progresso)
+    click.echo("", err=True)
+    click.echo(
+        f"{relatorio['baixadas']} capas baixadas, {relatorio['erros']} erros, "
+        f"{relatorio['miniaturas']} miniaturas completadas em {relatorio['segundos']}s"
+    )
+    if _pillow()[0] is None:
+        click.echo("Pillow não instalado: as capas são servidas sem redimensionar.", err=True)
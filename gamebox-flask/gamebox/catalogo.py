@@ -0,0 +1,228 @@
+# catalogo.py
+# Navegação facetada do catálogo (GET /api/jogos/catalogo): filtros
+# combináveis por plataforma, faixa de anos e nota mínima, ordenação por nota,
+# ano ou nome com paginação keyset, e contagens por plataforma e por década.
+# Cada faceta ignora o próprio filtro (a de plataformas mostra as outras
+# opções) e fica em cache por versão do catálogo, então trocar de página ou de
+# ordenação não recalcula nada. As consultas usam os índices compostos de
+# Jogos (ver models.py).
+import threading
+from collections import Counter
+
+from flask import current_app
+from sqlalchemy import func, select, union_all
+
+from cache import CacheLRU, versao_catalogo
+from db import db
+from models import Jogos
+from paginacao import (
+    COLUNAS_ORDENACAO,
+    ParametroInvalido,
+    codificar_cursor,
+    consulta_keyset,
+    ler_campos,
+    ler_limite,
+    ler_ordenacao,
+)
+from serializacao import colunas, dumps, para_dicts
+
+LIMITE_PADRAO = 50
+LIMITE_MAXIMO = 200
+ORDEM_PADRAO = "nome_jogo"
+MAX_PLATAFORMAS = 20
+
+# Facetas já serializadas; poucas combinações de filtros, pouca memória
+cache_facetas = CacheLRU(max_bytes=4 * 1024 * 1024, max_entradas=4096)
+
+
+# ---------------- FILTROS ----------------
+def _numero(args, nome, tipo, minimo, maximo):
+    bruto = args.get(nome)
+    if bruto in (None, ""):
+        return None
+    try:
+        valor = tipo(bruto)
+    except ValueError:
+        raise ParametroInvalido(f"{nome} deve ser um número")
+    if not minimo <= valor <= maximo:
+        raise ParametroInvalido(f"{nome} deve estar entre {minimo} e {maximo}")
+    return valor
+
+
+def ler_filtros(args):
+    """Filtros normalizados: {"plataforma": tupla ordenada, "ano_min", "ano_max", "nota_min"}."""
+    plataformas = sorted({p.strip() for p in args.get("plataforma", "").split(",") if p.strip()})
+    if len(plataformas) > MAX_PLATAFORMAS:
+        raise ParametroInvalido(f"no máximo {MAX_PLATAFORMAS} plataformas")
+    filtros = {
+        "plataforma": tuple(plataformas),
+        "ano_min": _numero(args, "ano_min", int, 0, 9999),
+        "ano_max": _numero(args, "ano_max", int, 0, 9999),
+        "nota_min": _numero(args, "nota_min", float, 0.0, 10.0),
+    }
+    if filtros["ano_min"] is not None and filtros["ano_max"] is not None:
+        if filtros["ano_min"] > filtros["ano_max"]:
+            raise ParametroInvalido("ano_min deve ser menor ou igual a ano_max")
+    return filtros
+
+
+def condicoes(filtros, exceto=None):
+    """Cláusulas WHERE dos filtros (menos a faceta `exceto`)."""
+    clausulas = []
+    if filtros["plataforma"] and exceto != "plataforma":
+        plataformas = filtros["plataforma"]
+        clausulas.append(
+            Jogos.plataforma == plataformas[0]
+            if len(plataformas) == 1
+            else Jogos.plataforma.in_(plataformas)
+        )
+    if exceto != "decada":
+        if filtros["ano_min"] is not None:
+            clausulas.append(Jogos.ano_lancamento >= filtros["ano_min"])
+        if filtros["ano_max"] is not None:
+            clausulas.append(Jogos.ano_lancamento <= filtros["ano_max"])
+    if filtros["nota_min"] is not None:
+        clausulas.append(Jogos.avaliacao_media >= filtros["nota_min"])
+    return clausulas
+
+
+# ---------------- FACETAS ----------------
+# Contagens por (plataforma, ano, nota) do catálogo inteiro, lidas uma vez por
+# versão varrendo só o índice ix_jogos_plataforma_ano_avaliacao (já na ordem
+# do GROUP BY): qualquer combinação de filtros vira uma soma em memória. Com
+# combinações distintas demais, as facetas voltam a ser GROUP BY no banco.
+MAX_CUBO = 200000
+_cubo = {}  # (instance_path, versão) -> linhas, ou None se passou de MAX_CUBO
+_lock_cubo = threading.Lock()
+
+
+def _linhas_cubo():
+    chave = (current_app.instance_path, versao_catalogo())
+    with _lock_cubo:  # um só GROUP BY por versão, mesmo com requisições simultâneas
+        if chave not in _cubo:
+            grupo = (Jogos.plataforma, Jogos.ano_lancamento, Jogos.avaliacao_media)
+            linhas = db.session.execute(
+                select(*grupo, func.count()).group_by(*grupo).limit(MAX_CUBO + 1)
+            ).all()
+            _cubo.clear()  # versões antigas não voltam
+            _cubo[chave] = linhas if len(linhas) <= MAX_CUBO else None
+        return _cubo[chave]
+
+
+def _aceita(filtros, exceto):
+    """Versão em Python de condicoes(): predicado sobre (plataforma, ano, nota)."""
+    plataformas = set(filtros["plataforma"]) if exceto != "plataforma" else None
+    ano_min = filtros["ano_min"] if exceto != "decada" else None
+    ano_max = filtros["ano_max"] if exceto != "decada" else None
+    nota_min = filtros["nota_min"]
+
+    def aceita(plataforma, ano, nota):
+        if plataformas and plataforma not in plataformas:
+            return False
+        if ano_min is not None and (ano is None or ano < ano_min):
+            return False
+        if ano_max is not None and (ano is None or ano > ano_max):
+            return False
+        return nota_min is None or (nota is not None and nota >= nota_min)
+
+    return aceita
+
+
+def _facetas_cubo(linhas, filtros):
+    por_plataforma, por_decada = Counter(), Counter()
+    na_plataforma, na_decada = _aceita(filtros, "plataforma"), _aceita(filtros, "decada")
+    for plataforma, ano, nota, total in linhas:
+        if na_plataforma(plataforma, ano, nota):
+            por_plataforma[plataforma] += total
+        if na_decada(plataforma, ano, nota):
+            por_decada[None if ano is None else ano // 10 * 10] += total
+    # Mesma ordem do SQL: mais jogos primeiro / décadas crescentes, NULL antes
+    plataformas = sorted(por_plataforma.items(), key=lambda p: (-p[1], p[0] is not None, p[0] or ""))
+    decadas = sorted(por_decada.items(), key=lambda d: (d[0] is not None, d[0] or 0))
+    return {
+        "plataforma": [{"valor": v, "total": t} for v, t in plataformas],
+        "decada": [{"valor": v, "total": t} for v, t in decadas],
+    }
+
+
+def _contar(agrupamento, clausulas, ordenacao):
+    stmt = (
+        select(agrupamento.label("valor"), func.count().label("total"))
+        .where(*clausulas)
+        .group_by(agrupamento)
+        .order_by(*ordenacao)
+    )
+    return [{"valor": valor, "total": total} for valor, total in db.session.execute(stmt)]
+
+
+def _facetas_sql(filtros):
+    decada = Jogos.ano_lancamento // 10 * 10
+    return {
+        "plataforma": _contar(
+            Jogos.plataforma,
+            condicoes(filtros, exceto="plataforma"),
+            [func.count().desc(), Jogos.plataforma],
+        ),
+        "decada": _contar(decada, condicoes(filtros, exceto="decada"), [decada]),
+    }
+
+
+def facetas_json(filtros):
+    """Objeto JSON {"plataforma": [...], "decada": [...]} já codificado."""
+    versao = versao_catalogo()
+    chave = (current_app.instance_path, versao) + tuple(filtros.values())
+    guardado = cache_facetas.obter(chave)
+    if guardado is not None:
+        return guardado[0]
+    linhas = _linhas_cubo()
+    facetas = _facetas_sql(filtros) if linhas is None else _facetas_cubo(linhas, filtros)
+    corpo = dumps(facetas)
+    cache_facetas.guardar(chave, corpo, "application/json")
+    return corpo
+
+
+# ---------------- PÁGINA ----------------
+def _por_plataforma(stmt, plataformas, desc, limite):
+    """Com IN (várias plataformas) o banco teria de ordenar todos os jogos delas;
+    uma página por plataforma (cada uma lida em ordem do índice) e a junção das
+    primeiras `limite` linhas dá o mesmo resultado."""
+    ramos = [
+        select(stmt.where(Jogos.plataforma == p).subquery()) for p in plataformas
+    ]
+    uniao = union_all(*ramos).subquery()
+    chaves = list(uniao.c)[-2:]  # (ordem, id) são as duas últimas colunas
+    return (
+        select(uniao)
+        .order_by(*(c.desc() if desc else c.asc() for c in chaves))
+        .limit(limite)
+    )
+
+
+def pagina(args):
+    """Corpo JSON de {"jogos", "proximo_cursor", "facetas"} para os parâmetros."""
+    filtros = ler_filtros(args)
+    limite = ler_limite(args, LIMITE_PADRAO, LIMITE_MAXIMO)
+    ordem, desc = ler_ordenacao(args, padrao=ORDEM_PADRAO)
+    campos = ler_campos(args)
+
+    extras = (COLUNAS_ORDENACAO[ordem], Jogos.id)
+    stmt = (
+        consulta_keyset(ordem, desc, args.get("cursor"), colunas(campos, extras=extras))
+        .where(*condicoes(filtros))
+        .limit(limite + 1)
+    )
+    if len(filtros["plataforma"]) > 1:
+        stmt = _por_plataforma(stmt, filtros["plataforma"], desc, limite + 1)
+    linhas = db.session.execute(stmt).all()
+    proximo = None
+    if len(linhas) > limite:
+        ultima = linhas[limite - 1]
+        proximo = codificar_cursor(ultima[-2], ultima[-1])
+
+    corpo = b'{"jogos":%s,"proximo_cursor":%s' % (
+        dumps(para_dicts(linhas[:limite], campos)),
+        dumps(proximo),
+    )
+    if args.get("facetas", "1") != "0":
+        corpo += b',"facetas":' + facetas_json(filtros)
+    return corpo + b"}"
@@ -0,0 +1,100 @@
+# config.py
+# Configuração da aplicação a partir de variáveis de ambiente (GAMEBOX_*) e,
+# opcionalmente, de um arquivo Python apontado por GAMEBOX_CONFIG.
+import os
+
+
+def _env(nome, padrao, tipo=str):
+    valor = os.environ.get(nome)
+    if valor is None or valor == "":
+        return padrao
+    if tipo is bool:
+        return valor.lower() in ("1", "true", "sim", "yes", "on")
+    return tipo(valor)
+
+
+class Config:
+    SECRET_KEY = _env("GAMEBOX_SECRET_KEY", "brunao")  # troque em produção
+    SQLALCHEMY_DATABASE_URI = _env("GAMEBOX_DATABASE_URL", "sqlite:///database.db")
+
+    # ---------------- COOKIES ----------------
+    SESSION_COOKIE_SAMESITE = "Lax"  # ok para localhost:5173 ⇄ 5000 (mesmo site)
+    SESSION_COOKIE_SECURE = _env("GAMEBOX_COOKIE_SECURE", False, bool)  # True só em HTTPS
+    SESSION_COOKIE_DOMAIN = _env("GAMEBOX_COOKIE_DOMAIN", ".localhost")
+
+    # ---------------- SQLITE (PRAGMAs aplicados em cada conexão) ----------------
+    # WAL deixa leitores lendo enquanto um escritor grava; busy_timeout faz a
+    # conexão esperar pelo lock em vez de falhar com "database is locked".
+    SQLITE_JOURNAL_MODE = _env("GAMEBOX_SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_BUSY_TIMEOUT_MS = _env("GAMEBOX_SQLITE_BUSY_TIMEOUT_MS", 5000, int)
+    SQLITE_SYNCHRONOUS = _env("GAMEBOX_SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_MMAP_SIZE = _env("GAMEBOX_SQLITE_MMAP_SIZE", 256 * 1024 * 1024, int)
+    SQLITE_CACHE_SIZE = _env("GAMEBOX_SQLITE_CACHE_SIZE", -64000, int)  # negativo = KiB
+
+    # ---------------- POOL (outros bancos: PostgreSQL, MySQL...) ----------------
+    DB_POOL_SIZE = _env("GAMEBOX_DB_POOL_SIZE", 10, int)
+    DB_MAX_OVERFLOW = _env("GAMEBOX_DB_MAX_OVERFLOW", 20, int)
+    DB_POOL_TIMEOUT = _env("GAMEBOX_DB_POOL_TIMEOUT", 30, int)
+    DB_POOL_RECYCLE = _env("GAMEBOX_DB_POOL_RECYCLE", 1800, int)
+
+    # ---------------- CACHES ----------------
+    CACHE_CATALOGO_MAX_BYTES = _env("GAMEBOX_CACHE_CATALOGO_MAX_BYTES", 32 * 1024 * 1024, int)
+    CACHE_CATALOGO_MAX_ENTRADAS = _env("GAMEBOX_CACHE_CATALOGO_MAX_ENTRADAS", 1024, int)
+    IDENTIDADE_TTL = _env("GAMEBOX_IDENTIDADE_TTL", 60.0, float)
+    IDENTIDADE_MAX = _env("GAMEBOX_IDENTIDADE_MAX", 10000, int)
+    IDENTIDADE_CLAIMS = _env("GAMEBOX_IDENTIDADE_CLAIMS", False, bool)
+    IDENTIDADE_CLAIMS_TTL = _env("GAMEBOX_IDENTIDADE_CLAIMS_TTL", 300.0, float)
+
+    # ---------------- MÉTRICAS (ver metricas.py) ----------------
+    METRICAS_MODO = _env("GAMEBOX_METRICAS_MODO", "completo")  # completo | leve | desligado
+    METRICAS_LENTA_MS = _env("GAMEBOX_METRICAS_LENTA_MS", 100.0, float)
+    METRICAS_N_MAIS_UM = _env("GAMEBOX_METRICAS_N_MAIS_UM", 5, int)
+
+    # ---------------- IMPORTAÇÃO (POST /api/jogos/importar) ----------------
+    # Com False a API só insere jogos novos; upsert (sobrescrever) fica para o CLI
+    IMPORTACAO_UPSERT_HTTP = _env("GAMEBOX_IMPORTACAO_UPSERT_HTTP", False, bool)
+
+    # ---------------- ESCRITA AGRUPADA (ver escritor.py) ----------------
+    # Alterações da biblioteca vão para uma thread escritora por processo, que
+    # junta os pedidos que chegarem em ESCRITA_JANELA_MS numa transação só
+    ESCRITA_AGRUPADA = _env("GAMEBOX_ESCRITA_AGRUPADA", False, bool)
+    ESCRITA_JANELA_MS = _env("GAMEBOX_ESCRITA_JANELA_MS", 2.0, float)
+    ESCRITA_MAX_OPERACOES = _env("GAMEBOX_ESCRITA_MAX_OPERACOES", 1000, int)  # por transação
+    ESCRITA_MAX_FILA = _env("GAMEBOX_ESCRITA_MAX_FILA", 1000, int)  # pedidos esperando; além disso, 503
+    ESCRITA_TIMEOUT = _env("GAMEBOX_ESCRITA_TIMEOUT", 30.0, float)
+
+    # ---------------- SINCRONIZAÇÃO (ver sincronizacao.py) ----------------
+    # Alterações mais antigas que isso saem do log em `flask compactar-alteracoes`;
+    # clientes sem sincronizar há mais tempo recebem a biblioteca inteira
+    SINCRONIZACAO_RETENCAO_DIAS = _env("GAMEBOX_SINCRONIZACAO_RETENCAO_DIAS", 30, int)
+
+    # ---------------- LOTE DE LEITURAS (POST /api/batch; ver lote.py) ----------------
+    LOTE_MAX_REQUISICOES = _env("GAMEBOX_LOTE_MAX_REQUISICOES", 20, int)
+    LOTE_THREADS = _env("GAMEBOX_LOTE_THREADS", 4, int)  # com "paralelo": true
+
+    # ---------------- CAPAS (ver capas.py) ----------------
+    CAPAS_DIRETORIO = _env("GAMEBOX_CAPAS_DIRETORIO", "")  # vazio = instance/capas
+    CAPAS_DIRETORIO_LOCAL = _env("GAMEBOX_CAPAS_DIRETORIO_LOCAL", "")  # imagens já baixadas
+    CAPAS_ORIGEM = _env("GAMEBOX_CAPAS_ORIGEM", "")  # ex.: http://127.0.0.1:8000 no lugar do host da URL
+    CAPAS_BAIXAR_REMOTO = _env("GAMEBOX_CAPAS_BAIXAR_REMOTO", True, bool)
+    CAPAS_WORKERS = _env("GAMEBOX_CAPAS_WORKERS", min(4, os.cpu_count() or 1), int)
+    CAPAS_FORMATO = _env("GAMEBOX_CAPAS_FORMATO", "webp")  # webp | jpeg
+    CAPAS_TIMEOUT = _env("GAMEBOX_CAPAS_TIMEOUT", 10.0, float)
+    CAPAS_MAX_BYTES = _env("GAMEBOX_CAPAS_MAX_BYTES", 10 * 1024 * 1024, int)
+    CAPAS_MAX_AGE = _env("GAMEBOX_CAPAS_MAX_AGE", 7 * 24 * 3600, int)  # Cache-Control das capas
+    CAPAS_NOVA_TENTATIVA = _env("GAMEBOX_CAPAS_NOVA_TENTATIVA", 3600.0, float)  # após erro
+
+
+def opcoes_engine(config):
+    """SQLALCHEMY_ENGINE_OPTIONS conforme o banco configurado."""
+    uri = config["SQLALCHEMY_DATABASE_URI"]
+    if uri.startswith("sqlite"):
+        # busy_timeout também vai como timeout do driver (em segundos)
+        return {"connect_args": {"timeout": config["SQLITE_BUSY_TIMEOUT_MS"] / 1000}}
+    return {
+        "pool_size": config["DB_POOL_SIZE"],
+        "max_overflow": config["DB_MAX_OVERFLOW"],
+        "pool_timeout": config["DB_POOL_TIMEOUT"],
+        "pool_recycle": config["DB_POOL_RECYCLE"],
+        "pool_pre_ping": True,
+    }
@@ -0,0 +1,149 @@
+# escritor.py
+# Escrita agrupada da biblioteca (ESCRITA_AGRUPADA=True): em vez de cada
+# requisição abrir e confirmar a própria transação, os pedidos entram numa
+# fila e uma thread escritora por processo grava vários deles num commit só.
+# No SQLite cada commit disputa o único lock de escrita (e, com
+# synchronous=FULL, faz um fsync); agrupando, N requisições simultâneas pagam
+# um commit em vez de N.
+#
+# Os pedidos de um lote são aplicados em ordem na mesma transação, então cada
+# um vê o que os anteriores gravaram e recebe o mesmo resultado que teria
+# sozinho (ex.: dois "adicionar" do mesmo jogo: o segundo vira "ja_existe" em
+# vez de violar _usuario_jogo_uc). Se o lote falhar, cada pedido é refeito
+# sozinho e só quem falhar de novo recebe o erro. Com a fila cheia a
+# requisição é recusada na hora (HTTP 503) em vez de esperar sem limite.
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from flask import current_app
+
+import biblioteca
+from db import db, iniciar_escrita
+
+
+class FilaCheia(Exception):
+    """Mais pedidos esperando do que ESCRITA_MAX_FILA (vira HTTP 503)."""
+
+
+class _Pedido:
+    __slots__ = ("usuario_id", "operacoes", "futuro")
+
+    def __init__(self, usuario_id, operacoes):
+        self.usuario_id = usuario_id
+        self.operacoes = operacoes
+        self.futuro = Future()
+
+
+class Escritor:
+    def __init__(self, app):
+        self.app = app
+        self.janela = app.config["ESCRITA_JANELA_MS"] / 1000
+        self.max_operacoes = app.config["ESCRITA_MAX_OPERACOES"]
+        self.timeout = app.config["ESCRITA_TIMEOUT"]
+        self.fila = queue.Queue(maxsize=app.config["ESCRITA_MAX_FILA"])
+        self.pid = os.getpid()
+        self.lotes = 0
+        self.pedidos = 0
+        self.recusados = 0
+        self.refeitos = 0
+        self.thread = threading.Thread(target=self._rodar, name="gamebox-escritor", daemon=True)
+        self.thread.start()
+
+    def enviar(self, usuario_id, operacoes):
+        """Enfileira as operações e espera o resultado (como aplicar_operacoes)."""
+        pedido = _Pedido(usuario_id, operacoes)
+        try:
+            self.fila.put_nowait(pedido)
+        except queue.Full:
+            self.recusados += 1
+            raise FilaCheia("fila de escrita cheia")
+        return pedido.futuro.result(timeout=self.timeout)
+
+    def estatisticas(self):
+        return {
+            "lotes": self.lotes,
+            "pedidos": self.pedidos,
+            "pedidos_por_lote": round(self.pedidos / self.lotes, 2) if self.lotes else 0,
+            "recusados": self.recusados,
+            "refeitos": self.refeitos,
+            "na_fila": self.fila.qsize(),
+        }
+
+    # ---------------- THREAD ESCRITORA ----------------
+    def _coletar(self):
+        """Espera o primeiro pedido e junta os que chegarem na janela (ou já na fila)."""
+        lote = [self.fila.get()]
+        operacoes = len(lote[0].operacoes)
+        limite = time.monotonic() + self.janela
+        while operacoes < self.max_operacoes:
+            restante = limite - time.monotonic()
+            try:
+                pedido = self.fila.get(timeout=restante) if restante > 0 else self.fila.get_nowait()
+            except queue.Empty:
+                break
+            lote.append(pedido)
+            operacoes += len(pedido.operacoes)
+        return lote
+
+    def _rodar(self):
+        while True:
+            lote = self._coletar()
+            with self.app.app_context():
+                try:
+                    self._gravar(lote)
+                except Exception as e:  # a thread não pode morrer com pedidos esperando
+                    for pedido in lote:
+                        if not pedido.futuro.done():
+                            pedido.futuro.set_exception(e)
+                finally:
+                    db.session.remove()
+
+    def _gravar(self, lote):
+        try:
+            iniciar_escrita()  # uma transação para o lote inteiro
+            resultados = [
+                biblioteca.aplicar_operacoes(p.usuario_id, p.operacoes, commit=False) for p in lote
+            ]
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            if len(lote) == 1:
+                lote[0].futuro.set_exception(e)
+                return
+            self.refeitos += len(lote)
+            for pedido in lote:
+                self._gravar([pedido])
+            return
+        self.lotes += 1
+        self.pedidos += len(lote)
+        for pedido, resultado in zip(lote, resultados):
+            pedido.futuro.set_result(resultado)
+
+
+# ---------------- ENTRADA (rotas da biblioteca) ----------------
+_escritores = {}  # app -> Escritor deste processo
+_lock = threading.Lock()
+
+
+def _escritor(app):
+    with _lock:
+        escritor = _escritores.get(app)
+        if escritor is None or escritor.pid != os.getpid():  # workers forkados criam o seu
+            escritor = _escritores[app] = Escritor(app)
+        return escritor
+
+
+def aplicar(usuario_id, operacoes):
+    """biblioteca.aplicar_operacoes direto ou pela fila, conforme ESCRITA_AGRUPADA."""
+    app = current_app._get_current_object()
+    if not app.config["ESCRITA_AGRUPADA"]:
+        return biblioteca.aplicar_operacoes(usuario_id, operacoes)
+    return _escritor(app).enviar(usuario_id, operacoes)
+
+
+def estatisticas():
+    escritor = _escritores.get(current_app._get_current_object())
+    return escritor.estatisticas() if escritor is not None else None
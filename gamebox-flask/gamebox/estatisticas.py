@@ -0,0 +1,195 @@
+# estatisticas.py
+# Contadores materializados da biblioteca: jogos por status de cada usuário
+# (estatisticas_usuario) e em quantas bibliotecas cada jogo está
+# (popularidade_jogos). São atualizados por deltas na mesma transação que
+# altera a biblioteca, então o perfil e o ranking leem poucas linhas em vez de
+# fazer COUNT ... GROUP BY sobre "biblioteca". `flask reconstruir-estatisticas`
+# recalcula tudo do zero (ou só confere, com --verificar).
+from collections import Counter
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import delete, func, insert, select
+
+from db import db, insert_com_conflito
+from models import Biblioteca, EstatisticaUsuario, Jogos, PopularidadeJogo
+from serializacao import CAMPOS_JOGO, colunas
+
+STATUS_CONHECIDOS = ("na fila", "jogando", "completado", "abandonado")
+POPULARES_PADRAO = 20
+POPULARES_MAXIMO = 100
+
+
+# ---------------- DELTAS ----------------
+def deltas(antes, depois):
+    """Compara {jogo_id: status} antes e depois das alterações de um usuário e
+    devolve (delta por status, delta por jogo). Status None = fora da biblioteca."""
+    por_status, por_jogo = Counter(), Counter()
+    for jogo_id, novo in depois.items():
+        antigo = antes.get(jogo_id)
+        if antigo == novo:
+            continue
+        if antigo is not None:
+            por_status[antigo] -= 1
+        if novo is not None:
+            por_status[novo] += 1
+        if antigo is None:
+            por_jogo[jogo_id] += 1
+        elif novo is None:
+            por_jogo[jogo_id] -= 1
+    return (
+        {s: d for s, d in por_status.items() if d},
+        {j: d for j, d in por_jogo.items() if d},
+    )
+
+
+def _somar(tabela, chaves, linhas):
+    """UPSERT que soma `total` ao contador existente (ou cria com o delta)."""
+    stmt = insert_com_conflito(tabela)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=chaves, set_={"total": tabela.c.total + stmt.excluded.total}
+    )
+    db.session.execute(stmt, linhas)
+
+
+def aplicar_deltas(por_usuario, por_jogo):
+    """Soma os deltas aos contadores, na transação da sessão atual (sem commit).
+
+    por_usuario: {usuario_id: {status: delta}}; por_jogo: {jogo_id: delta}.
+    Os deltas vêm de um estado lido antes: a transação precisa ter sido aberta
+    com db.iniciar_escrita() (ver biblioteca.aplicar_operacoes).
+    """
+    linhas = [
+        {"usuario_id": u, "status": s, "total": d}
+        for u, status in por_usuario.items()
+        for s, d in status.items()
+    ]
+    if linhas:
+        _somar(EstatisticaUsuario.__table__, ["usuario_id", "status"], linhas)
+    if por_jogo:
+        _somar(
+            PopularidadeJogo.__table__,
+            ["jogo_id"],
+            [{"jogo_id": j, "total": d} for j, d in por_jogo.items()],
+        )
+
+
+# ---------------- LEITURA ----------------
+def estatisticas_usuario(usuario_id):
+    """Total e contagem por status (lê só as linhas do usuário pela chave primária)."""
+    linhas = db.session.execute(
+        select(EstatisticaUsuario.status, EstatisticaUsuario.total).where(
+            EstatisticaUsuario.usuario_id == usuario_id
+        )
+    ).all()
+    por_status = dict.fromkeys(STATUS_CONHECIDOS, 0)
+    por_status.update((s, t) for s, t in linhas if t)
+    return {"total": sum(por_status.values()), "por_status": por_status}
+
+
+def populares(limite=POPULARES_PADRAO, campos=tuple(CAMPOS_JOGO)):
+    """Jogos em mais bibliotecas (varre o índice de total do maior para o menor)."""
+    stmt = (
+        select(*colunas(campos), PopularidadeJogo.total)
+        .select_from(PopularidadeJogo)
+        .join(Jogos, Jogos.id == PopularidadeJogo.jogo_id)
+        .where(PopularidadeJogo.total > 0)
+        .order_by(PopularidadeJogo.total.desc(), PopularidadeJogo.jogo_id.desc())
+        .limit(limite)
+    )
+    # o total vai no fim da linha; zip(campos, linha) o deixa de fora
+    return [dict(zip(campos, linha), bibliotecas=linha[-1]) for linha in db.session.execute(stmt)]
+
+
+# ---------------- RECONSTRUÇÃO ----------------
+def _contagens_reais():
+    por_usuario = db.session.execute(
+        select(Biblioteca.usuario_id, Biblioteca.status, func.count()).group_by(
+            Biblioteca.usuario_id, Biblioteca.status
+        )
+    ).all()
+    por_jogo = db.session.execute(
+        select(Biblioteca.jogo_id, func.count()).group_by(Biblioteca.jogo_id)
+    ).all()
+    return (
+        {(u, s): t for u, s, t in por_usuario},
+        {j: t for j, t in por_jogo},
+    )
+
+
+def _contagens_materializadas():
+    por_usuario = db.session.execute(
+        select(EstatisticaUsuario.usuario_id, EstatisticaUsuario.status, EstatisticaUsuario.total)
+    ).all()
+    por_jogo = db.session.execute(select(PopularidadeJogo.jogo_id, PopularidadeJogo.total)).all()
+    return (
+        {(u, s): t for u, s, t in por_usuario if t},
+        {j: t for j, t in por_jogo if t},
+    )
+
+
+def verificar():
+    """Lista de divergências entre os contadores e a tabela biblioteca."""
+    reais_u, reais_j = _contagens_reais()
+    mat_u, mat_j = _contagens_materializadas()
+    divergencias = []
+    for u, s in sorted(reais_u.keys() | mat_u.keys(), key=str):
+        if reais_u.get((u, s), 0) != mat_u.get((u, s), 0):
+            divergencias.append(
+                f"usuário {u} / {s}: contador {mat_u.get((u, s), 0)}, real {reais_u.get((u, s), 0)}"
+            )
+    for j in sorted(reais_j.keys() | mat_j.keys()):
+        if reais_j.get(j, 0) != mat_j.get(j, 0):
+            divergencias.append(f"jogo {j}: contador {mat_j.get(j, 0)}, real {reais_j.get(j, 0)}")
+    return divergencias
+
+
+def reconstruir():
+    """Recalcula os dois contadores a partir da biblioteca (INSERT ... SELECT)."""
+    try:
+        db.session.execute(delete(EstatisticaUsuario))
+        db.session.execute(delete(PopularidadeJogo))
+        db.session.execute(
+            insert(EstatisticaUsuario).from_select(
+                ["usuario_id", "status", "total"],
+                select(Biblioteca.usuario_id, Biblioteca.status, func.count()).group_by(
+                    Biblioteca.usuario_id, Biblioteca.status
+                ),
+            )
+        )
+        db.session.execute(
+            insert(PopularidadeJogo).from_select(
+                ["jogo_id", "total"],
+                select(Biblioteca.jogo_id, func.count()).group_by(Biblioteca.jogo_id),
+            )
+        )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+def inicializar_se_vazio():
+    """Em bancos criados antes dos contadores, popula-os na primeira execução."""
+    vazio = db.session.execute(select(EstatisticaUsuario.usuario_id).limit(1)).first() is None
+    if vazio and db.session.execute(select(Biblioteca.id).limit(1)).first() is not None:
+        reconstruir()
+        return True
+    return False
+
+
+# ---------------- CLI ----------------
+@click.command("reconstruir-estatisticas")
+@click.option("--verificar", "so_verificar", is_flag=True, help="Só compara, sem regravar.")
+@with_appcontext
+def comando_reconstruir(so_verificar):
+    """Recalcula (ou confere) os contadores de biblioteca e popularidade."""
+    db.create_all()
+    divergencias = verificar()
+    for linha in divergencias[:50]:
+        click.echo(linha, err=True)
+    if so_verificar:
+        click.echo(f"{len(divergencias)} divergência(s)")
+        raise SystemExit(1 if divergencias else 0)
+    reconstruir()
+    click.echo(f"Contadores reconstruídos ({len(divergencias)} divergência(s) corrigida(s))")
@@ -0,0 +1,179 @@
+# gerar_dados.py
+# Gerador reprodutível de dados sintéticos (jogos, usuários e bibliotecas) para
+# benchmarks. A popularidade dos jogos e o tamanho das bibliotecas seguem
+# distribuições de cauda longa: poucos jogos aparecem em muitas bibliotecas e
+# poucos usuários têm bibliotecas enormes, como num catálogo real.
+import bisect
+import itertools
+import random
+import time
+from datetime import datetime, timedelta
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import func, insert, select
+
+import estatisticas
+from cache import incrementar_versao
+from db import analisar, db
+from models import Biblioteca, Jogos, Usuario
+
+TAMANHO_LOTE = 10000
+SENHA_PADRAO = "senha123"
+
+ESCALAS = {
+    "pequena": {"jogos": 1000, "usuarios": 100, "biblioteca": 5000},
+    "media": {"jogos": 50000, "usuarios": 5000, "biblioteca": 250000},
+    "grande": {"jogos": 1000000, "usuarios": 100000, "biblioteca": 5000000},
+}
+
+PREFIXOS = [
+    "Dark", "Hollow", "Super", "Final", "Red", "Elden", "Star", "Mega", "Shadow",
+    "Crystal", "Iron", "Silent", "Broken", "Eternal", "Lost", "Neon", "Wild",
+]
+NUCLEOS = [
+    "Souls", "Knight", "Fantasy", "Redemption", "Ring", "Quest", "Legends",
+    "Odyssey", "Chronicles", "Tactics", "Racer", "Frontier", "Kingdom", "Hunter",
+]
+PLATAFORMAS = [
+    ("PC", 35), ("PlayStation 5", 15), ("PlayStation 4", 15), ("Xbox Series", 10),
+    ("Xbox One", 8), ("Switch", 12), ("Mobile", 5),
+]
+STATUS = [("na fila", 40), ("jogando", 20), ("completado", 30), ("abandonado", 10)]
+
+
+def _lotes(iteravel, tamanho=TAMANHO_LOTE):
+    iterador = iter(iteravel)
+    while lote := list(itertools.islice(iterador, tamanho)):
+        yield lote
+
+
+def _pesos_zipf(n, s):
+    acumulado, total = [], 0.0
+    for i in range(1, n + 1):
+        total += 1.0 / i**s
+        acumulado.append(total)
+    return acumulado
+
+
+def _proximo_id(modelo):
+    return (db.session.execute(select(func.max(modelo.id))).scalar() or 0) + 1
+
+
+# ---------------- GERADORES ----------------
+def linhas_jogos(n, rnd, inicio=1):
+    plataformas, pesos = zip(*PLATAFORMAS)
+    for i in range(inicio, inicio + n):
+        ano = rnd.randint(1985, 2025)
+        yield {
+            "nome_jogo": f"{rnd.choice(PREFIXOS)} {rnd.choice(NUCLEOS)} {i}",
+            "ano_lancamento": ano,
+            "plataforma": rnd.choices(plataformas, pesos)[0],
+            "avaliacao_media": round(min(10.0, max(1.0, rnd.gauss(7.0, 1.5))), 1),
+            "image_url": None,
+        }
+
+
+def linhas_usuarios(n, inicio=1):
+    for i in range(inicio, inicio + n):
+        yield {
+            "username": f"usuario{i}",
+            "email": f"usuario{i}@exemplo.com",
+            "senha": SENHA_PADRAO,
+        }
+
+
+def tamanhos_bibliotecas(usuarios, total, rnd, s=1.1):
+    """Divide `total` entradas entre os usuários com uma lei de potência."""
+    pesos = [1.0 / (i**s) for i in range(1, len(usuarios) + 1)]
+    rnd.shuffle(pesos)  # o usuário "mais ativo" não é sempre o primeiro id
+    soma = sum(pesos)
+    return [max(1, round(total * p / soma)) for p in pesos]
+
+
+def linhas_biblioteca(usuarios, jogos, total, rnd, s_jogos=0.9):
+    acumulado = _pesos_zipf(len(jogos), s_jogos)
+    topo = acumulado[-1]
+    status, pesos_status = zip(*STATUS)
+    agora = datetime.utcnow()
+
+    for usuario_id, tamanho in zip(usuarios, tamanhos_bibliotecas(usuarios, total, rnd)):
+        tamanho = min(tamanho, len(jogos))
+        escolhidos = set()
+        tentativas = 0
+        while len(escolhidos) < tamanho and tentativas < tamanho * 20:
+            indice = bisect.bisect_left(acumulado, rnd.random() * topo)
+            escolhidos.add(jogos[min(indice, len(jogos) - 1)])
+            tentativas += 1
+        for jogo_id in escolhidos:
+            yield {
+                "usuario_id": usuario_id,
+                "jogo_id": jogo_id,
+                "status": rnd.choices(status, pesos_status)[0],
+                "data_adicao": agora - timedelta(seconds=rnd.randint(0, 3 * 365 * 86400)),
+            }
+
+
+def gerar(jogos=0, usuarios=0, biblioteca=0, semente=42, progresso=None):
+    """Acrescenta dados sintéticos ao banco atual e devolve as quantidades inseridas."""
+    rnd = random.Random(semente)
+    inseridos = {"jogos": 0, "usuarios": 0, "biblioteca": 0}
+
+    def gravar(modelo, linhas, chave):
+        for lote in _lotes(linhas):
+            db.session.execute(insert(modelo), lote)
+            db.session.commit()
+            inseridos[chave] += len(lote)
+            if progresso:
+                progresso(chave, inseridos[chave])
+
+    if jogos:
+        gravar(Jogos, linhas_jogos(jogos, rnd, _proximo_id(Jogos)), "jogos")
+        incrementar_versao()
+    if usuarios:
+        gravar(Usuario, linhas_usuarios(usuarios, _proximo_id(Usuario)), "usuarios")
+    if biblioteca:
+        ids_jogos = db.session.execute(select(Jogos.id).order_by(Jogos.id)).scalars().all()
+        rnd.shuffle(ids_jogos)  # popularidade independente da ordem de cadastro
+        ids_usuarios = db.session.execute(
+            select(Usuario.id)
+            .outerjoin(Biblioteca, Biblioteca.usuario_id == Usuario.id)
+            .where(Biblioteca.id.is_(None))
+        ).scalars().all()  # só usuários sem biblioteca, para não violar _usuario_jogo_uc
+        if ids_jogos and ids_usuarios:
+            gravar(
+                Biblioteca,
+                linhas_biblioteca(ids_usuarios, ids_jogos, biblioteca, rnd),
+                "biblioteca",
+            )
+            # Carga em massa direto na tabela: recalcula os contadores de uma vez
+            estatisticas.reconstruir()
+    if any(inseridos.values()):
+        analisar()  # a distribuição dos dados mudou; o planejador precisa saber
+    return inseridos
+
+
+# ---------------- CLI ----------------
+@click.command("gerar-dados")
+@click.option("--escala", type=click.Choice(sorted(ESCALAS)), help="Predefinição de tamanho.")
+@click.option("--jogos", type=int, help="Quantidade de jogos a criar.")
+@click.option("--usuarios", type=int, help="Quantidade de usuários a criar.")
+@click.option("--biblioteca", type=int, help="Total aproximado de entradas de biblioteca.")
+@click.option("--semente", type=int, default=42, show_default=True)
+@with_appcontext
+def comando_gerar_dados(escala, jogos, usuarios, biblioteca, semente):
+    """Popula jogos, usuários e bibliotecas com dados sintéticos."""
+    quantidades = dict(ESCALAS.get(escala, {"jogos": 0, "usuarios": 0, "biblioteca": 0}))
+    for chave, valor in (("jogos", jogos), ("usuarios", usuarios), ("biblioteca", biblioteca)):
+        if valor is not None:
+            quantidades[chave] = valor
+
+    db.create_all()
+    inicio = time.perf_counter()
+
+    def progresso(tabela, total):
+        click.echo(f"\r{tabela}: {total}", nl=False, err=True)
+
+    inseridos = gerar(**quantidades, semente=semente, progresso=progresso)
+    click.echo("", err=True)
+    click.echo(f"Inseridos {inseridos} em {time.perf_counter() - inicio:.1f}s")
@@ -0,0 +1,57 @@
+# gunicorn.conf.py
+# Servidor de produção: `gunicorn` rodado nesta pasta lê este arquivo sozinho
+# (ou gunicorn -c gunicorn.conf.py). Os valores vêm de GAMEBOX_SERVIDOR_* e
+# qualquer um pode ser trocado na linha de comando (ex.: --workers 8).
+#
+# Recarga: com preload_app (padrão) a aplicação é importada uma vez no mestre
+# e herdada pelos workers, então o HUP só troca os workers e continua com o
+# código já carregado. Para publicar código novo mande USR2 (sobe um mestre
+# novo ao lado do atual) e, quando ele estiver atendendo, QUIT no antigo. Com
+# GAMEBOX_SERVIDOR_PRELOAD=0 cada worker importa a aplicação e o HUP também
+# recarrega o código, ao custo de aquecer cada worker do zero.
+#
+# Por isso este arquivo não importa config.py nem módulos da aplicação: o que
+# o mestre importa os workers herdam prontos, e o HUP não os recarregaria.
+import os
+
+
+def _env(nome, padrao):
+    valor = os.environ.get(nome)
+    if valor is None or valor == "":
+        return padrao
+    if isinstance(padrao, bool):
+        return valor.lower() in ("1", "true", "sim", "yes", "on")
+    return type(padrao)(valor)
+
+
+wsgi_app = "main:create_app()"
+
+bind = _env("GAMEBOX_SERVIDOR_BIND", "127.0.0.1:5000")
+workers = _env("GAMEBOX_SERVIDOR_WORKERS", os.cpu_count() or 1)
+worker_class = "gthread"
+threads = _env("GAMEBOX_SERVIDOR_THREADS", 4)
+preload_app = _env("GAMEBOX_SERVIDOR_PRELOAD", True)
+
+# Recicla cada worker depois de N requisições (0 desliga); o jitter evita que
+# todos reiniciem juntos
+max_requests = _env("GAMEBOX_SERVIDOR_MAX_REQUESTS", 10000)
+max_requests_jitter = max_requests // 10
+
+timeout = _env("GAMEBOX_SERVIDOR_TIMEOUT", 30)  # worker sem responder é reiniciado
+graceful_timeout = _env("GAMEBOX_SERVIDOR_TIMEOUT_PARADA", 30)
+keepalive = _env("GAMEBOX_SERVIDOR_KEEPALIVE", 5)
+
+
+# ---------------- GANCHOS (ver servidor.py) ----------------
+def when_ready(servidor):
+    if not servidor.cfg.preload_app:
+        return  # sem a aplicação no mestre não há o que aquecer (nem importar)
+    from servidor import aquecer_mestre
+
+    aquecer_mestre(servidor)
+
+
+def post_worker_init(worker):
+    from servidor import aquecer_worker
+
+    aquecer_worker(worker)
@@ -0,0 +1,169 @@
+# identidade.py
+# Carregamento do usuário autenticado sem ir ao banco em toda requisição:
+# cache LRU com TTL de registros imutáveis (não instâncias ORM) na frente do
+# user_loader do Flask-Login e, opcionalmente, leitura direta das claims
+# gravadas na sessão assinada para rotas somente leitura.
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from flask import request, session
+from flask_login import UserMixin
+from sqlalchemy import event, select
+
+from db import db
+from models import Usuario
+
+TTL_PADRAO = 60.0  # segundos que um registro fica no cache
+MAX_PADRAO = 10000  # usuários no cache
+TTL_CLAIMS_PADRAO = 300.0  # idade máxima das claims da sessão
+CHAVE_CLAIMS = "_identidade"
+METODOS_LEITURA = ("GET", "HEAD")
+
+
+@dataclass(frozen=True, eq=False)
+class UsuarioSessao(UserMixin):
+    """Dados do usuário logado que as rotas usam (current_user.id/username/email)."""
+
+    id: int
+    username: str
+    email: str
+
+
+class CacheIdentidades:
+    def __init__(self, ttl=TTL_PADRAO, maximo=MAX_PADRAO):
+        self.ttl = ttl
+        self.maximo = maximo
+        self.entradas = OrderedDict()  # id -> (UsuarioSessao, expira_em)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.consultas = 0
+        self.claims = 0
+        self.invalidacoes = 0
+
+    def obter(self, usuario_id):
+        agora = time.monotonic()
+        with self.lock:
+            entrada = self.entradas.get(usuario_id)
+            if entrada is None:
+                return None
+            registro, expira_em = entrada
+            if expira_em < agora:
+                del self.entradas[usuario_id]
+                return None
+            self.entradas.move_to_end(usuario_id)
+            self.hits += 1
+            return registro
+
+    def guardar(self, registro):
+        with self.lock:
+            self.entradas[registro.id] = (registro, time.monotonic() + self.ttl)
+            self.entradas.move_to_end(registro.id)
+            while len(self.entradas) > self.maximo:
+                self.entradas.popitem(last=False)
+
+    def invalidar(self, usuario_id):
+        with self.lock:
+            if self.entradas.pop(usuario_id, None) is not None:
+                self.invalidacoes += 1
+
+    def contar(self, atributo):
+        with self.lock:
+            setattr(self, atributo, getattr(self, atributo) + 1)
+
+    def estatisticas(self):
+        with self.lock:
+            evitadas = self.hits + self.claims
+            total = evitadas + self.consultas
+            return {
+                "hits": self.hits,
+                "claims_sessao": self.claims,
+                "consultas": self.consultas,
+                "consultas_evitadas": evitadas,
+                "taxa_evitada": round(evitadas / total, 4) if total else 0.0,
+                "invalidacoes": self.invalidacoes,
+                "entradas": len(self.entradas),
+                "ttl": self.ttl,
+                "maximo": self.maximo,
+            }
+
+
+identidades = CacheIdentidades()
+_config = {"claims": False, "ttl_claims": TTL_CLAIMS_PADRAO}
+
+
+def init_identidade(app):
+    identidades.ttl = app.config.get("IDENTIDADE_TTL", TTL_PADRAO)
+    identidades.maximo = app.config.get("IDENTIDADE_MAX", MAX_PADRAO)
+    _config["claims"] = app.config.get("IDENTIDADE_CLAIMS", False)
+    _config["ttl_claims"] = app.config.get("IDENTIDADE_CLAIMS_TTL", TTL_CLAIMS_PADRAO)
+
+
+# Qualquer alteração/remoção de usuário pelo ORM tira o registro do cache
+@event.listens_for(Usuario, "after_update")
+@event.listens_for(Usuario, "after_delete")
+def _usuario_alterado(mapper, connection, usuario):
+    identidades.invalidar(usuario.id)
+
+
+def _registro(usuario):
+    return UsuarioSessao(id=usuario.id, username=usuario.username, email=usuario.email)
+
+
+def _de_claims(usuario_id):
+    claims = session.get(CHAVE_CLAIMS)
+    if not claims or claims.get("id") != usuario_id:
+        return None
+    if time.time() - claims.get("iat", 0) > _config["ttl_claims"]:
+        return None
+    return UsuarioSessao(id=claims["id"], username=claims["username"], email=claims["email"])
+
+
+def carregar_usuario(user_id):
+    """user_loader: claims da sessão (se ativas e rota de leitura) > cache > banco."""
+    try:
+        usuario_id = int(user_id)
+    except (TypeError, ValueError):
+        return None
+
+    if _config["claims"] and request.method in METODOS_LEITURA:
+        registro = _de_claims(usuario_id)
+        if registro is not None:
+            identidades.contar("claims")
+            return registro
+
+    registro = identidades.obter(usuario_id)
+    if registro is not None:
+        return registro
+
+    linha = db.session.execute(
+        select(Usuario.id, Usuario.username, Usuario.email).where(Usuario.id == usuario_id)
+    ).first()
+    identidades.contar("consultas")
+    if linha is None:
+        return None
+    registro = UsuarioSessao(*linha)
+    identidades.guardar(registro)
+    return registro
+
+
+def registrar_login(usuario):
+    """Chamado após login_user: aquece o cache e, com IDENTIDADE_CLAIMS, grava as
+    claims na sessão (sem a opção o cookie não carrega username/email)."""
+    registro = _registro(usuario)
+    identidades.guardar(registro)
+    if not _config["claims"]:
+        session.pop(CHAVE_CLAIMS, None)
+        return
+    session[CHAVE_CLAIMS] = {
+        "id": registro.id,
+        "username": registro.username,
+        "email": registro.email,
+        "iat": int(time.time()),
+    }
+
+
+def registrar_logout(usuario_id):
+    identidades.invalidar(usuario_id)
+    session.pop(CHAVE_CLAIMS, None)
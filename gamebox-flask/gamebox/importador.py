@@ -0,0 +1,253 @@
+# importador.py
+# Importação em massa do catálogo a partir de CSV ou JSONL. Lê o arquivo em
+# streaming (memória constante) e grava em lotes com executemany, um lote por
+# transação, usando ON CONFLICT na coluna única nome_jogo.
+import csv
+import io
+import json
+import sys
+import time
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy.exc import SQLAlchemyError
+
+from cache import incrementar_versao
+from db import analisar, db, insert_com_conflito
+from models import Jogos
+
+TAMANHO_LOTE_PADRAO = 5000
+MAX_ERROS_RELATADOS = 50
+MODOS = ("upsert", "inserir")
+FORMATOS = ("csv", "jsonl")
+
+COLUNAS = ("nome_jogo", "ano_lancamento", "plataforma", "avaliacao_media", "image_url")
+COLUNAS_ATUALIZAVEIS = COLUNAS[1:]
+
+# O arquivo é decodificado com errors="replace": um byte inválido vira U+FFFD
+# e só a linha dele é rejeitada. Com o erro no decodificador, que trabalha em
+# blocos de vários KB, a leitura pararia antes de gravar linhas válidas
+# anteriores do mesmo bloco.
+ENCODING = "utf-8-sig"
+SUBSTITUTO = "\ufffd"
+
+
+class RegistroInvalido(ValueError):
+    pass
+
+
+# ---------------- LEITURA ----------------
+def ler_csv(arquivo):
+    for registro in csv.DictReader(arquivo):
+        yield registro
+
+
+def ler_jsonl(arquivo):
+    for linha in arquivo:
+        linha = linha.strip()
+        if not linha:
+            continue
+        try:
+            yield json.loads(linha)
+        except json.JSONDecodeError as e:
+            yield RegistroInvalido(f"JSON inválido: {e.msg}")
+
+
+def ler_registros(arquivo, formato):
+    if formato not in FORMATOS:
+        raise ValueError("formato deve ser csv ou jsonl")
+    return ler_csv(arquivo) if formato == "csv" else ler_jsonl(arquivo)
+
+
+def formato_do_arquivo(caminho):
+    return "jsonl" if caminho.endswith((".jsonl", ".ndjson")) else "csv"
+
+
+# ---------------- VALIDAÇÃO ----------------
+def _texto(valor, tamanho, campo):
+    if valor is None:
+        return None
+    valor = str(valor).strip()
+    if len(valor) > tamanho:
+        raise RegistroInvalido(f"{campo} maior que {tamanho} caracteres")
+    return valor or None
+
+
+def _numero(tipo, valor, campo):
+    if valor is None or valor == "":
+        return None
+    try:
+        return tipo(valor)
+    except (TypeError, ValueError):
+        raise RegistroInvalido(f"{campo} inválido: {valor!r}")
+
+
+def normalizar(registro):
+    """Converte uma linha do arquivo no dicionário de colunas de Jogos."""
+    if isinstance(registro, RegistroInvalido):
+        raise registro
+    if not isinstance(registro, dict):
+        raise RegistroInvalido("registro deve ser um objeto")
+    if any(isinstance(v, str) and SUBSTITUTO in v for v in registro.values()):
+        raise RegistroInvalido("texto com bytes que não são UTF-8")
+
+    nome = _texto(registro.get("nome_jogo"), 200, "nome_jogo")
+    if not nome:
+        raise RegistroInvalido("nome_jogo é obrigatório")
+    return {
+        "nome_jogo": nome,
+        "ano_lancamento": _numero(int, registro.get("ano_lancamento"), "ano_lancamento"),
+        "plataforma": _texto(registro.get("plataforma"), 200, "plataforma"),
+        "avaliacao_media": _numero(float, registro.get("avaliacao_media"), "avaliacao_media"),
+        "image_url": _texto(registro.get("image_url"), 255, "image_url"),
+    }
+
+
+# ---------------- GRAVAÇÃO ----------------
+def _comando_insert(modo):
+    stmt = insert_com_conflito(Jogos.__table__)
+    if modo == "inserir":
+        return stmt.on_conflict_do_nothing(index_elements=["nome_jogo"])
+    return stmt.on_conflict_do_update(
+        index_elements=["nome_jogo"],
+        set_={c: stmt.excluded[c] for c in COLUNAS_ATUALIZAVEIS},
+    )
+
+
+class Relatorio:
+    def __init__(self):
+        self.lidas = 0
+        self.gravadas = 0
+        self.rejeitadas = 0
+        self.lotes = 0
+        self.erros = []  # [(linha, motivo)], limitado a MAX_ERROS_RELATADOS
+        self.lotes_com_erro = []  # [{"linhas": [primeira, última], "erro"}]: nada gravado delas
+        self.interrompida = None  # motivo, se o arquivo não pôde ser lido até o fim
+        self.inicio = time.perf_counter()
+
+    @property
+    def segundos(self):
+        return time.perf_counter() - self.inicio
+
+    @property
+    def completa(self):
+        return not self.lotes_com_erro and self.interrompida is None
+
+    def rejeitar(self, linha, motivo):
+        self.rejeitadas += 1
+        if len(self.erros) < MAX_ERROS_RELATADOS:
+            self.erros.append({"linha": linha, "erro": motivo})
+
+    def to_dict(self):
+        segundos = self.segundos
+        return {
+            "lidas": self.lidas,
+            "gravadas": self.gravadas,
+            "rejeitadas": self.rejeitadas,
+            "lotes": self.lotes,
+            "segundos": round(segundos, 3),
+            "linhas_por_segundo": round(self.lidas / segundos) if segundos else 0,
+            "erros": self.erros,
+            "lotes_com_erro": self.lotes_com_erro,
+            "interrompida": self.interrompida,
+        }
+
+
+def importar(registros, modo="upsert", tamanho_lote=TAMANHO_LOTE_PADRAO, progresso=None):
+    """Grava os registros em lotes. `progresso(relatorio)` é chamado a cada lote.
+
+    No modo "upsert" um nome já existente tem os demais campos atualizados;
+    no modo "inserir" ele é mantido como está. Cada lote é uma transação: um
+    lote que falha entra em `lotes_com_erro` (com a faixa de linhas) e os
+    seguintes continuam; um arquivo ilegível no meio para a leitura ali
+    (`interrompida`). Os lotes anteriores ficam gravados nos dois casos.
+    """
+    if modo not in MODOS:
+        raise ValueError("modo deve ser upsert ou inserir")
+
+    engine = db.engine
+    stmt = _comando_insert(modo)
+    relatorio = Relatorio()
+    lote = []
+    faixa = [None, None]  # primeira e última linha do lote atual
+
+    def gravar():
+        try:
+            with engine.begin() as conn:
+                resultado = conn.execute(stmt, lote)
+        except SQLAlchemyError as e:
+            relatorio.lotes_com_erro.append(
+                {"linhas": list(faixa), "erro": str(getattr(e, "orig", None) or e)[:200]}
+            )
+        else:
+            relatorio.gravadas += max(resultado.rowcount, 0)
+            relatorio.lotes += 1
+        lote.clear()
+        faixa[0] = None
+        if progresso:
+            progresso(relatorio)
+
+    numero = 0
+    try:
+        for numero, registro in enumerate(registros, start=1):
+            relatorio.lidas += 1
+            try:
+                lote.append(normalizar(registro))
+            except RegistroInvalido as e:
+                relatorio.rejeitar(numero, str(e))
+                continue
+            faixa[0] = faixa[0] or numero
+            faixa[1] = numero
+            if len(lote) >= tamanho_lote:
+                gravar()
+    except csv.Error as e:
+        relatorio.interrompida = f"após a linha {numero}: {e}"
+    if lote:
+        gravar()
+
+    if relatorio.gravadas:
+        incrementar_versao()
+        if relatorio.lotes > 1:  # carga grande: atualiza as estatísticas do planejador
+            analisar(Jogos.__tablename__)
+    return relatorio
+
+
+def importar_stream(binario, formato, **kwargs):
+    """Importa de um stream binário (ex.: request.stream) sem carregá-lo inteiro."""
+    texto = io.TextIOWrapper(binario, encoding=ENCODING, errors="replace", newline="")
+    return importar(ler_registros(texto, formato), **kwargs)
+
+
+# ---------------- CLI ----------------
+@click.command("importar-jogos")
+@click.argument("arquivo")
+@click.option("--formato", type=click.Choice(FORMATOS), help="Padrão: pela extensão.")
+@click.option("--modo", type=click.Choice(MODOS), default="upsert", show_default=True)
+@click.option("--lote", "tamanho_lote", type=int, default=TAMANHO_LOTE_PADRAO, show_default=True)
+@with_appcontext
+def comando_importar(arquivo, formato, modo, tamanho_lote):
+    """Importa jogos de um arquivo CSV ou JSONL ("-" lê da entrada padrão)."""
+    formato = formato or formato_do_arquivo(arquivo)
+
+    def progresso(r):
+        click.echo(
+            f"\r{r.lidas} lidas, {r.gravadas} gravadas, {r.rejeitadas} rejeitadas "
+            f"({r.lidas / r.segundos:,.0f} linhas/s)",
+            nl=False,
+            err=True,
+        )
+
+    if arquivo == "-":
+        relatorio = importar_stream(
+            sys.stdin.buffer, formato, modo=modo, tamanho_lote=tamanho_lote, progresso=progresso
+        )
+    else:
+        with open(arquivo, newline="", encoding=ENCODING, errors="replace") as f:
+            relatorio = importar(
+                ler_registros(f, formato), modo, tamanho_lote, progresso=progresso
+            )
+
+    click.echo("", err=True)
+    click.echo(json.dumps(relatorio.to_dict(), ensure_ascii=False, indent=2))
+    if not relatorio.completa:
+        raise SystemExit(1)
@@ -0,0 +1,94 @@
+# inicializacao.py
+# Comandos explícitos de preparação do banco (nada disso roda ao importar o
+# app nem ao subir o servidor):
+#   flask --app main iniciar-banco   tabelas, índices, FTS e contadores
+#   flask --app main semear          usuário de teste e jogos iniciais
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import select
+
+import busca
+import estatisticas
+from db import analisar, criar_indices, db
+from importador import importar
+from models import Usuario
+
+USUARIO_TESTE = {"username": "teste", "email": "user@example.com", "senha": "senha123"}
+
+JOGOS_INICIAIS = [
+    {
+        "nome_jogo": "The Witcher 3: Wild Hunt",
+        "ano_lancamento": 2015,
+        "plataforma": "PC",
+        "avaliacao_media": 9.5,
+        "image_url": "https://upload.wikimedia.org/wikipedia/pt/thumb/0/06/TW3_Wild_Hunt.png/330px-TW3_Wild_Hunt.png",
+    },
+    {
+        "nome_jogo": "Red Dead Redemption 2",
+        "ano_lancamento": 2018,
+        "plataforma": "PlayStation 4",
+        "avaliacao_media": 9.8,
+        "image_url": "https://upload.wikimedia.org/wikipedia/en/thumb/4/44/Red_Dead_Redemption_II.jpg/250px-Red_Dead_Redemption_II.jpg",
+    },
+    {
+        "nome_jogo": "Hollow Knight",
+        "ano_lancamento": 2017,
+        "plataforma": "PC",
+        "avaliacao_media": 9.0,
+        "image_url": "https://upload.wikimedia.org/wikipedia/en/thumb/0/04/Hollow_Knight_first_cover_art.webp/250px-Hollow_Knight_first_cover_art.webp.png",
+    },
+    {
+        "nome_jogo": "God of War",
+        "ano_lancamento": 2018,
+        "plataforma": "PlayStation 4",
+        "avaliacao_media": 9.6,
+        "image_url": "https://upload.wikimedia.org/wikipedia/en/thumb/e/ee/God_of_War_Ragnar%C3%B6k_cover.jpg/250px-God_of_War_Ragnar%C3%B6k_cover.jpg",
+    },
+]
+
+
+def iniciar_banco():
+    """Cria o que faltar no esquema; pode rodar de novo a cada deploy."""
+    db.create_all()
+    criar_indices()  # create_all() não cria índices novos em tabelas existentes
+    busca.usa_fts()
+    estatisticas.inicializar_se_vazio()  # bancos anteriores aos contadores
+    analisar()
+
+
+def semear():
+    """Usuário de teste e jogos iniciais (os que já existirem são mantidos)."""
+    usuario_novo = (
+        db.session.execute(
+            select(Usuario.id).where(Usuario.email == USUARIO_TESTE["email"])
+        ).first()
+        is None
+    )
+    if usuario_novo:
+        db.session.add(Usuario(**USUARIO_TESTE))
+        db.session.commit()
+    relatorio = importar(JOGOS_INICIAIS, modo="inserir")
+    return usuario_novo, relatorio
+
+
+# ---------------- CLI ----------------
+@click.command("iniciar-banco")
+@with_appcontext
+def comando_iniciar_banco():
+    """Cria tabelas, índices e o índice de busca."""
+    iniciar_banco()
+    click.echo(f"Banco pronto: {db.engine.url}")
+
+
+@click.command("semear")
+@with_appcontext
+def comando_semear():
+    """Adiciona o usuário de teste e os jogos iniciais."""
+    iniciar_banco()
+    usuario_novo, relatorio = semear()
+    estado = "adicionado" if usuario_novo else "já existe"
+    click.echo(f"Usuário '{USUARIO_TESTE['email']}' {estado}.")
+    click.echo(
+        f"{relatorio.gravadas} jogos iniciais adicionados "
+        f"({relatorio.lidas - relatorio.gravadas} já existiam)."
+    )
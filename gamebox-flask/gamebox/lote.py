@@ -0,0 +1,135 @@
+# lote.py
+# Várias leituras numa requisição só (POST /api/batch): o cliente manda a
+# lista de URLs GET que a página precisa (ex.: perfil + biblioteca) e recebe
+# todas as respostas juntas, pagando uma ida e volta em vez de uma por URL.
+#
+# Cada sub-requisição passa pelo roteamento e pela view normais, mas dentro da
+# requisição externa: mesma sessão (o cookie não é decodificado de novo), mesmo
+# usuário do Flask-Login (carregado uma vez) e, no modo sequencial, a mesma
+# sessão do banco. Os hooks before/after_request (CORS, métricas, cookie de
+# "lembrar") rodam só uma vez, para /api/batch; as queries das sub-requisições
+# contam nas métricas de /api/batch.
+#
+# Com "paralelo": true as sub-requisições rodam num pool de LOTE_THREADS
+# threads, cada uma com o próprio contexto da aplicação (e conexão do banco);
+# as queries de cada thread são somadas às de /api/batch. A resposta espera
+# todas terminarem, sem timeout: nenhuma sub-requisição continua rodando (nem
+# grava nada) depois que o lote respondeu. Vale com um banco que atenda
+# consultas simultâneas; no SQLite com um núcleo o sequencial costuma ser
+# igual ou mais rápido.
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from flask import current_app, g, request, session
+from flask.ctx import RequestContext
+from flask_login import current_user
+from werkzeug.test import EnvironBuilder
+
+import metricas
+from db import db
+from paginacao import ParametroInvalido
+from serializacao import dumps
+
+log = logging.getLogger("gamebox.lote")
+
+PREFIXO = "/api/"
+ROTA = "/api/batch"
+
+
+def ler_urls(data, maximo):
+    """Lista de URLs GET de {"requisicoes": ["/api/...", ...]}, validada."""
+    urls = data.get("requisicoes") if isinstance(data, dict) else None
+    if not isinstance(urls, list) or not urls:
+        raise ParametroInvalido("requisicoes deve ser uma lista não vazia de URLs")
+    if len(urls) > maximo:
+        raise ParametroInvalido(f"máximo de {maximo} requisições por lote")
+    for url in urls:
+        if not isinstance(url, str) or not url.startswith(PREFIXO):
+            raise ParametroInvalido(f"cada requisição deve ser uma URL começando com {PREFIXO}")
+        if url.partition("?")[0].rstrip("/") == ROTA:
+            raise ParametroInvalido(f"{ROTA} não pode ser chamado dentro de um lote")
+    return urls
+
+
+# ---------------- SUB-REQUISIÇÃO ----------------
+def _executar(app, url, sessao, base_url):
+    """(status, mimetype, corpo) de um GET despachado dentro deste processo."""
+    caminho, _, consulta = url.partition("?")
+    ambiente = EnvironBuilder(
+        path=caminho, query_string=consulta, base_url=base_url, method="GET"
+    ).get_environ()
+    ctx = RequestContext(app, ambiente, session=sessao)  # sessão já aberta lá fora
+    ctx.push()
+    try:
+        try:
+            rv = app.dispatch_request()
+        except Exception as e:  # 404/405 do roteamento e erros com handler
+            rv = app.handle_user_exception(e)
+        resposta = app.make_response(rv)
+        return resposta.status_code, resposta.mimetype, resposta.get_data()
+    except Exception:
+        log.exception("Erro na sub-requisição %s", url)
+        db.session.rollback()  # as próximas usam a mesma sessão do banco
+        return 500, "application/json", dumps({"erro": "Erro interno"})
+    finally:
+        ctx.pop()
+
+
+def _executar_em_thread(app, usuario, medida, url, sessao, base_url):
+    with app.app_context():
+        g._login_user = usuario  # o Flask-Login não carrega de novo
+        return metricas.contar_em_thread(medida, _executar, app, url, sessao, base_url)
+
+
+_pools = {}  # app -> ThreadPoolExecutor deste processo
+_lock = threading.Lock()
+
+
+def _pool(app):
+    with _lock:
+        pid, pool = _pools.get(app, (None, None))
+        if pid != os.getpid():  # workers forkados criam o seu
+            pool = ThreadPoolExecutor(app.config["LOTE_THREADS"], thread_name_prefix="gamebox-lote")
+            _pools[app] = (os.getpid(), pool)
+        return pool
+
+
+# ---------------- LOTE ----------------
+def _item(status, mimetype, corpo):
+    if mimetype == "application/json":
+        conteudo = corpo or b"null"  # já é JSON: entra sem decodificar
+    elif mimetype.startswith("text/"):
+        conteudo = dumps(corpo.decode("utf-8", "replace"))
+    else:
+        conteudo = b"null"  # binário (ex.: capas) não cabe no lote
+    return b'{"status":%d,"corpo":%s}' % (status, conteudo)
+
+
+def executar(urls, paralelo=False):
+    """Corpo JSON {"respostas": [{"status", "corpo"}, ...]} na ordem das URLs."""
+    app = current_app._get_current_object()
+    usuario = current_user._get_current_object()  # carregado uma vez para todas
+    sessao = session._get_current_object()
+    base_url = request.host_url
+
+    if paralelo and len(urls) > 1:
+        medida = metricas.requisicao_medida()  # None com as métricas desligadas
+        futuros = [
+            _pool(app).submit(_executar_em_thread, app, usuario, medida, url, sessao, base_url)
+            for url in urls
+        ]
+        wait(futuros)  # todas terminam antes da resposta, mesmo se uma falhar
+        resultados = []
+        for futuro in futuros:
+            try:
+                resultado, contagem = futuro.result()
+            except Exception:
+                log.exception("Erro na thread do lote")
+                resultado, contagem = (500, "application/json", dumps({"erro": "Erro interno"})), None
+            metricas.somar_contagem(contagem)
+            resultados.append(resultado)
+    else:
+        resultados = [_executar(app, url, sessao, base_url) for url in urls]
+    return b'{"respostas":[' + b",".join(_item(*r) for r in resultados) + b"]}"
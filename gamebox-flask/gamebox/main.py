@@ -1,5 +1,19 @@
-from flask import Flask, request, jsonify
+import logging
+import os
+
+from flask import (
+    Blueprint,
+    Flask,
+    Response,
+    current_app,
+    jsonify,
+    redirect,
+    request,
+    send_file,
+    stream_with_context,
+)
 from flask_cors import CORS
+from sqlalchemy import select
 from flask_login import (
     LoginManager,
     login_user,
@@ -7,46 +21,50 @@ from flask_login import (
     current_user,
     logout_user,
 )
-from db import db
-from models import Usuario, Jogos, Biblioteca
-
-app = Flask(__name__)
-app.secret_key = "brunao"  # troque em produção
-app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///database.db"
-
-# ---------------- CONFIGURAÇÃO DE COOKIES ----------------
-app.config["SESSION_COOKIE_SAMESITE"] = "Lax"
-app.config["SESSION_COOKIE_SECURE"] = False
-
-app.config.update(
-    SESSION_COOKIE_SAMESITE="Lax",  # ok para localhost:5173 ⇄ 5000 (mesmo site)
-    SESSION_COOKIE_SECURE=False,  # True só em HTTPS
-    SESSION_COOKIE_DOMAIN=".localhost",  # ajuda o Chrome a tratar corretamente
+from config import Config
+from db import db, init_db
+from models import Usuario, Jogos
+import biblioteca
+import busca
+import capas
+import catalogo
+import escritor
+import estatisticas
+import gerar_dados
+import importador
+import identidade
+import inicializacao
+import lote
+import recomendacoes
+import sincronizacao
+from metricas import init_metricas, metricas
+from cache import cache_catalogo, cache_por_versao, incrementar_versao, init_cache
+from paginacao import (
+    ParametroInvalido,
+    ler_campos,
+    ler_limite,
+    ler_ordenacao,
+    pagina_jogos,
+    stream_jogos,
 )
+from serializacao import CAMPOS_BIBLIOTECA, RespostaJSON, colunas, para_dicts
 
+# Rotas da API; registradas na aplicação por create_app()
+api = Blueprint("api", __name__)
 
-db.init_app(app) #inicializa o banco de dados com a aplicação Flask
-
-# ---------------- CORS (compatível com Vite:5173) ----------------
-CORS(
-    app,
-    resources={r"/api/*": {"origins": ["http://localhost:5173"]}},
-    supports_credentials=True,  # envia/recebe cookie de sessão
-    allow_headers=["Content-Type", "Authorization"],  # aceita Content-Type no preflight
-    expose_headers=["Content-Type", "Authorization"],
-    methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-)
+log = logging.getLogger("gamebox.api")
 
 # ---------------- Flask-Login ----------------
 lm = LoginManager()
-lm.init_app(app)
 lm.login_view = "login"
 
 
+# Devolve um registro imutável (identidade.UsuarioSessao) vindo do cache de
+# identidades ou das claims da sessão; só consulta o banco em caso de miss.
 @lm.user_loader
 def load_user(user_id):
     try:
-        return Usuario.query.get(int(user_id))
+        return identidade.carregar_usuario(user_id)
     except Exception:
         return None
 
@@ -57,15 +75,16 @@ def unauthorized():
 
 
 # ---------------- LOGOUT ----------------
-@app.route("/api/logout", methods=["POST"])
+@api.route("/api/logout", methods=["POST"])
 @login_required
 def api_logout():
+    identidade.registrar_logout(current_user.id)
     logout_user()
     return jsonify({"success": True, "message": "Logout bem-sucedido!"})
 
 
 # ---------------- LOGIN ----------------
-@app.route("/api/login", methods=["POST"])
+@api.route("/api/login", methods=["POST"])
 def api_login():
     try:
         data = request.get_json() or {}
@@ -75,6 +94,7 @@ def api_login():
         user = db.session.query(Usuario).filter_by(email=email, senha=senha).first()
         if user:
             login_user(user)  # cria cookie de sessão
+            identidade.registrar_login(user)
             return jsonify(
                 {
                     "success": True,
@@ -90,7 +110,7 @@ def api_login():
 
 
 # ---------------- REGISTRO ----------------
-@app.route("/api/registro", methods=["POST"])
+@api.route("/api/registro", methods=["POST"])
 def api_registro():
     data = request.get_json() or {}
     email = data.get("email")
@@ -118,7 +138,7 @@ def api_registro():
 
 
 # ---------------- PERFIL (protegido) ----------------
-@app.route("/api/user_profile", methods=["GET"])
+@api.route("/api/user_profile", methods=["GET"])
 @login_required
 def user_profile():
     try:
@@ -138,14 +158,23 @@ def user_profile():
         return jsonify({"success": False, "message": "Erro ao carregar perfil"}), 500
 
 
+# ---------------- ESTATÍSTICAS DO USUÁRIO ----------------
+# Contagem por status lida dos contadores materializados (ver estatisticas.py).
+@api.route("/api/user_profile/stats", methods=["GET"])
+@login_required
+def user_profile_stats():
+    dados = estatisticas.estatisticas_usuario(current_user.id)
+    return jsonify({"success": True, "usuario_id": current_user.id, **dados}), 200
+
+
 # ---------------- HOME ----------------
-@app.route("/api/home", methods=["GET"])
+@api.route("/api/home", methods=["GET"])
 def api_home():
     return jsonify({"message": "Bem-vindo à home!"})
 
 
 # ---------------- CRIAR JOGO ----------------
-@app.route("/api/jogos", methods=["POST"])
+@api.route("/api/jogos", methods=["POST"])
 def criar_jogo():
     data = request.get_json() or {}
     nome = data.get("nome_jogo")
@@ -164,26 +193,69 @@ def criar_jogo():
     )
     db.session.add(novo_jogo)
     db.session.commit()
+    incrementar_versao()  # invalida o cache/ETags do catálogo
+    busca.registrar_jogo(novo_jogo)  # o índice FTS é mantido pelos triggers do SQLite
     return jsonify({"success": True, "message": "Jogo adicionado com sucesso!"}), 201
 
 
+# ---------------- IMPORTAR JOGOS EM MASSA ----------------
+# Corpo da requisição = arquivo CSV ou JSONL (?formato=csv|jsonl&modo=inserir|upsert).
+# Por padrão só insere jogos novos; sobrescrever os existentes (upsert) pela
+# API exige IMPORTACAO_UPSERT_HTTP (o CLI `importar-jogos` não tem essa trava).
+# Se um lote falhar, os já gravados ficam e a resposta traz o relatório parcial.
+@api.route("/api/jogos/importar", methods=["POST"])
+@login_required
+def importar_jogos():
+    formato = request.args.get("formato") or (
+        "jsonl" if "json" in (request.mimetype or "") else "csv"
+    )
+    modo = request.args.get("modo", "inserir")
+    if formato not in importador.FORMATOS or modo not in importador.MODOS:
+        return jsonify({"success": False, "message": "formato ou modo inválido"}), 400
+    if modo == "upsert" and not current_app.config["IMPORTACAO_UPSERT_HTTP"]:
+        return jsonify({"success": False, "message": "modo upsert desabilitado na API"}), 403
+
+    relatorio = importador.importar_stream(request.stream, formato, modo=modo)
+    if relatorio.lotes_com_erro:
+        log.error("Importação com lotes recusados: %s", relatorio.lotes_com_erro)
+        return jsonify({"success": False, **relatorio.to_dict()}), 500
+    if relatorio.interrompida:
+        return jsonify({"success": False, **relatorio.to_dict()}), 400
+    return jsonify({"success": True, **relatorio.to_dict()}), 200
+
+
 # ---------------- LISTAR JOGOS ----------------
-@app.route("/api/jogos", methods=["GET"])
+# Sem parâmetros devolve a lista completa (compatibilidade com o front);
+# com ?limit/?cursor devolve uma página + proximo_cursor (keyset);
+# com ?stream=json|ndjson exporta o catálogo inteiro em pedaços.
+@api.route("/api/jogos", methods=["GET"])
+@cache_por_versao
 def listar_jogos():
     try:
-        jogos = Jogos.query.all()
-        lista = [
-            {
-                "id": j.id,
-                "nome_jogo": j.nome_jogo,
-                "ano_lancamento": j.ano_lancamento,
-                "plataforma": j.plataforma,
-                "avaliacao_media": j.avaliacao_media,
-                "image_url": j.image_url,
-            }
-            for j in jogos
-        ]
-        return jsonify(lista)
+        formato = request.args.get("stream")
+        if formato:
+            if formato not in ("json", "ndjson"):
+                return (
+                    jsonify({"success": False, "message": "stream deve ser json ou ndjson"}),
+                    400,
+                )
+            ordem, desc = ler_ordenacao(request.args)
+            campos = ler_campos(request.args)
+            mimetype = "application/x-ndjson" if formato == "ndjson" else "application/json"
+            return Response(
+                stream_with_context(stream_jogos(formato, ordem, desc, campos)),
+                mimetype=mimetype,
+            )
+
+        if "limit" in request.args or "cursor" in request.args:
+            jogos, proximo = pagina_jogos(request.args)
+            return RespostaJSON({"jogos": jogos, "proximo_cursor": proximo})
+
+        campos = ler_campos(request.args)
+        linhas = db.session.execute(select(*colunas(campos)))
+        return RespostaJSON(para_dicts(linhas, campos))
+    except ParametroInvalido as e:
+        return jsonify({"success": False, "message": str(e)}), 400
     except Exception as e:
         print(f"Erro ao listar jogos: {e}")
         return (
@@ -197,85 +269,251 @@ def listar_jogos():
         )
 
 
+# ---------------- CATÁLOGO COM FILTROS E FACETAS ----------------
+# ?plataforma=PC,Switch&ano_min=&ano_max=&nota_min=&ordem=-avaliacao_media
+# &limit=&cursor=&fields=; facetas por plataforma e década (?facetas=0 omite).
+@api.route("/api/jogos/catalogo", methods=["GET"])
+@cache_por_versao
+def catalogo_jogos():
+    try:
+        corpo = catalogo.pagina(request.args)  # já codificado (facetas vêm do cache)
+    except ParametroInvalido as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    return Response(corpo, mimetype="application/json")
+
+
 # ---------------- JOGOS RECENTES ----------------
-@app.route("/api/jogos/recentes", methods=["GET"])
+@api.route("/api/jogos/recentes", methods=["GET"])
+@cache_por_versao
 def get_jogos_recentes():
-    jogos = Jogos.query.order_by(Jogos.id.desc()).limit(4).all()
-    jogos_data = [
-        {
-            "id": jogo.id,
-            "nome_jogo": jogo.nome_jogo,
-            "ano_lancamento": jogo.ano_lancamento,
-            "plataforma": jogo.plataforma,
-            "avaliacao_media": jogo.avaliacao_media,
-            "image_url": getattr(jogo, "image_url", None),
-        }
-        for jogo in jogos
-    ]
-    return jsonify(jogos_data)
+    try:
+        campos = ler_campos(request.args)
+    except ParametroInvalido as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    stmt = select(*colunas(campos)).order_by(Jogos.id.desc()).limit(4)
+    return RespostaJSON(para_dicts(db.session.execute(stmt), campos))
+
+
+# ---------------- JOGOS POPULARES ----------------
+# Jogos presentes em mais bibliotecas (?limit=, ?fields=); cada item traz "bibliotecas".
+@api.route("/api/jogos/populares", methods=["GET"])
+def get_jogos_populares():
+    try:
+        limite = ler_limite(
+            request.args, estatisticas.POPULARES_PADRAO, estatisticas.POPULARES_MAXIMO
+        )
+        campos = ler_campos(request.args)
+    except ParametroInvalido as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    return RespostaJSON(estatisticas.populares(limite, campos))
 
 
 # ---------------- PESQUISAR JOGOS ----------------
-@app.route("/api/jogos/pesquisa", methods=["GET"])
+# Busca ranqueada e paginada (?q=&limit=&offset=) sobre nome e plataforma.
+@api.route("/api/jogos/pesquisa", methods=["GET"])
+@cache_por_versao
 def pesquisar_jogos():
     termo = request.args.get("q", "")
-    resultados = Jogos.query.filter(Jogos.nome_jogo.ilike(f"%{termo}%")).all()
-    lista = [
-        {
-            "id": j.id,
-            "nome_jogo": j.nome_jogo,
-            "ano_lancamento": j.ano_lancamento,
-            "plataforma": j.plataforma,
-            "avaliacao_media": j.avaliacao_media,
-            "image_url": j.image_url,
-        }
-        for j in resultados
-    ]
-    return jsonify(lista)
+    try:
+        limite = ler_limite(request.args, busca.LIMITE_PADRAO, busca.LIMITE_MAXIMO)
+        offset = max(int(request.args.get("offset", 0)), 0)
+        campos = ler_campos(request.args)
+    except (ParametroInvalido, ValueError) as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    return RespostaJSON(busca.pesquisar(termo, limite, offset, campos))
+
+
+# ---------------- AUTOCOMPLETE ----------------
+# Top-N jogos cujo nome começa com ?q= (índice em memória, sem ir ao banco).
+@api.route("/api/jogos/pesquisa/autocomplete", methods=["GET"])
+def autocomplete_jogos():
+    try:
+        n = ler_limite(
+            {"limit": request.args.get("n", busca.AUTOCOMPLETE_PADRAO)},
+            busca.AUTOCOMPLETE_PADRAO,
+            busca.AUTOCOMPLETE_MAXIMO,
+        )
+    except ParametroInvalido as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    return jsonify(busca.autocomplete(request.args.get("q", ""), n))
 
 
 # ---------------- OBTÉM 1 JOGO POR ID ----------------
-@app.route("/api/jogos/<int:id>", methods=["GET"])
+@api.route("/api/jogos/<int:id>", methods=["GET"])
+@cache_por_versao
 def get_jogo(id):
-    jogo = db.session.query(Jogos).get(id)
-    if not jogo:
+    try:
+        campos = ler_campos(request.args)
+    except ParametroInvalido as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    linha = db.session.execute(select(*colunas(campos)).where(Jogos.id == id)).first()
+    if linha is None:
         return jsonify({"error": "Jogo não encontrado"}), 404
 
+    return RespostaJSON(dict(zip(campos, linha)))
+
+
+# ---------------- CAPA DO JOGO ----------------
+# Miniatura local (?tamanho=pequena|grande) com ETag; Cache-Control longo na URL
+# versionada (?v=). Se ainda não foi baixada, redireciona para a image_url e
+# agenda o download.
+@api.route("/api/jogos/<int:id>/capa", methods=["GET"])
+def get_capa(id):
+    tamanho = request.args.get("tamanho", capas.TAMANHO_PADRAO)
+    if tamanho not in capas.TAMANHOS:
+        opcoes = ", ".join(capas.TAMANHOS)
+        return jsonify({"success": False, "message": f"tamanho deve ser um de: {opcoes}"}), 400
+
+    capa = capas.localizar(id, tamanho)
+    if capa is None:
+        return jsonify({"error": "Capa não encontrada"}), 404
+    if capa.caminho is None:
+        if not capa.url_origem.startswith(("http://", "https://")):
+            return jsonify({"error": "Capa não encontrada"}), 404
+        resposta = redirect(capa.url_origem)
+        resposta.headers["Cache-Control"] = "no-store"  # na próxima vez já pode ser local
+        return resposta
+
+    # Cache longo só na URL com a versão atual desta capa (a capa_url das
+    # respostas); sem ?v=, com uma versão antiga ou na provisória (original
+    # enquanto a miniatura é gerada), o navegador revalida pela ETag a cada uso
+    versionada = capa.versao is not None and request.args.get("v") == capa.versao
+    if versionada and not capa.provisoria:
+        max_age = current_app.config["CAPAS_MAX_AGE"]
+    else:
+        max_age = 0
+    resposta = send_file(
+        capa.caminho, mimetype=capa.mimetype, etag=capa.etag, max_age=max_age, conditional=True
+    )
+    if not max_age:
+        resposta.cache_control.no_cache = True
+    return resposta
+
+
+# ---------------- JOGOS SIMILARES ----------------
+# Lidos de jogos_similares (calculada por `flask recalcular-recomendacoes`).
+@api.route("/api/jogos/<int:id>/similares", methods=["GET"])
+def get_jogos_similares(id):
+    try:
+        limite = ler_limite(request.args, recomendacoes.SIMILARES_PADRAO, recomendacoes.K_PADRAO)
+        campos = ler_campos(request.args)
+    except ParametroInvalido as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    return RespostaJSON(recomendacoes.similares(id, limite, campos))
+
+
+# ---------------- ESTATÍSTICAS DO CACHE ----------------
+@api.route("/api/cache/estatisticas", methods=["GET"])
+def estatisticas_cache():
     return jsonify(
         {
-            "id": jogo.id,
-            "nome_jogo": jogo.nome_jogo,
-            "ano_lancamento": jogo.ano_lancamento,
-            "plataforma": jogo.plataforma,
-            "avaliacao_media": jogo.avaliacao_media,
-            "image_url": getattr(jogo, "image_url", None),
+            "catalogo": cache_catalogo.estatisticas(),
+            "facetas": catalogo.cache_facetas.estatisticas(),
+            "identidades": identidade.identidades.estatisticas(),
+            "escrita": escritor.estatisticas(),
         }
     )
 
 
+# ---------------- MÉTRICAS (formato Prometheus) ----------------
+@api.route("/api/metrics", methods=["GET"])
+def exportar_metricas():
+    catalogo = cache_catalogo.estatisticas()
+    identidades = identidade.identidades.estatisticas()
+    extras = [
+        ("gamebox_cache_catalogo_hits_total", "counter", "Acertos do cache do catálogo.", catalogo["hits"]),
+        ("gamebox_cache_catalogo_misses_total", "counter", "Faltas do cache do catálogo.", catalogo["misses"]),
+        ("gamebox_cache_catalogo_304_total", "counter", "Respostas 304 do catálogo.", catalogo["nao_modificados"]),
+        ("gamebox_cache_catalogo_bytes", "gauge", "Bytes no cache do catálogo.", catalogo["bytes"]),
+        ("gamebox_identidades_consultas_total", "counter", "Usuários carregados do banco.", identidades["consultas"]),
+        ("gamebox_identidades_evitadas_total", "counter", "Carregamentos de usuário sem ir ao banco.", identidades["consultas_evitadas"]),
+    ]
+    escrita = escritor.estatisticas()
+    if escrita is not None:
+        extras += [
+            ("gamebox_escrita_lotes_total", "counter", "Transações da escrita agrupada.", escrita["lotes"]),
+            ("gamebox_escrita_pedidos_total", "counter", "Pedidos gravados pela escrita agrupada.", escrita["pedidos"]),
+            ("gamebox_escrita_recusados_total", "counter", "Pedidos recusados com a fila cheia.", escrita["recusados"]),
+            ("gamebox_escrita_na_fila", "gauge", "Pedidos esperando a thread escritora.", escrita["na_fila"]),
+        ]
+    return Response(metricas.exportar(extras), mimetype="text/plain; version=0.0.4")
+
+
 # ---------------- BIBLIOTECA (protegidas) ----------------
-@app.route("/api/biblioteca", methods=["GET"])
+# Filtros: ?status=jogando[,na fila]  Ordem: ?ordem=[-]data_adicao|nome_jogo|ano_lancamento
+# Com ?limit/?cursor devolve uma página + proximo_cursor; sem eles, a lista inteira.
+@api.route("/api/biblioteca", methods=["GET"])
 @login_required
 def get_biblioteca():
-    entries = Biblioteca.query.filter_by(usuario_id=current_user.id).all()
-    out = []
-    for e in entries:
-        if e.jogo:
-            out.append(
-                {
-                    "id": e.jogo.id,
-                    "nome_jogo": e.jogo.nome_jogo,
-                    "status": e.status,
-                    "data_adicao": e.data_adicao.isoformat(),
-                    "ano_lancamento": e.jogo.ano_lancamento,
-                    "plataforma": e.jogo.plataforma,
-                    "image_url": e.jogo.image_url,
-                }
-            )
-    return jsonify(out), 200
+    try:
+        itens, proximo = biblioteca.listar_biblioteca(current_user.id, request.args)
+    except ParametroInvalido as e:
+        return jsonify({"erro": str(e)}), 400
+
+    if biblioteca.paginado(request.args):
+        return RespostaJSON({"jogos": itens, "proximo_cursor": proximo})
+    return RespostaJSON(itens)
+
+
+# ---------------- SINCRONIZAR BIBLIOTECA ----------------
+# ?since=<cursor da última resposta> devolve só os jogos alterados e os ids
+# removidos desde então; sem ele (ou com completo=true na resposta), tudo.
+@api.route("/api/biblioteca/sync", methods=["GET"])
+@login_required
+def sincronizar_biblioteca():
+    try:
+        campos = ler_campos(request.args, CAMPOS_BIBLIOTECA)
+        resposta = sincronizacao.sincronizar(current_user.id, request.args.get("since"), campos)
+    except ParametroInvalido as e:
+        return jsonify({"erro": str(e)}), 400
+    return RespostaJSON(resposta)
+
+
+# ---------------- RECOMENDADOS PARA O USUÁRIO ----------------
+@api.route("/api/biblioteca/recomendacoes", methods=["GET"])
+@login_required
+def get_recomendacoes():
+    try:
+        limite = ler_limite(
+            request.args, recomendacoes.RECOMENDADOS_PADRAO, recomendacoes.RECOMENDADOS_MAXIMO
+        )
+        campos = ler_campos(request.args)
+    except ParametroInvalido as e:
+        return jsonify({"erro": str(e)}), 400
+
+    return RespostaJSON(recomendacoes.recomendados(current_user.id, limite, campos))
+
 
 # ---------------- ADICIONAR JOGO À BIBLIOTECA ----------------
-@app.route("/api/biblioteca/adicionar", methods=["POST"])
+# As rotas individuais usam o mesmo caminho das alterações em lote (uma operação),
+# direto ou pela fila da escrita agrupada (ver escritor.py).
+def _fila_cheia():
+    resposta = jsonify({"erro": "Servidor ocupado, tente novamente"})
+    resposta.headers["Retry-After"] = "1"
+    return resposta, 503
+
+
+def _responder_operacao(op, erro_interno):
+    try:
+        (resultado,) = escritor.aplicar(current_user.id, [op])
+    except escritor.FilaCheia:
+        return _fila_cheia()
+    except Exception:
+        return jsonify({"erro": erro_interno}), 500
+
+    codigo = biblioteca.CODIGOS_HTTP[resultado["resultado"]]
+    if "erro" in resultado:
+        return jsonify({"erro": resultado["erro"]}), codigo
+    return jsonify({"mensagem": resultado["mensagem"]}), codigo
+
+
+@api.route("/api/biblioteca/adicionar", methods=["POST"])
 @login_required
 def adicionar_jogo_biblioteca():
     data = request.get_json() or {}
@@ -284,38 +522,19 @@ def adicionar_jogo_biblioteca():
 
     if not jogo_id:
         return jsonify({"erro": "ID do jogo é obrigatório"}), 400
-
-    jogo = Jogos.query.get(jogo_id)
-    if not jogo:
+    try:
+        jogo_id = int(jogo_id)  # o front envia o id vindo da URL (string)
+    except (TypeError, ValueError):
         return jsonify({"erro": "Jogo não encontrado"}), 404
 
-    existe = Biblioteca.query.filter_by(
-        usuario_id=current_user.id, jogo_id=jogo_id
-    ).first()
-    if existe:
-        return jsonify({"mensagem": "Jogo já está na sua biblioteca"}), 200
-
-    try:
-        nova_entrada = Biblioteca(
-            usuario_id=current_user.id, jogo_id=jogo_id, status=status
-        )
-        db.session.add(nova_entrada)
-        db.session.commit()
-        return (
-            jsonify(
-                {
-                    "mensagem": f'Jogo "{jogo.nome_jogo}" adicionado à biblioteca com status "{status}"'
-                }
-            ),
-            201,
-        )
-    except Exception:
-        db.session.rollback()
-        return jsonify({"erro": "Erro ao adicionar jogo à biblioteca"}), 500
+    return _responder_operacao(
+        {"op": "adicionar", "jogo_id": jogo_id, "status": status},
+        "Erro ao adicionar jogo à biblioteca",
+    )
 
 
 # ---------------- ATUALIZAR STATUS DE JOGO ----------------
-@app.route("/api/biblioteca/status/<int:jogo_id>", methods=["PUT"])
+@api.route("/api/biblioteca/status/<int:jogo_id>", methods=["PUT"])
 @login_required
 def atualizar_status_jogo(jogo_id):
     data = request.get_json() or {}
@@ -323,62 +542,114 @@ def atualizar_status_jogo(jogo_id):
     if not novo_status:
         return jsonify({"erro": "Novo status é obrigatório"}), 400
 
-    entrada = Biblioteca.query.filter_by(
-        usuario_id=current_user.id, jogo_id=jogo_id
-    ).first()
-    if not entrada:
-        return jsonify({"erro": "Jogo não encontrado na sua biblioteca"}), 404
-
-    try:
-        entrada.status = novo_status
-        db.session.commit()
-        return (
-            jsonify(
-                {
-                    "mensagem": f'Status do jogo (ID: {jogo_id}) atualizado para "{novo_status}"'
-                }
-            ),
-            200,
-        )
-    except Exception:
-        db.session.rollback()
-        return jsonify({"erro": "Erro ao atualizar status"}), 500
+    return _responder_operacao(
+        {"op": "atualizar", "jogo_id": jogo_id, "status": novo_status},
+        "Erro ao atualizar status",
+    )
 
 
 # ---------------- REMOVER JOGO DA BIBLIOTECA ----------------
-@app.route("/api/biblioteca/remover/<int:jogo_id>", methods=["DELETE"])
+@api.route("/api/biblioteca/remover/<int:jogo_id>", methods=["DELETE"])
 @login_required
 def remover_jogo_biblioteca(jogo_id):
-    entrada = Biblioteca.query.filter_by(
-        usuario_id=current_user.id, jogo_id=jogo_id
-    ).first()
-    if not entrada:
-        return jsonify({"erro": "Jogo não encontrado na sua biblioteca"}), 404
+    return _responder_operacao(
+        {"op": "remover", "jogo_id": jogo_id}, "Erro ao remover jogo da biblioteca"
+    )
 
-    try:
-        db.session.delete(entrada)
-        db.session.commit()
+
+# ---------------- ALTERAÇÕES EM LOTE NA BIBLIOTECA ----------------
+# Corpo: {"operacoes": [{"op": "adicionar"|"atualizar"|"remover", "jogo_id": 1,
+#                        "status": "jogando"}, ...]} — tudo numa única transação.
+@api.route("/api/biblioteca/batch", methods=["POST"])
+@login_required
+def alterar_biblioteca_em_lote():
+    data = request.get_json(silent=True) or {}
+    operacoes = data.get("operacoes")
+    if not isinstance(operacoes, list) or not operacoes:
+        return jsonify({"erro": "operacoes deve ser uma lista não vazia"}), 400
+    if len(operacoes) > biblioteca.MAX_OPERACOES:
         return (
-            jsonify({"mensagem": f"Jogo (ID: {jogo_id}) removido da biblioteca"}),
-            200,
+            jsonify({"erro": f"máximo de {biblioteca.MAX_OPERACOES} operações por lote"}),
+            400,
         )
+
+    try:
+        resultados = escritor.aplicar(current_user.id, operacoes)
+    except escritor.FilaCheia:
+        return _fila_cheia()
     except Exception:
-        db.session.rollback()
-        return jsonify({"erro": "Erro ao remover jogo da biblioteca"}), 500
+        log.exception("Erro no lote da biblioteca do usuário %s", current_user.id)
+        return jsonify({"erro": "Erro ao alterar a biblioteca"}), 500
 
+    falhas = sum(1 for r in resultados if "erro" in r)
+    return (
+        jsonify(
+            {
+                "total": len(resultados),
+                "sucesso": len(resultados) - falhas,
+                "falhas": falhas,
+                "resultados": resultados,
+            }
+        ),
+        200,
+    )
 
-# ---------------- INICIALIZAÇÃO ----------------
-if __name__ == "__main__":
-    with app.app_context():
-        db.create_all()
-        # cria usuário padrão se não existir
-        if not Usuario.query.filter_by(email="user@example.com").first():
-            db.session.add(
-                Usuario(username="teste", email="user@example.com", senha="senha123")
-            )
-            db.session.commit()
-            print("Usuário 'user@example.com' adicionado.")
-        else:
-            print("Usuário 'user@example.com' já existe.")
 
-    app.run(debug=True, port=5000)
+# ---------------- LOTE DE LEITURAS ----------------
+# Corpo: {"requisicoes": ["/api/user_profile", "/api/biblioteca/sync?since=..."],
+#         "paralelo": false} — devolve {"respostas": [{"status", "corpo"}, ...]}
+# na mesma ordem, com a sessão e o usuário desta requisição (ver lote.py).
+@api.route("/api/batch", methods=["POST"])
+def lote_requisicoes():
+    data = request.get_json(silent=True) or {}
+    try:
+        urls = lote.ler_urls(data, current_app.config["LOTE_MAX_REQUISICOES"])
+    except ParametroInvalido as e:
+        return jsonify({"erro": str(e)}), 400
+    corpo = lote.executar(urls, paralelo=bool(data.get("paralelo")))
+    return Response(corpo, mimetype="application/json")
+
+
+# ---------------- APLICAÇÃO ----------------
+def create_app(config=None):
+    """Cria a aplicação: Config (variáveis GAMEBOX_*), depois o arquivo apontado
+    por GAMEBOX_CONFIG e por fim o dicionário `config` (útil em testes/benchmarks)."""
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    app.config.from_envvar("GAMEBOX_CONFIG", silent=True)
+    if config:
+        app.config.update(config)
+
+    init_db(app)  # engine, pool e PRAGMAs do SQLite (ver db.py)
+    init_metricas(app)  # latência/SQL por rota, N+1 e queries lentas (ver metricas.py)
+    init_cache(app)  # cache das respostas do catálogo (ver cache.py)
+    identidade.init_identidade(app)
+    lm.init_app(app)
+
+    # ---------------- CORS (compatível com Vite:5173) ----------------
+    CORS(
+        app,
+        resources={r"/api/*": {"origins": ["http://localhost:5173"]}},
+        supports_credentials=True,  # envia/recebe cookie de sessão
+        allow_headers=["Content-Type", "Authorization"],  # aceita Content-Type no preflight
+        expose_headers=["Content-Type", "Authorization"],
+        methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+    )
+
+    app.register_blueprint(api)
+    app.cli.add_command(inicializacao.comando_iniciar_banco)  # flask --app main iniciar-banco
+    app.cli.add_command(inicializacao.comando_semear)  # flask --app main semear
+    app.cli.add_command(importador.comando_importar)  # flask --app main importar-jogos
+    app.cli.add_command(gerar_dados.comando_gerar_dados)  # flask --app main gerar-dados
+    app.cli.add_command(estatisticas.comando_reconstruir)  # flask --app main reconstruir-estatisticas
+    app.cli.add_command(recomendacoes.comando_recalcular)  # flask --app main recalcular-recomendacoes
+    app.cli.add_command(capas.comando_gerar_capas)  # flask --app main gerar-capas
+    app.cli.add_command(sincronizacao.comando_compactar)  # flask --app main compactar-alteracoes
+    return app
+
+
+# ---------------- SERVIDOR DE DESENVOLVIMENTO ----------------
+# Só sobe o servidor de debug; o banco é preparado por `flask --app main
+# iniciar-banco` / `semear` e, em produção, use o gunicorn (gunicorn.conf.py).
+if __name__ == "__main__":
+    create_app().run(debug=os.environ.get("GAMEBOX_DEBUG", "1") == "1", port=5000)
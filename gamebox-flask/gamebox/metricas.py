@@ -0,0 +1,280 @@
+# metricas.py
+# Instrumentação de requisições e SQL: latência por rota (histograma), queries
+# e tempo de SQL por requisição, detector de N+1 (mesmo SQL repetido dentro de
+# uma requisição) e log de queries lentas com os parâmetros. Tudo é exposto no
+# formato texto do Prometheus em /api/metrics.
+#
+# Modos (METRICAS_MODO): "completo" (padrão), "leve" (sem guardar o texto de
+# cada SQL, ou seja, sem detector de N+1 — feito para ficar ligado em produção)
+# e "desligado". As métricas são por processo.
+import logging
+import threading
+import time
+from collections import Counter
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+from db import db
+
+log_lento = logging.getLogger("gamebox.sql_lento")
+log_n_mais_um = logging.getLogger("gamebox.n_mais_um")
+
+MODOS = ("completo", "leve", "desligado")
+LIMIAR_LENTO_MS_PADRAO = 100.0
+LIMIAR_N_MAIS_UM_PADRAO = 5  # mesmo SQL executado N+ vezes numa requisição
+TAMANHO_MAX_PARAMETROS = 500
+
+BUCKETS_SEGUNDOS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+BUCKETS_QUERIES = (0, 1, 2, 3, 5, 10, 20, 50, 100, 500)
+
+
+class Histograma:
+    def __init__(self, nome, ajuda, buckets):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.buckets = buckets
+        self.series = {}  # labels -> [contagens por bucket..., soma, total]
+
+    def observar(self, labels, valor):
+        serie = self.series.get(labels)
+        if serie is None:
+            serie = self.series[labels] = [0] * len(self.buckets) + [0.0, 0]
+        for i, limite in enumerate(self.buckets):
+            if valor <= limite:
+                serie[i] += 1
+        serie[-2] += valor
+        serie[-1] += 1
+
+    def exportar(self):
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} histogram"]
+        for labels, serie in sorted(self.series.items()):
+            base = _labels(labels)
+            for limite, contagem in zip(self.buckets, serie):
+                linhas.append(f'{self.nome}_bucket{_labels(labels, le=limite)} {contagem}')
+            linhas.append(f'{self.nome}_bucket{_labels(labels, le="+Inf")} {serie[-1]}')
+            linhas.append(f"{self.nome}_sum{base} {serie[-2]:.6f}")
+            linhas.append(f"{self.nome}_count{base} {serie[-1]}")
+        return linhas
+
+
+def _labels(pares, **extra):
+    itens = list(pares) + [(k, v) for k, v in extra.items()]
+    if not itens:
+        return ""
+    texto = ",".join(
+        '%s="%s"' % (k, str(v).replace("\\", "\\\\").replace('"', '\\"')) for k, v in itens
+    )
+    return "{" + texto + "}"
+
+
+class Metricas:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.modo = "completo"
+        self.limiar_lento = LIMIAR_LENTO_MS_PADRAO / 1000
+        self.limiar_n_mais_um = LIMIAR_N_MAIS_UM_PADRAO
+        self.zerar()
+
+    def zerar(self):
+        with self.lock:
+            self.latencia = Histograma(
+                "gamebox_requisicao_segundos", "Latência das requisições por rota.", BUCKETS_SEGUNDOS
+            )
+            self.queries = Histograma(
+                "gamebox_requisicao_queries", "Queries SQL por requisição.", BUCKETS_QUERIES
+            )
+            self.tempo_sql = Histograma(
+                "gamebox_requisicao_sql_segundos", "Tempo gasto em SQL por requisição.", BUCKETS_SEGUNDOS
+            )
+            self.requisicoes = Counter()  # (rota, método, status) -> total
+            self.n_mais_um = Counter()  # rota -> requisições com N+1 suspeito
+            self.lentas = Counter()  # rota -> queries lentas
+            self.queries_fora = 0  # queries fora de requisições (CLI, threads)
+
+    def registrar_requisicao(self, rota, metodo, status, segundos, queries, tempo_sql):
+        with self.lock:
+            labels = (("rota", rota), ("metodo", metodo))
+            self.latencia.observar(labels, segundos)
+            self.queries.observar(labels, queries)
+            self.tempo_sql.observar(labels, tempo_sql)
+            self.requisicoes[(rota, metodo, status)] += 1
+
+    def contar(self, contador, chave):
+        with self.lock:
+            getattr(self, contador)[chave] += 1
+
+    def exportar(self, extras=()):
+        with self.lock:
+            linhas = []
+            for hist in (self.latencia, self.queries, self.tempo_sql):
+                linhas += hist.exportar()
+            linhas += [
+                "# HELP gamebox_requisicoes_total Requisições atendidas.",
+                "# TYPE gamebox_requisicoes_total counter",
+            ]
+            for (rota, metodo, status), total in sorted(self.requisicoes.items()):
+                linhas.append(
+                    "gamebox_requisicoes_total"
+                    + _labels((("rota", rota), ("metodo", metodo), ("status", status)))
+                    + f" {total}"
+                )
+            for nome, ajuda, contador in (
+                ("gamebox_n_mais_um_total", "Requisições com SQL repetido (N+1).", self.n_mais_um),
+                ("gamebox_sql_lentas_total", "Queries acima do limiar de lentidão.", self.lentas),
+            ):
+                linhas += [f"# HELP {nome} {ajuda}", f"# TYPE {nome} counter"]
+                for rota, total in sorted(contador.items()):
+                    linhas.append(f"{nome}{_labels((('rota', rota),))} {total}")
+            linhas += [
+                "# HELP gamebox_sql_fora_de_requisicao_total Queries fora de requisições.",
+                "# TYPE gamebox_sql_fora_de_requisicao_total counter",
+                f"gamebox_sql_fora_de_requisicao_total {self.queries_fora}",
+            ]
+        for nome, tipo, ajuda, valor in extras:
+            linhas += [f"# HELP {nome} {ajuda}", f"# TYPE {nome} {tipo}", f"{nome} {valor}"]
+        return "\n".join(linhas) + "\n"
+
+
+metricas = Metricas()
+
+
+# ---------------- HOOKS DO FLASK ----------------
+# O registro fica no teardown_request, que roda mesmo quando a view levanta
+# uma exceção sem handler (o after_request não roda nesse caso): sem status
+# anotado pelo after_request, a requisição conta como 500.
+def _abrir_contagem(requisicao):
+    g.metricas_requisicao = requisicao
+    g.metricas_inicio = time.perf_counter()
+    g.metricas_queries = 0
+    g.metricas_tempo_sql = 0.0
+    g.metricas_sql = Counter() if metricas.modo == "completo" else None
+
+
+def _inicio_requisicao():
+    _abrir_contagem(request._get_current_object())
+
+
+def _status_resposta(resposta):
+    g.metricas_status = resposta.status_code
+    return resposta
+
+
+def _fim_requisicao(erro=None):
+    # Sub-requisições de /api/batch (lote.py) dividem o `g` da requisição
+    # externa e não passaram pelo before_request: quem registra é a externa
+    if g.get("metricas_requisicao") is not request._get_current_object():
+        return
+    inicio = g.pop("metricas_inicio", None)
+    if inicio is None:
+        return
+    rota = request.url_rule.rule if request.url_rule else "nao_encontrada"
+    metricas.registrar_requisicao(
+        rota,
+        request.method,
+        g.pop("metricas_status", 500),
+        time.perf_counter() - inicio,
+        g.metricas_queries,
+        g.metricas_tempo_sql,
+    )
+
+    repetidas = g.metricas_sql
+    if repetidas:
+        sql, vezes = repetidas.most_common(1)[0]
+        if vezes >= metricas.limiar_n_mais_um:
+            metricas.contar("n_mais_um", rota)
+            log_n_mais_um.warning("%s: SQL repetido %d vezes: %s", rota, vezes, sql)
+
+
+# ---------------- THREADS AUXILIARES ----------------
+# Uma thread com contexto próprio (ex.: /api/batch paralelo, lote.py) tem outro
+# `g`: sem isto as queries dela contariam como fora de requisição. A thread
+# abre uma contagem marcada com a requisição externa (o teardown das
+# sub-requisições não registra nada) e a externa soma o que ela devolver.
+def requisicao_medida():
+    """Requisição cujas queries estão sendo contadas, ou None."""
+    return g.get("metricas_requisicao") if has_request_context() and "metricas_inicio" in g else None
+
+
+def contar_em_thread(requisicao, funcao, *args):
+    """(resultado, contagem) de funcao(*args) com as queries contadas à parte."""
+    if requisicao is None:
+        return funcao(*args), None
+    _abrir_contagem(requisicao)
+    try:
+        return funcao(*args), (g.metricas_queries, g.metricas_tempo_sql, g.metricas_sql)
+    finally:
+        del g.metricas_inicio
+
+
+def somar_contagem(contagem):
+    if contagem is None or "metricas_inicio" not in g:
+        return
+    queries, tempo_sql, sql = contagem
+    g.metricas_queries += queries
+    g.metricas_tempo_sql += tempo_sql
+    if sql and g.metricas_sql is not None:
+        g.metricas_sql.update(sql)
+
+
+# ---------------- EVENTOS DO SQLALCHEMY ----------------
+def _antes_sql(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metricas_inicio", []).append(time.perf_counter())
+
+
+def _depois_sql(conn, cursor, statement, parameters, context, executemany):
+    _fim_sql(conn, statement, parameters)
+
+
+def _erro_sql(contexto):
+    # Sem isso o início empilhado por _antes_sql ficaria na conexão e
+    # desalinharia os tempos seguintes; a query que falhou também conta
+    if contexto.connection is not None and contexto.statement is not None:
+        _fim_sql(contexto.connection, contexto.statement, contexto.parameters)
+
+
+def _fim_sql(conn, statement, parameters):
+    pilha = conn.info.get("metricas_inicio")
+    if not pilha:
+        return
+    duracao = time.perf_counter() - pilha.pop()
+
+    dentro = has_request_context() and "metricas_inicio" in g
+    if dentro:
+        g.metricas_queries += 1
+        g.metricas_tempo_sql += duracao
+        if g.metricas_sql is not None:
+            g.metricas_sql[statement] += 1
+    else:
+        with metricas.lock:
+            metricas.queries_fora += 1
+
+    if duracao >= metricas.limiar_lento:
+        rota = request.url_rule.rule if dentro and request.url_rule else "-"
+        metricas.contar("lentas", rota)
+        parametros = repr(parameters)
+        if len(parametros) > TAMANHO_MAX_PARAMETROS:
+            parametros = parametros[:TAMANHO_MAX_PARAMETROS] + "..."
+        log_lento.warning(
+            "%.1f ms em %s\nSQL: %s\nParâmetros: %s", duracao * 1000, rota, statement, parametros
+        )
+
+
+def init_metricas(app):
+    modo = app.config.get("METRICAS_MODO", "completo")
+    if modo not in MODOS:
+        raise ValueError(f"METRICAS_MODO deve ser um de {MODOS}")
+    metricas.modo = modo
+    metricas.limiar_lento = app.config.get("METRICAS_LENTA_MS", LIMIAR_LENTO_MS_PADRAO) / 1000
+    metricas.limiar_n_mais_um = app.config.get("METRICAS_N_MAIS_UM", LIMIAR_N_MAIS_UM_PADRAO)
+    if modo == "desligado":
+        return
+
+    app.before_request(_inicio_requisicao)
+    app.after_request(_status_resposta)
+    app.teardown_request(_fim_requisicao)
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", _antes_sql)
+        event.listen(db.engine, "after_cursor_execute", _depois_sql)
+        event.listen(db.engine, "handle_error", _erro_sql)
+
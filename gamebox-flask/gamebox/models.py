@@ -18,6 +18,10 @@ class Biblioteca(db.Model):
 
     __table_args__ = ( # Garante que um mesmo usuário não adicione o mesmo jogo mais de uma vez
         db.UniqueConstraint("usuario_id", "jogo_id", name="_usuario_jogo_uc"),
+        # Atende GET /api/biblioteca: filtro por usuário/status e ordenação por data
+        db.Index("ix_biblioteca_usuario_status_data", "usuario_id", "status", "data_adicao"),
+        # Quem tem cada jogo (recomendações: usuários de um jogo -> outros jogos deles)
+        db.Index("ix_biblioteca_jogo_usuario", "jogo_id", "usuario_id"),
     )
 
     usuario = db.relationship( # Relacionamentos com as tabelas Usuario e Jogos
@@ -46,4 +50,100 @@ class Jogos(db.Model):
     plataforma = db.Column(db.String(200))
     avaliacao_media = db.Column(db.Float)
     image_url = db.Column(db.String(255))
-  
+
+    # Catálogo com filtros e ordenação (ver catalogo.py e paginacao.py). No
+    # SQLite o id (rowid) fecha todo índice, então ele já é o desempate do keyset.
+    __table_args__ = (
+        # Plataforma + faixa de anos; cobre as contagens das facetas sem ler a tabela
+        db.Index("ix_jogos_plataforma_ano_avaliacao", "plataforma", "ano_lancamento", "avaliacao_media"),
+        db.Index("ix_jogos_plataforma_avaliacao", "plataforma", "avaliacao_media"),
+        db.Index("ix_jogos_plataforma_nome", "plataforma", "nome_jogo"),
+        db.Index("ix_jogos_avaliacao", "avaliacao_media"),
+        db.Index("ix_jogos_ano", "ano_lancamento"),
+    )
+
+
+# ---------------- CONTADORES (mantidos por estatisticas.py) ----------------
+# Quantos jogos cada usuário tem em cada status; uma linha por (usuário, status)
+class EstatisticaUsuario(db.Model):
+    __tablename__ = "estatisticas_usuario"
+
+    usuario_id = db.Column(db.Integer, db.ForeignKey("usuarios.id"), primary_key=True)
+    status = db.Column(db.String(50), primary_key=True)
+    total = db.Column(db.Integer, nullable=False, default=0)
+
+
+# Em quantas bibliotecas cada jogo está
+class PopularidadeJogo(db.Model):
+    __tablename__ = "popularidade_jogos"
+
+    jogo_id = db.Column(db.Integer, db.ForeignKey("jogos.id"), primary_key=True)
+    total = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        # Atende GET /api/jogos/populares: top-N lido direto do índice
+        db.Index("ix_popularidade_total", "total", "jogo_id"),
+    )
+
+
+# ---------------- RECOMENDAÇÕES (calculadas por recomendacoes.py) ----------------
+# Top-K jogos mais parecidos com cada jogo, já na ordem de exibição
+class JogoSimilar(db.Model):
+    __tablename__ = "jogos_similares"
+
+    jogo_id = db.Column(db.Integer, db.ForeignKey("jogos.id"), primary_key=True)
+    posicao = db.Column(db.Integer, primary_key=True)
+    similar_id = db.Column(db.Integer, db.ForeignKey("jogos.id"), nullable=False)
+    score = db.Column(db.Float, nullable=False)
+
+
+# Jogos que entraram ou saíram de alguma biblioteca desde o último cálculo
+class RecomendacaoPendente(db.Model):
+    __tablename__ = "recomendacoes_pendentes"
+
+    jogo_id = db.Column(db.Integer, db.ForeignKey("jogos.id"), primary_key=True)
+
+
+# ---------------- SINCRONIZAÇÃO (mantida por sincronizacao.py) ----------------
+# Log só de acréscimos: cada jogo que entrou, mudou de status ou saiu da
+# biblioteca, gravado na mesma transação da alteração. O id é o cursor de
+# GET /api/biblioteca/sync.
+class AlteracaoBiblioteca(db.Model):
+    __tablename__ = "alteracoes_biblioteca"
+
+    id = db.Column(db.Integer, primary_key=True)
+    usuario_id = db.Column(db.Integer, db.ForeignKey("usuarios.id"), nullable=False)
+    jogo_id = db.Column(db.Integer, db.ForeignKey("jogos.id"), nullable=False)
+    status = db.Column(db.String(50))  # None = removido
+    criado_em = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Alterações de um usuário depois de um cursor, já em ordem
+        db.Index("ix_alteracoes_usuario_id", "usuario_id", "id"),
+        # Sem AUTOINCREMENT o SQLite reaproveita o maior id depois que a
+        # compactação o apaga, e um cursor antigo pularia a alteração nova
+        {"sqlite_autoincrement": True},
+    )
+
+
+# Maior id de alteração já apagado pela compactação, por usuário: cursores
+# anteriores a ele recebem a biblioteca inteira
+class HorizonteSincronizacao(db.Model):
+    __tablename__ = "horizontes_sincronizacao"
+
+    usuario_id = db.Column(db.Integer, db.ForeignKey("usuarios.id"), primary_key=True)
+    alteracao_id = db.Column(db.Integer, nullable=False)
+
+
+# ---------------- CAPAS (cache local mantido por capas.py) ----------------
+# Última capa baixada de cada jogo: o sha256 endereça o arquivo em disco e a
+# url_origem diz se a image_url mudou desde então (aí baixa de novo)
+class CapaJogo(db.Model):
+    __tablename__ = "capas_jogos"
+
+    jogo_id = db.Column(db.Integer, db.ForeignKey("jogos.id"), primary_key=True)
+    url_origem = db.Column(db.String(255), nullable=False)
+    sha256 = db.Column(db.String(64))  # None se o download falhou (ver erro)
+    tipo = db.Column(db.String(50))  # mimetype do original
+    erro = db.Column(db.String(255))
+    atualizado_em = db.Column(db.DateTime, default=datetime.utcnow)
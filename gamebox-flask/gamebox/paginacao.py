@@ -0,0 +1,164 @@
+# paginacao.py
+# Paginação por cursor (keyset) e exportação em streaming do catálogo de jogos.
+import base64
+import json
+
+from sqlalchemy import and_, or_, select
+
+from db import db
+from models import Jogos
+from serializacao import CAMPOS_JOGO, colunas, dumps, para_dicts
+
+LIMITE_PADRAO = 50
+LIMITE_MAXIMO = 500
+TAMANHO_LOTE_STREAM = 1000
+
+# Colunas que podem ser usadas como ordenação (sempre com desempate por id)
+COLUNAS_ORDENACAO = {
+    "id": Jogos.id,
+    "nome_jogo": Jogos.nome_jogo,
+    "ano_lancamento": Jogos.ano_lancamento,
+    "avaliacao_media": Jogos.avaliacao_media,
+}
+
+
+class ParametroInvalido(ValueError):
+    """Erro de validação de parâmetros de paginação (vira HTTP 400)."""
+
+
+# ---------------- CURSOR ----------------
+def codificar_cursor(valor, ultimo_id):
+    bruto = json.dumps([valor, ultimo_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(bruto).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor):
+    try:
+        preenchimento = "=" * (-len(cursor) % 4)
+        valor, ultimo_id = json.loads(base64.urlsafe_b64decode(cursor + preenchimento))
+        if not isinstance(ultimo_id, int):
+            raise ValueError
+        return valor, ultimo_id
+    except Exception:
+        raise ParametroInvalido("cursor inválido")
+
+
+# ---------------- PARÂMETROS ----------------
+def ler_limite(args, padrao=LIMITE_PADRAO, maximo=LIMITE_MAXIMO):
+    bruto = args.get("limit")
+    if bruto is None:
+        return padrao
+    try:
+        limite = int(bruto)
+    except ValueError:
+        raise ParametroInvalido("limit deve ser um número inteiro")
+    if limite < 1:
+        raise ParametroInvalido("limit deve ser maior que zero")
+    return min(limite, maximo)
+
+
+def ler_ordenacao(args, colunas=COLUNAS_ORDENACAO, padrao="id"):
+    """Lê ?ordem=<coluna> ou ?ordem=-<coluna> (decrescente)."""
+    ordem = args.get("ordem", padrao)
+    desc = ordem.startswith("-")
+    nome = ordem.lstrip("-")
+    if nome not in colunas:
+        raise ParametroInvalido("ordem deve ser uma de: " + ", ".join(sorted(colunas)))
+    return nome, desc
+
+
+def ler_campos(args, campos=CAMPOS_JOGO):
+    """Lê ?fields=id,nome_jogo,...; sem o parâmetro devolve todos os campos."""
+    bruto = args.get("fields")
+    if bruto is None:
+        return tuple(campos)
+    nomes = []
+    for nome in bruto.split(","):
+        nome = nome.strip()
+        if nome not in campos:
+            raise ParametroInvalido("fields deve conter apenas: " + ", ".join(campos))
+        if nome not in nomes:
+            nomes.append(nome)
+    return tuple(nomes)
+
+
+# ---------------- KEYSET ----------------
+def filtro_keyset(coluna, coluna_id, desc, valor, ultimo_id):
+    """Condição WHERE para continuar depois da linha (valor, ultimo_id)."""
+    # O SQLite ordena NULL antes de qualquer valor em ASC (e depois em DESC);
+    # o filtro precisa reproduzir exatamente essa ordem para não pular linhas.
+    desempate = coluna_id < ultimo_id if desc else coluna_id > ultimo_id
+    if coluna is coluna_id:
+        return desempate
+
+    if valor is None:
+        mesmo_grupo = and_(coluna.is_(None), desempate)
+        return or_(mesmo_grupo, coluna.isnot(None)) if not desc else mesmo_grupo
+
+    depois = coluna < valor if desc else coluna > valor
+    condicoes = [depois, and_(coluna == valor, desempate)]
+    if desc:
+        condicoes.append(coluna.is_(None))
+    return or_(*condicoes)
+
+
+def ordenar_keyset(coluna, coluna_id, desc):
+    chaves = [coluna] if coluna is not coluna_id else []
+    chaves.append(coluna_id)
+    return [c.desc() if desc else c.asc() for c in chaves]
+
+
+def consulta_keyset(ordem="id", desc=False, cursor=None, colunas_select=None):
+    """Monta o SELECT ordenado por (ordem, id) a partir do cursor informado."""
+    coluna = COLUNAS_ORDENACAO[ordem]
+    stmt = select(*(colunas_select or colunas(CAMPOS_JOGO)))
+    if cursor:
+        valor, ultimo_id = decodificar_cursor(cursor)
+        stmt = stmt.where(filtro_keyset(coluna, Jogos.id, desc, valor, ultimo_id))
+    return stmt.order_by(*ordenar_keyset(coluna, Jogos.id, desc))
+
+
+def pagina_jogos(args):
+    """Retorna (lista_de_jogos, proximo_cursor) para os parâmetros da requisição."""
+    limite = ler_limite(args)
+    ordem, desc = ler_ordenacao(args)
+    campos = ler_campos(args)
+    # (ordem, id) vão no fim da linha para montar o cursor mesmo fora de ?fields
+    extras = (COLUNAS_ORDENACAO[ordem], Jogos.id)
+    stmt = consulta_keyset(
+        ordem, desc, args.get("cursor"), colunas(campos, extras=extras)
+    ).limit(limite + 1)
+
+    linhas = db.session.execute(stmt).all()
+    jogos = para_dicts(linhas[:limite], campos)
+
+    proximo = None
+    if len(linhas) > limite:
+        ultima = linhas[limite - 1]
+        proximo = codificar_cursor(ultima[-2], ultima[-1])
+    return jogos, proximo
+
+
+# ---------------- STREAMING ----------------
+def stream_jogos(formato="json", ordem="id", desc=False, campos=tuple(CAMPOS_JOGO)):
+    """Gera o catálogo inteiro em pedaços, lendo o banco em lotes (server-side cursor).
+
+    formato="json" produz um array JSON; formato="ndjson" produz um jogo por linha.
+    """
+    stmt = consulta_keyset(ordem, desc, colunas_select=colunas(campos)).execution_options(
+        yield_per=TAMANHO_LOTE_STREAM
+    )
+    resultado = db.session.execute(stmt)
+
+    if formato == "ndjson":
+        for lote in resultado.partitions():
+            yield b"".join(dumps(jogo) + b"\n" for jogo in para_dicts(lote, campos))
+        return
+
+    yield b"["
+    primeiro = True
+    for lote in resultado.partitions():
+        pedaco = dumps(para_dicts(lote, campos))[1:-1]
+        yield pedaco if primeiro else b"," + pedaco
+        primeiro = False
+    yield b"]"
@@ -0,0 +1,351 @@
+# recomendacoes.py
+# Recomendações item-item pela coocorrência nas bibliotecas: dois jogos são
+# parecidos quando aparecem juntos nas mesmas bibliotecas (similaridade de
+# cosseno sobre a matriz usuário × jogo). O cálculo é offline
+# (`flask recalcular-recomendacoes`) e grava o top-K de cada jogo em
+# jogos_similares; as rotas só leem essa tabela.
+#
+# Com numpy/scipy instalados o cálculo completo usa matriz esparsa em blocos;
+# sem eles, um caminho em Python puro (bom para catálogos pequenos). O
+# recálculo incremental só refaz os jogos marcados em recomendacoes_pendentes
+# (que entraram ou saíram de alguma biblioteca desde a última execução).
+import heapq
+import math
+import time
+from collections import Counter, defaultdict
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import delete, func, insert, select
+
+from db import blocos, db, iniciar_escrita, insert_com_conflito
+from models import Biblioteca, JogoSimilar, Jogos, PopularidadeJogo, RecomendacaoPendente
+from serializacao import CAMPOS_JOGO, colunas
+
+K_PADRAO = 20  # similares guardados por jogo
+MINIMO_COMUNS = 1  # bibliotecas em comum para considerar dois jogos
+# Bibliotecas maiores que isso não entram na coocorrência: custam O(n²) pares
+# e dizem pouco sobre o gosto (quem tem tudo "liga" todos os jogos entre si).
+MAX_BIBLIOTECA = 1000
+TAMANHO_BLOCO_MATRIZ = 2000  # jogos por bloco no produto esparso
+TAMANHO_LOTE_GRAVACAO = 10000
+
+SIMILARES_PADRAO = 10
+RECOMENDADOS_PADRAO = 20
+RECOMENDADOS_MAXIMO = 100
+# Base do "recomendados para você": os jogos mais recentes da biblioteca
+JOGOS_BASE_USUARIO = 200
+
+
+# ---------------- MARCAÇÃO (chamada por biblioteca.aplicar_operacoes) ----------------
+def marcar_pendentes(jogos):
+    """Marca jogos para o próximo recálculo incremental (sem commit)."""
+    if not jogos:
+        return
+    stmt = insert_com_conflito(RecomendacaoPendente.__table__).on_conflict_do_nothing()
+    db.session.execute(stmt, [{"jogo_id": j} for j in jogos])
+
+
+# ---------------- CÁLCULO EM PYTHON ----------------
+def _top_k(co, jogo_id, grau, k, minimo):
+    """Top-K por cosseno a partir das coocorrências {outro_jogo: bibliotecas_em_comum}.
+
+    O grau vem de popularidade_jogos no cálculo incremental e pode estar
+    atrasado (ou ausente, 0); um jogo está em pelo menos `comuns` bibliotecas,
+    então esse é o piso dos dois lados.
+    """
+    co.pop(jogo_id, None)
+    base = grau[jogo_id]
+    candidatos = (
+        (round(comuns / math.sqrt(max(base, comuns) * max(grau[outro], comuns)), 6), outro)
+        for outro, comuns in co.items()
+        if comuns >= minimo
+    )
+    return [(outro, score) for score, outro in heapq.nlargest(k, candidatos)]  # empate: id maior
+
+
+def _similares_python(alvos, usuarios_por_jogo, jogos_por_usuario, grau, k, minimo):
+    for jogo_id in alvos:
+        co = Counter()
+        for usuario_id in usuarios_por_jogo.get(jogo_id, ()):
+            co.update(jogos_por_usuario[usuario_id])
+        yield jogo_id, _top_k(co, jogo_id, grau, k, minimo)
+
+
+def _bibliotecas(max_biblioteca):
+    """(jogos_por_usuario sem as bibliotecas grandes demais, grau real de cada jogo)."""
+    jogos_por_usuario = defaultdict(list)
+    grau = Counter()
+    stmt = select(Biblioteca.usuario_id, Biblioteca.jogo_id).execution_options(yield_per=100000)
+    for lote in db.session.execute(stmt).partitions():
+        for usuario_id, jogo_id in lote:
+            jogos_por_usuario[usuario_id].append(jogo_id)
+            grau[jogo_id] += 1
+    for usuario_id in [u for u, j in jogos_por_usuario.items() if len(j) > max_biblioteca]:
+        del jogos_por_usuario[usuario_id]
+    return jogos_por_usuario, grau
+
+
+def _completo_python(k, minimo, max_biblioteca):
+    jogos_por_usuario, grau = _bibliotecas(max_biblioteca)
+    usuarios_por_jogo = defaultdict(list)
+    for usuario_id, jogos in jogos_por_usuario.items():
+        for jogo_id in jogos:
+            usuarios_por_jogo[jogo_id].append(usuario_id)
+    yield from _similares_python(
+        sorted(usuarios_por_jogo), usuarios_por_jogo, jogos_por_usuario, grau, k, minimo
+    )
+
+
+# ---------------- CÁLCULO COM NUMPY/SCIPY ----------------
+def _numpy():
+    """(numpy, scipy.sparse), ou (None, None) se não estiverem instalados.
+
+    Importados só aqui: custam ~200 ms e só o cálculo offline precisa deles.
+    """
+    try:
+        import numpy
+        from scipy import sparse
+    except ImportError:  # opcional: pip install numpy scipy
+        return None, None
+    return numpy, sparse
+
+
+def _completo_numpy(k, minimo, max_biblioteca):
+    np, sparse = _numpy()
+    pares = [
+        np.array(lote, dtype=np.int64)
+        for lote in db.session.execute(
+            select(Biblioteca.usuario_id, Biblioteca.jogo_id).execution_options(yield_per=100000)
+        ).partitions()
+    ]
+    if not pares:
+        return
+    pares = np.concatenate(pares)
+    usuarios, u = np.unique(pares[:, 0], return_inverse=True)
+    jogos, j = np.unique(pares[:, 1], return_inverse=True)
+
+    # Grau real (todas as bibliotecas); a matriz ignora as bibliotecas grandes demais
+    grau = np.bincount(j, minlength=len(jogos)).astype(np.float64)
+    tamanho = np.bincount(u, minlength=len(usuarios))
+    manter = tamanho[u] <= max_biblioteca
+    x = sparse.csr_matrix(
+        (np.ones(manter.sum()), (u[manter], j[manter])),
+        shape=(len(usuarios), len(jogos)),
+    )
+    xt = x.T.tocsr()  # jogo × usuário
+
+    # Coocorrências por blocos de jogos para não materializar a matriz jogo × jogo
+    for inicio in range(0, len(jogos), TAMANHO_BLOCO_MATRIZ):
+        co = (xt[inicio : inicio + TAMANHO_BLOCO_MATRIZ] @ x).tocsr()
+        for linha in range(co.shape[0]):
+            indice = inicio + linha
+            a, b = co.indptr[linha], co.indptr[linha + 1]
+            outros, comuns = co.indices[a:b], co.data[a:b]
+            filtro = (outros != indice) & (comuns >= minimo)
+            outros, comuns = outros[filtro], comuns[filtro]
+            if len(outros) == 0:
+                continue
+            scores = np.round(comuns / np.sqrt(grau[indice] * grau[outros]), 6)
+            ordem = np.lexsort((-jogos[outros], -scores))[:k]  # empate: id maior primeiro
+            yield int(jogos[indice]), [
+                (int(jogos[o]), float(s)) for o, s in zip(outros[ordem], scores[ordem])
+            ]
+
+
+# ---------------- GRAVAÇÃO ----------------
+def _linhas(resultados):
+    for jogo_id, similares in resultados:
+        for posicao, (similar_id, score) in enumerate(similares):
+            yield {
+                "jogo_id": jogo_id,
+                "posicao": posicao,
+                "similar_id": similar_id,
+                "score": score,
+            }
+
+
+def _gravar(resultados):
+    # insert() da tabela (Core): o bulk insert do ORM custa ~2,5x mais e isto
+    # roda com o lock de escrita
+    stmt = insert(JogoSimilar.__table__)
+    total, lote = 0, []
+    for linha in _linhas(resultados):
+        lote.append(linha)
+        if len(lote) >= TAMANHO_LOTE_GRAVACAO:
+            db.session.execute(stmt, lote)
+            total += len(lote)
+            lote = []
+    if lote:
+        db.session.execute(stmt, lote)
+        total += len(lote)
+    return total
+
+
+def _trocar(resultados, pendentes, completo=False):
+    """Substitui os similares já calculados e apaga as pendências atendidas.
+
+    Transação curta, com o lock de escrita desde o início: só DELETE/INSERT,
+    nenhum cálculo dentro dela."""
+    try:
+        iniciar_escrita()
+        if completo:
+            db.session.execute(delete(JogoSimilar))
+        else:
+            for bloco in blocos(pendentes):
+                db.session.execute(delete(JogoSimilar).where(JogoSimilar.jogo_id.in_(bloco)))
+        linhas = _gravar(resultados)
+        for bloco in blocos(pendentes):
+            db.session.execute(
+                delete(RecomendacaoPendente).where(RecomendacaoPendente.jogo_id.in_(bloco))
+            )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return linhas
+
+
+def recalcular_completo(k=K_PADRAO, minimo=MINIMO_COMUNS, max_biblioteca=MAX_BIBLIOTECA):
+    """Recalcula todos os jogos e troca a tabela numa transação curta.
+
+    O cálculo (segundos a minutos) roda antes, fora da transação de escrita:
+    no SQLite ela trava as demais escritas, então só a troca fica dentro dela.
+    Leitores veem a versão anterior até o commit."""
+    inicio = time.perf_counter()
+    com_numpy = _numpy()[0] is not None
+    motor = "numpy" if com_numpy else "python"
+    calcular = _completo_numpy if com_numpy else _completo_python
+    # Lidos antes das bibliotecas: os marcados durante o cálculo ficam para o
+    # próximo incremental
+    pendentes = db.session.execute(select(RecomendacaoPendente.jogo_id)).scalars().all()
+    resultados = list(calcular(k, minimo, max_biblioteca))
+    linhas = _trocar(resultados, pendentes, completo=True)
+    return {
+        "modo": "completo",
+        "motor": motor,
+        "jogos": len(resultados),
+        "linhas": linhas,
+        "segundos": round(time.perf_counter() - inicio, 3),
+    }
+
+
+def recalcular_incremental(k=K_PADRAO, minimo=MINIMO_COMUNS, max_biblioteca=MAX_BIBLIOTECA):
+    """Refaz só os jogos pendentes, lendo apenas as bibliotecas que os contêm."""
+    inicio = time.perf_counter()
+    pendentes = db.session.execute(select(RecomendacaoPendente.jogo_id)).scalars().all()
+    if not pendentes:
+        return {"modo": "incremental", "motor": "python", "jogos": 0, "linhas": 0, "segundos": 0.0}
+
+    usuarios_por_jogo = defaultdict(list)
+    for bloco in blocos(pendentes):
+        for jogo_id, usuario_id in db.session.execute(
+            select(Biblioteca.jogo_id, Biblioteca.usuario_id).where(Biblioteca.jogo_id.in_(bloco))
+        ):
+            usuarios_por_jogo[jogo_id].append(usuario_id)
+
+    jogos_por_usuario = defaultdict(list)
+    usuarios = {u for lista in usuarios_por_jogo.values() for u in lista}
+    for bloco in blocos(usuarios):
+        for usuario_id, jogo_id in db.session.execute(
+            select(Biblioteca.usuario_id, Biblioteca.jogo_id).where(Biblioteca.usuario_id.in_(bloco))
+        ):
+            jogos_por_usuario[usuario_id].append(jogo_id)
+    grandes = {u for u, jogos in jogos_por_usuario.items() if len(jogos) > max_biblioteca}
+    for jogo_id, lista in usuarios_por_jogo.items():
+        usuarios_por_jogo[jogo_id] = [u for u in lista if u not in grandes]
+
+    # Grau real de cada candidato: contador mantido em popularidade_jogos
+    candidatos = {j for u, jogos in jogos_por_usuario.items() if u not in grandes for j in jogos}
+    grau = Counter()
+    for bloco in blocos(candidatos | set(pendentes)):
+        grau.update(
+            dict(
+                db.session.execute(
+                    select(PopularidadeJogo.jogo_id, PopularidadeJogo.total).where(
+                        PopularidadeJogo.jogo_id.in_(bloco)
+                    )
+                ).all()
+            )
+        )
+    for jogo_id, lista in usuarios_por_jogo.items():
+        grau[jogo_id] = max(grau[jogo_id], len(lista), 1)
+
+    resultados = list(
+        _similares_python(pendentes, usuarios_por_jogo, jogos_por_usuario, grau, k, minimo)
+    )
+    linhas = _trocar(resultados, pendentes)
+    return {
+        "modo": "incremental",
+        "motor": "python",
+        "jogos": len(pendentes),
+        "linhas": linhas,
+        "segundos": round(time.perf_counter() - inicio, 3),
+    }
+
+
+# ---------------- LEITURA ----------------
+def similares(jogo_id, limite=SIMILARES_PADRAO, campos=tuple(CAMPOS_JOGO)):
+    stmt = (
+        select(*colunas(campos), JogoSimilar.score)
+        .select_from(JogoSimilar)
+        .join(Jogos, Jogos.id == JogoSimilar.similar_id)
+        .where(JogoSimilar.jogo_id == jogo_id)
+        .order_by(JogoSimilar.posicao)
+        .limit(limite)
+    )
+    return [dict(zip(campos, linha), score=linha[-1]) for linha in db.session.execute(stmt)]
+
+
+def recomendados(usuario_id, limite=RECOMENDADOS_PADRAO, campos=tuple(CAMPOS_JOGO)):
+    """Soma a similaridade dos jogos recentes do usuário (menos os abandonados)
+    com cada candidato que ainda não está na biblioteca."""
+    base = (
+        select(Biblioteca.jogo_id)
+        .where(Biblioteca.usuario_id == usuario_id, Biblioteca.status != "abandonado")
+        .order_by(Biblioteca.data_adicao.desc())
+        .limit(JOGOS_BASE_USUARIO)
+        .subquery()
+    )
+    na_biblioteca = select(Biblioteca.id).where(
+        Biblioteca.usuario_id == usuario_id, Biblioteca.jogo_id == JogoSimilar.similar_id
+    )
+    pontos = (
+        select(JogoSimilar.similar_id, func.sum(JogoSimilar.score).label("score"))
+        .join(base, base.c.jogo_id == JogoSimilar.jogo_id)
+        .where(~na_biblioteca.exists())
+        .group_by(JogoSimilar.similar_id)
+        .order_by(func.sum(JogoSimilar.score).desc(), JogoSimilar.similar_id.desc())
+        .limit(limite)
+        .subquery()
+    )
+    stmt = (
+        select(*colunas(campos), pontos.c.score)
+        .select_from(pontos)
+        .join(Jogos, Jogos.id == pontos.c.similar_id)
+        .order_by(pontos.c.score.desc(), Jogos.id.desc())
+    )
+    return [
+        dict(zip(campos, linha), score=round(linha[-1], 6)) for linha in db.session.execute(stmt)
+    ]
+
+
+# ---------------- CLI ----------------
+@click.command("recalcular-recomendacoes")
+@click.option("--completo", is_flag=True, help="Recalcula todos os jogos, não só os pendentes.")
+@click.option("--k", type=int, default=K_PADRAO, show_default=True, help="Similares por jogo.")
+@click.option("--minimo", type=int, default=MINIMO_COMUNS, show_default=True)
+@click.option("--max-biblioteca", type=int, default=MAX_BIBLIOTECA, show_default=True)
+@with_appcontext
+def comando_recalcular(completo, k, minimo, max_biblioteca):
+    """Calcula os jogos similares (coocorrência nas bibliotecas)."""
+    db.create_all()
+    vazio = db.session.execute(select(JogoSimilar.jogo_id).limit(1)).first() is None
+    if completo or vazio:
+        resultado = recalcular_completo(k, minimo, max_biblioteca)
+    else:
+        resultado = recalcular_incremental(k, minimo, max_biblioteca)
+    click.echo(
+        f"{resultado['modo']} ({resultado['motor']}): {resultado['jogos']} jogos, "
+        f"{resultado['linhas']} linhas em {resultado['segundos']}s"
+    )
@@ -0,0 +1,103 @@
+# serializacao.py
+# Serialização das respostas de jogos: consulta só as colunas pedidas (linhas
+# Core, sem instâncias ORM nem identity map), monta dicts direto das tuplas e
+# codifica com orjson quando disponível (json da biblioteca padrão senão).
+# O cliente escolhe os campos com ?fields=id,nome_jogo,image_url (ver
+# paginacao.ler_campos).
+import json
+from datetime import date, datetime
+
+from flask import Response
+from sqlalchemy import String, case, cast, func, literal, select
+
+from models import Biblioteca, CapaJogo, Jogos
+
+try:
+    import orjson
+except ImportError:  # opcional: pip install orjson
+    orjson = None
+
+TAMANHO_VERSAO_CAPA = 12  # caracteres do sha256 no ?v= da capa_url
+
+# Miniatura local servida por GET /api/jogos/<id>/capa (ver capas.py); nula
+# para jogos sem image_url. Com a capa já baixada da image_url atual, leva
+# ?v=<início do sha256 do original>: a URL de cada capa só muda quando a
+# imagem dela muda, e só essa URL é servida com cache longo.
+_VERSAO_CAPA = (
+    select(func.substr(CapaJogo.sha256, 1, TAMANHO_VERSAO_CAPA))
+    .where(CapaJogo.jogo_id == Jogos.id, CapaJogo.url_origem == Jogos.image_url)
+    .scalar_subquery()
+)
+CAPA_URL = case(
+    (Jogos.image_url.is_(None) | (Jogos.image_url == ""), None),
+    else_=literal("/api/jogos/")
+    + cast(Jogos.id, String)
+    + literal("/capa")
+    + func.coalesce(literal("?v=") + _VERSAO_CAPA, ""),  # NULL || x é NULL
+).label("capa_url")
+
+# Campos públicos de um jogo, na ordem em que aparecem na resposta
+CAMPOS_JOGO = {
+    "id": Jogos.id,
+    "nome_jogo": Jogos.nome_jogo,
+    "ano_lancamento": Jogos.ano_lancamento,
+    "plataforma": Jogos.plataforma,
+    "avaliacao_media": Jogos.avaliacao_media,
+    "image_url": Jogos.image_url,
+    "capa_url": CAPA_URL,
+}
+
+CAMPOS_BIBLIOTECA = {
+    "id": Jogos.id,
+    "nome_jogo": Jogos.nome_jogo,
+    "status": Biblioteca.status,
+    "data_adicao": Biblioteca.data_adicao,
+    "ano_lancamento": Jogos.ano_lancamento,
+    "plataforma": Jogos.plataforma,
+    "image_url": Jogos.image_url,
+    "capa_url": CAPA_URL,
+}
+
+
+# ---------------- LINHAS ----------------
+def colunas(nomes, campos=CAMPOS_JOGO, extras=()):
+    """Colunas do SELECT: as pedidas e, no fim, as extras de uso interno
+    (cursor, desempate) que não vão para a resposta."""
+    return [campos[n] for n in nomes] + list(extras)
+
+
+def para_dicts(linhas, nomes):
+    # zip para no menor: colunas extras no fim da tupla ficam de fora
+    return [dict(zip(nomes, linha)) for linha in linhas]
+
+
+# ---------------- CODIFICAÇÃO ----------------
+def _padrao(valor):
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    raise TypeError(f"{type(valor).__name__} não é serializável em JSON")
+
+
+if orjson is not None:
+    _OPCOES_ORJSON = orjson.OPT_NON_STR_KEYS
+
+    def dumps(dados):
+        """Codifica em bytes UTF-8 (datetimes viram ISO 8601)."""
+        return orjson.dumps(dados, option=_OPCOES_ORJSON)
+
+else:
+
+    def dumps(dados):
+        """Codifica em bytes UTF-8 (datetimes viram ISO 8601)."""
+        return json.dumps(
+            dados, ensure_ascii=False, separators=(",", ":"), default=_padrao
+        ).encode()
+
+
+class RespostaJSON(Response):
+    """Resposta JSON codificada por `dumps` (substitui jsonify nas rotas de jogos)."""
+
+    default_mimetype = "application/json"
+
+    def __init__(self, dados, status=None, **kwargs):
+        super().__init__(dumps(dados), status=status, **kwargs)
@@ -0,0 +1,70 @@
+# servidor.py
+# Ganchos do servidor de produção (gunicorn; a configuração fica em
+# gunicorn.conf.py, nesta pasta): aquece a aplicação antes de atender e, com
+# preload_app, dá a cada worker as próprias conexões do banco depois do fork.
+import time
+
+from sqlalchemy import text
+
+import busca
+from cache import versao_catalogo
+from db import db
+
+# ---------------- AQUECIMENTO ----------------
+# Funções sem argumentos, chamadas dentro do app context antes de atender:
+# uma vez no mestre, com preload_app (o que fica em memória é herdado pelos
+# workers), e de novo em cada worker depois do fork (conexões não podem ser
+# herdadas).
+_aquecimentos = []
+
+
+def aquecimento(funcao):
+    """Decorador que registra um gancho de aquecimento."""
+    _aquecimentos.append(funcao)
+    return funcao
+
+
+@aquecimento
+def _conexao_banco():
+    db.session.execute(text("SELECT 1"))
+
+
+@aquecimento
+def _indices_busca():
+    busca.usa_fts()
+    busca.autocomplete("a", 1)  # carrega o índice de prefixos em memória
+
+
+@aquecimento
+def _versao_catalogo():
+    versao_catalogo()
+
+
+def aquecer(app):
+    """Roda os ganchos registrados e devolve quanto tempo levou (segundos)."""
+    inicio = time.perf_counter()
+    with app.app_context():
+        for funcao in _aquecimentos:
+            funcao()
+        db.session.remove()
+    return time.perf_counter() - inicio
+
+
+# ---------------- GANCHOS DO GUNICORN (ver gunicorn.conf.py) ----------------
+def aquecer_mestre(servidor):
+    """when_ready com preload_app: a aplicação já está no mestre e o que ela
+    carrega em memória é herdado pelos workers no fork."""
+    app = servidor.app.wsgi()
+    segundos = aquecer(app)
+    with app.app_context():
+        db.engine.dispose()  # cada worker abre as próprias conexões
+    servidor.log.info("Aquecimento no mestre: %.0f ms", segundos * 1000)
+
+
+def aquecer_worker(worker):
+    """post_worker_init: roda em cada worker, já com a aplicação carregada."""
+    app = worker.wsgi
+    with app.app_context():
+        db.engine.dispose(close=False)  # conexões herdadas do mestre não são usadas aqui
+    segundos = aquecer(app)
+    worker.log.info("Aquecimento do worker %s: %.0f ms", worker.pid, segundos * 1000)
@@ -0,0 +1,178 @@
+# sincronizacao.py
+# Sincronização incremental da biblioteca (GET /api/biblioteca/sync): cada
+# alteração aplicada por biblioteca.aplicar_operacoes deixa uma linha em
+# alteracoes_biblioteca na mesma transação, e o cliente que guardou a
+# biblioteca manda o cursor da última sincronização para receber só os jogos
+# que mudaram desde então. Sem cursor (ou com um cursor que a compactação já
+# ultrapassou) a resposta é a biblioteca inteira.
+#
+# `flask compactar-alteracoes` apaga as alterações substituídas por outra mais
+# nova do mesmo jogo (nenhum cursor precisa delas) e as mais antigas que a
+# retenção, avançando o horizonte dos usuários afetados.
+import time
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import delete, func, insert, select
+
+from db import blocos, db, insert_com_conflito
+from models import AlteracaoBiblioteca, Biblioteca, HorizonteSincronizacao, Jogos
+from paginacao import codificar_cursor, decodificar_cursor
+from serializacao import CAMPOS_BIBLIOTECA, colunas, para_dicts
+
+
+# ---------------- REGISTRO (chamado por biblioteca.aplicar_operacoes) ----------------
+def registrar(usuario_id, antes, depois, readicionados=()):
+    """Grava uma alteração por jogo cujo estado mudou (sem commit).
+
+    antes/depois: {jogo_id: status}, None = fora da biblioteca. Um jogo
+    removido e adicionado de novo conta como alterado mesmo com o mesmo status.
+    A transação deve ter sido aberta com iniciar_escrita(usuario_id): o cursor
+    de sincronizar() depende de os ids de cada usuário serem confirmados em ordem.
+    """
+    agora = datetime.utcnow()
+    linhas = [
+        {"usuario_id": usuario_id, "jogo_id": j, "status": s, "criado_em": agora}
+        for j, s in depois.items()
+        if s != antes.get(j) or j in readicionados
+    ]
+    if linhas:
+        db.session.execute(insert(AlteracaoBiblioteca), linhas)
+
+
+# ---------------- LEITURA ----------------
+def _linhas_biblioteca(usuario_id, campos, jogos=None):
+    # jogo_id vai no fim da linha para saber quais jogos ainda estão na biblioteca
+    stmt = (
+        select(*colunas(campos, CAMPOS_BIBLIOTECA, (Biblioteca.jogo_id,)))
+        .select_from(Biblioteca)
+        .join(Jogos, Jogos.id == Biblioteca.jogo_id)
+        .where(Biblioteca.usuario_id == usuario_id)
+    )
+    if jogos is None:
+        return db.session.execute(stmt.order_by(Biblioteca.data_adicao, Biblioteca.id)).all()
+    linhas = []
+    for bloco in blocos(jogos):
+        linhas.extend(db.session.execute(stmt.where(Biblioteca.jogo_id.in_(bloco))))
+    return linhas
+
+
+def _horizonte(usuario_id):
+    return db.session.execute(
+        select(HorizonteSincronizacao.alteracao_id).where(
+            HorizonteSincronizacao.usuario_id == usuario_id
+        )
+    ).scalar() or 0
+
+
+def sincronizar(usuario_id, cursor=None, campos=tuple(CAMPOS_BIBLIOTECA)):
+    """{"completo", "cursor", "jogos", "removidos"} desde o cursor informado.
+
+    Com completo=False, "jogos" traz o estado atual dos jogos que entraram ou
+    mudaram e "removidos" os ids que saíram; com completo=True, "jogos" é a
+    biblioteca inteira e o cliente descarta o que tinha guardado.
+    """
+    desde = None
+    if cursor:
+        dono, desde = decodificar_cursor(cursor)
+        if dono != usuario_id:
+            desde = None  # cursor de outra conta (ex.: troca de usuário no navegador)
+
+    # O cursor novo é lido antes da biblioteca: uma alteração gravada entre as
+    # duas leituras vem agora e de novo na próxima vez, o que é inofensivo
+    # porque cada item traz o estado atual, não a operação.
+    #
+    # É o maior id *deste usuário*, não o da tabela: no PostgreSQL os ids saem
+    # da sequence no INSERT e outra transação pode confirmar um id menor depois
+    # que o cursor já passou dele. As alterações de um mesmo usuário são
+    # serializadas (iniciar_escrita trava a linha dele até o commit; no SQLite
+    # todas as escritas são), então os ids dele ficam visíveis em ordem.
+    horizonte = _horizonte(usuario_id)
+    ultimo = db.session.execute(
+        select(func.max(AlteracaoBiblioteca.id)).where(AlteracaoBiblioteca.usuario_id == usuario_id)
+    ).scalar() or 0
+    # A compactação pode ter apagado as mais novas; o cursor nunca volta atrás
+    ultimo = max(ultimo, horizonte, desde or 0)
+    proximo = codificar_cursor(usuario_id, ultimo)
+
+    if desde is None or desde < horizonte:
+        return {
+            "completo": True,
+            "cursor": proximo,
+            "jogos": para_dicts(_linhas_biblioteca(usuario_id, campos), campos),
+            "removidos": [],
+        }
+
+    alterados = set(
+        db.session.execute(
+            select(AlteracaoBiblioteca.jogo_id).where(
+                AlteracaoBiblioteca.usuario_id == usuario_id,
+                AlteracaoBiblioteca.id > desde,
+                AlteracaoBiblioteca.id <= ultimo,
+            )
+        ).scalars()
+    )
+    linhas = _linhas_biblioteca(usuario_id, campos, alterados) if alterados else []
+    presentes = {linha[-1] for linha in linhas}
+    return {
+        "completo": False,
+        "cursor": proximo,
+        "jogos": para_dicts(linhas, campos),
+        "removidos": sorted(alterados - presentes),
+    }
+
+
+# ---------------- COMPACTAÇÃO ----------------
+def compactar(dias):
+    """Encolhe o log de alterações e devolve quantas linhas saíram de cada tipo."""
+    limite = datetime.utcnow() - timedelta(days=dias)
+    log = AlteracaoBiblioteca.__table__
+    try:
+        # Substituídas: a alteração mais nova do mesmo jogo já diz o estado atual
+        mais_novas = select(func.max(log.c.id)).group_by(log.c.usuario_id, log.c.jogo_id)
+        substituidas = db.session.execute(delete(log).where(log.c.id.not_in(mais_novas))).rowcount
+
+        # Antigas: quem tiver um cursor de antes delas recebe a biblioteca inteira
+        horizontes = db.session.execute(
+            select(log.c.usuario_id, func.max(log.c.id))
+            .where(log.c.criado_em < limite)
+            .group_by(log.c.usuario_id)
+        ).all()
+        expiradas = 0
+        if horizontes:
+            stmt = insert_com_conflito(HorizonteSincronizacao.__table__)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["usuario_id"],
+                set_={"alteracao_id": stmt.excluded.alteracao_id},
+            )
+            db.session.execute(
+                stmt, [{"usuario_id": u, "alteracao_id": a} for u, a in horizontes]
+            )
+            teto = max(a for _, a in horizontes)
+            expiradas = db.session.execute(
+                delete(log).where(log.c.criado_em < limite, log.c.id <= teto)
+            ).rowcount
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return {"substituidas": substituidas, "expiradas": expiradas, "usuarios": len(horizontes)}
+
+
+# ---------------- CLI ----------------
+@click.command("compactar-alteracoes")
+@click.option("--dias", type=int, help="Retenção (padrão: SINCRONIZACAO_RETENCAO_DIAS).")
+@with_appcontext
+def comando_compactar(dias):
+    """Compacta o log de alterações usado por /api/biblioteca/sync."""
+    db.create_all()
+    dias = current_app.config["SINCRONIZACAO_RETENCAO_DIAS"] if dias is None else dias
+    inicio = time.perf_counter()
+    r = compactar(dias)
+    click.echo(
+        f"{r['substituidas']} alterações substituídas e {r['expiradas']} com mais de "
+        f"{dias} dias apagadas ({r['usuarios']} usuário(s) com horizonte novo) "
+        f"em {time.perf_counter() - inicio:.2f}s"
+    )
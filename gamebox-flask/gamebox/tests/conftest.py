@@ -0,0 +1,83 @@
+# tests/conftest.py
+# Cada teste roda com uma aplicação nova sobre um SQLite temporário.
+#   cd gamebox-flask/gamebox && python -m pytest -q
+import os
+import sys
+
+import pytest
+from sqlalchemy import event, insert
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import db  # noqa: E402
+from inicializacao import iniciar_banco  # noqa: E402
+from main import create_app  # noqa: E402
+from models import Jogos, Usuario  # noqa: E402
+
+SENHA = "senha123"
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path}/teste.db",
+        "METRICAS_MODO": "desligado",
+    })
+    with app.app_context():
+        iniciar_banco()
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+
+def criar_usuarios(app, n):
+    """Ids de n usuários novos (usuario{i}@teste.com, senha SENHA)."""
+    with app.app_context():
+        db.session.execute(insert(Usuario), [
+            {"username": f"usuario{i}", "email": f"usuario{i}@teste.com", "senha": SENHA}
+            for i in range(n)
+        ])
+        db.session.commit()
+        return [u.id for u in db.session.execute(db.select(Usuario).order_by(Usuario.id)).scalars()]
+
+
+def criar_jogos(app, n):
+    with app.app_context():
+        db.session.execute(insert(Jogos), [
+            {"nome_jogo": f"Jogo {i}", "ano_lancamento": 2000 + i % 25,
+             "plataforma": "PC", "avaliacao_media": 5.0}
+            for i in range(n)
+        ])
+        db.session.commit()
+        return list(db.session.execute(db.select(Jogos.id).order_by(Jogos.id)).scalars())
+
+
+def logar(app, email):
+    cliente = app.test_client()
+    resposta = cliente.post("/api/login", json={"email": email, "senha": SENHA})
+    assert resposta.status_code == 200, resposta.get_json()
+    return cliente
+
+
+class ContadorSQL:
+    """Conta os comandos SQL executados pela engine enquanto estiver ativo."""
+
+    def __init__(self, app):
+        self.total = 0
+        with app.app_context():
+            self.engine = db.engine
+
+    def _contar(self, *args):
+        self.total += 1
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._contar)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._contar)
+
+
+@pytest.fixture
+def contador_sql(app):
+    return lambda: ContadorSQL(app)
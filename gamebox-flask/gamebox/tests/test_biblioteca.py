@@ -0,0 +1,179 @@
+# tests/test_biblioteca.py
+from sqlalchemy import insert
+
+import biblioteca
+import estatisticas
+from conftest import criar_jogos, criar_usuarios, logar
+from db import db
+from models import AlteracaoBiblioteca, Biblioteca, PopularidadeJogo
+
+
+def _preencher(app, usuario_id, jogos, status="jogando"):
+    with app.app_context():
+        db.session.execute(insert(Biblioteca), [
+            {"usuario_id": usuario_id, "jogo_id": j, "status": status} for j in jogos
+        ])
+        db.session.commit()
+
+
+def _queries(app, contador_sql, cliente, url):
+    cliente.get(url)  # aquece o cache de identidades e o pool
+    with contador_sql() as contador:
+        resposta = cliente.get(url)
+    assert resposta.status_code == 200
+    return contador.total, resposta.get_json()
+
+
+def test_biblioteca_queries_constantes(app, contador_sql):
+    pequeno, grande = criar_usuarios(app, 2)
+    jogos = criar_jogos(app, 500)
+    _preencher(app, pequeno, jogos[:1])
+    _preencher(app, grande, jogos)
+
+    for url in ("/api/biblioteca", "/api/biblioteca?limit=50", "/api/biblioteca?status=jogando"):
+        q_pequeno, itens_pequeno = _queries(app, contador_sql, logar(app, "usuario0@teste.com"), url)
+        q_grande, itens_grande = _queries(app, contador_sql, logar(app, "usuario1@teste.com"), url)
+        assert q_pequeno == q_grande, (url, q_pequeno, q_grande)
+        assert q_grande <= 2, (url, q_grande)
+
+    assert len(itens_pequeno) == 1
+    assert len(itens_grande) == 500
+    assert set(itens_grande[0]) >= {"id", "nome_jogo", "status", "data_adicao"}
+
+
+def test_lote_recusa_status_invalido_por_operacao(app):
+    usuario, = criar_usuarios(app, 1)
+    jogos = criar_jogos(app, 4)
+    cliente = logar(app, "usuario0@teste.com")
+
+    resposta = cliente.post("/api/biblioteca/batch", json={"operacoes": [
+        {"op": "adicionar", "jogo_id": jogos[0], "status": {"a": 1}},
+        {"op": "adicionar", "jogo_id": jogos[1], "status": "xyz"},
+        {"op": "adicionar", "jogo_id": jogos[2], "status": 5},
+        {"op": "adicionar", "jogo_id": jogos[3], "status": "jogando"},
+    ]})
+    assert resposta.status_code == 200
+    corpo = resposta.get_json()
+    assert [r["resultado"] for r in corpo["resultados"]] == ["invalido"] * 3 + ["adicionado"]
+
+    assert cliente.put(f"/api/biblioteca/status/{jogos[3]}", json={"status": "5"}).status_code == 400
+    with app.app_context():
+        assert db.session.execute(
+            db.select(Biblioteca.jogo_id, Biblioteca.status).where(Biblioteca.usuario_id == usuario)
+        ).all() == [(jogos[3], "jogando")]
+
+
+# ---------------- POST /api/biblioteca/batch ----------------
+def _lote(cliente, operacoes):
+    return cliente.post("/api/biblioteca/batch", json={"operacoes": operacoes})
+
+
+def _biblioteca(app, usuario_id):
+    with app.app_context():
+        return dict(db.session.execute(
+            db.select(Biblioteca.jogo_id, Biblioteca.status).where(Biblioteca.usuario_id == usuario_id)
+        ).all())
+
+
+def test_lote_aplica_em_ordem(app):
+    usuario, = criar_usuarios(app, 1)
+    a, b = criar_jogos(app, 2)
+    cliente = logar(app, "usuario0@teste.com")
+
+    corpo = _lote(cliente, [
+        {"op": "atualizar", "jogo_id": a, "status": "jogando"},  # ainda não está na biblioteca
+        {"op": "adicionar", "jogo_id": a},
+        {"op": "adicionar", "jogo_id": a},
+        {"op": "atualizar", "jogo_id": a, "status": "jogando"},
+        {"op": "atualizar", "jogo_id": a, "status": "completado"},
+        {"op": "remover", "jogo_id": b},
+    ]).get_json()
+    assert [r["resultado"] for r in corpo["resultados"]] == [
+        "nao_esta_na_biblioteca", "adicionado", "ja_existe", "atualizado", "atualizado",
+        "nao_esta_na_biblioteca",
+    ]
+    assert [r["indice"] for r in corpo["resultados"]] == list(range(6))
+    assert (corpo["total"], corpo["sucesso"], corpo["falhas"]) == (6, 4, 2)
+    assert _biblioteca(app, usuario) == {a: "completado"}
+
+
+def test_lote_adiciona_remove_e_readiciona(app):
+    usuario, = criar_usuarios(app, 1)
+    a, = criar_jogos(app, 1)
+    cliente = logar(app, "usuario0@teste.com")
+    assert _lote(cliente, [{"op": "adicionar", "jogo_id": a, "status": "jogando"}]).status_code == 200
+    with app.app_context():
+        data_antiga = db.session.execute(db.select(Biblioteca.data_adicao)).scalar()
+
+    corpo = _lote(cliente, [
+        {"op": "remover", "jogo_id": a},
+        {"op": "adicionar", "jogo_id": a, "status": "na fila"},
+        {"op": "remover", "jogo_id": a},
+        {"op": "adicionar", "jogo_id": a, "status": "jogando"},
+    ]).get_json()
+    assert corpo["falhas"] == 0
+    assert _biblioteca(app, usuario) == {a: "jogando"}
+    with app.app_context():
+        # Readicionado: entrada nova, mesmo com o mesmo status de antes
+        assert db.session.execute(db.select(Biblioteca.data_adicao)).scalar() > data_antiga
+
+
+def test_lote_operacoes_invalidas_nao_abortam_as_validas(app):
+    usuario, = criar_usuarios(app, 1)
+    a, b = criar_jogos(app, 2)
+    cliente = logar(app, "usuario0@teste.com")
+
+    corpo = _lote(cliente, [
+        "texto",
+        {"op": "apagar", "jogo_id": a},
+        {"op": "adicionar"},
+        {"op": "atualizar", "jogo_id": a},
+        {"op": "adicionar", "jogo_id": 999999},
+        {"op": "adicionar", "jogo_id": a},
+        {"op": "adicionar", "jogo_id": str(b), "status": "abandonado"},
+    ]).get_json()
+    assert [r["resultado"] for r in corpo["resultados"]] == [
+        "invalido", "invalido", "invalido", "invalido", "jogo_nao_encontrado",
+        "adicionado", "adicionado",
+    ]
+    assert _biblioteca(app, usuario) == {a: "na fila", b: "abandonado"}
+
+
+def test_lote_limite_de_operacoes(app):
+    criar_usuarios(app, 1)
+    a, = criar_jogos(app, 1)
+    cliente = logar(app, "usuario0@teste.com")
+    demais = [{"op": "adicionar", "jogo_id": a}] * (biblioteca.MAX_OPERACOES + 1)
+    assert _lote(cliente, demais).status_code == 400
+    assert _lote(cliente, []).status_code == 400
+    assert _lote(cliente, demais[: biblioteca.MAX_OPERACOES]).status_code == 200
+
+
+def test_lote_contadores_e_log_seguem_o_resultado_liquido(app):
+    usuario, = criar_usuarios(app, 1)
+    a, b, c = criar_jogos(app, 3)
+    cliente = logar(app, "usuario0@teste.com")
+    _lote(cliente, [{"op": "adicionar", "jogo_id": a}, {"op": "adicionar", "jogo_id": b}])
+
+    _lote(cliente, [
+        {"op": "atualizar", "jogo_id": a, "status": "jogando"},
+        {"op": "atualizar", "jogo_id": a, "status": "completado"},
+        {"op": "remover", "jogo_id": b},
+        {"op": "adicionar", "jogo_id": c},
+        {"op": "remover", "jogo_id": c},  # entrou e saiu: nada muda
+    ])
+    with app.app_context():
+        assert estatisticas.verificar() == []
+        assert estatisticas.estatisticas_usuario(usuario)["por_status"] == {
+            "na fila": 0, "jogando": 0, "completado": 1, "abandonado": 0,
+        }
+        populares = dict(db.session.execute(
+            db.select(PopularidadeJogo.jogo_id, PopularidadeJogo.total)
+        ).all())
+        assert (populares.get(a, 0), populares.get(b, 0), populares.get(c, 0)) == (1, 0, 0)
+        log = db.session.execute(
+            db.select(AlteracaoBiblioteca.jogo_id, AlteracaoBiblioteca.status)
+            .order_by(AlteracaoBiblioteca.id)
+        ).all()
+    # Um registro por jogo alterado, com o estado final do lote
+    assert log[2:] == [(a, "completado"), (b, None)]
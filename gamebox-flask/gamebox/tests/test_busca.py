@@ -0,0 +1,45 @@
+# tests/test_busca.py
+from sqlalchemy import text
+
+import busca
+from db import db
+from models import Jogos
+
+
+def _nomes(cliente, prefixo):
+    resposta = cliente.get("/api/jogos/pesquisa/autocomplete", query_string={"q": prefixo})
+    assert resposta.status_code == 200
+    return [j["nome_jogo"] for j in resposta.get_json()]
+
+
+def test_adicionar_faz_merge_ordenado():
+    indice = busca.IndicePrefixo()
+    indice.carregar([(1, "Celeste"), (2, "hades"), (3, "Zelda")])
+    indice.adicionar([(5, "Hollow Knight"), (4, "Antichamber"), (6, "Hades II")])
+    assert indice.dados[0] == ["antichamber", "celeste", "hades", "hades ii", "hollow knight", "zelda"]
+    assert indice.ultimo_id == 6
+    assert [j["id"] for j in indice.buscar("HA", 5)] == [2, 6]
+
+
+def test_autocomplete_acompanha_remocao_e_renomeacao(app, monkeypatch):
+    cliente = app.test_client()
+    for nome in ("Hades", "Hollow Knight", "Celeste"):
+        cliente.post("/api/jogos", json={"nome_jogo": nome})
+    assert _nomes(cliente, "h") == ["Hades", "Hollow Knight"]
+
+    # Pelo ORM: os eventos marcam o índice na hora
+    with app.app_context():
+        hades = db.session.execute(db.select(Jogos).filter_by(nome_jogo="Hades")).scalar_one()
+        hades.nome_jogo = "Zagreus"
+        db.session.commit()
+    assert _nomes(cliente, "h") == ["Hollow Knight"]
+    assert _nomes(cliente, "z") == ["Zagreus"]
+
+    # SQL direto (ex.: outro processo): os triggers mudam a geração, vista na revalidação
+    monkeypatch.setattr(busca, "INTERVALO_REVALIDACAO", 0.0)
+    with app.app_context():
+        db.session.execute(text("DELETE FROM jogos WHERE nome_jogo = 'Hollow Knight'"))
+        db.session.execute(text("UPDATE jogos SET nome_jogo = 'Celeste Classic' WHERE nome_jogo = 'Celeste'"))
+        db.session.commit()
+    assert _nomes(cliente, "h") == []
+    assert _nomes(cliente, "cel") == ["Celeste Classic"]
@@ -0,0 +1,84 @@
+# tests/test_capas.py
+import functools
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import capas
+from db import db
+from models import Jogos
+
+
+class _Silencioso(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def origem(tmp_path):
+    """Servidor HTTP local (127.0.0.1) com a pasta tmp_path/origem."""
+    pasta = tmp_path / "origem"
+    pasta.mkdir()
+    servidor = ThreadingHTTPServer(
+        ("127.0.0.1", 0), functools.partial(_Silencioso, directory=str(pasta))
+    )
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    yield pasta, f"http://127.0.0.1:{servidor.server_address[1]}"
+    servidor.shutdown()
+
+
+def _jogo(app, url, nome="Capa"):
+    with app.app_context():
+        jogo = Jogos(nome_jogo=nome, image_url=url)
+        db.session.add(jogo)
+        db.session.commit()
+        return jogo.id
+
+
+def test_image_url_interna_nao_e_baixada(app, tmp_path, origem):
+    pasta, base = origem
+    (pasta / "c.png").write_bytes(b"\x89PNG\r\n\x1a\n" + b"0" * 100)
+    app.config["CAPAS_DIRETORIO"] = str(tmp_path / "cache")
+
+    urls = [
+        f"{base}/c.png",
+        base.replace("127.0.0.1", "localhost") + "/c.png",
+    ]
+    for i, url in enumerate(urls):
+        jogo_id = _jogo(app, url, f"Capa {i}")
+        with app.app_context():
+            linha = capas.processar(jogo_id, url)
+        assert linha["sha256"] is None
+        assert "endereço não permitido" in linha["erro"], linha["erro"]
+
+
+def test_cache_longo_so_na_capa_url_versionada(app, tmp_path, origem):
+    Image = pytest.importorskip("PIL.Image")
+    pasta, base = origem
+    Image.new("RGB", (60, 90), (10, 20, 30)).save(pasta / "c.jpg")
+    app.config.update(CAPAS_DIRETORIO=str(tmp_path / "cache"), CAPAS_ORIGEM=base)
+    jogo_id = _jogo(app, "https://exemplo.org/c.jpg")
+    with app.app_context():
+        assert capas.processar(jogo_id, "https://exemplo.org/c.jpg")["erro"] is None
+
+    cliente = app.test_client()
+    capa_url = cliente.get(f"/api/jogos/{jogo_id}?fields=capa_url").get_json()["capa_url"]
+    assert "?v=" in capa_url
+    versionada = cliente.get(capa_url)
+    assert versionada.headers["Cache-Control"].startswith("public, max-age=")
+    grande = cliente.get(capa_url + "&tamanho=grande")
+    assert grande.headers["Cache-Control"].startswith("public, max-age=")
+    assert grande.headers["ETag"] != versionada.headers["ETag"]
+    for url in (f"/api/jogos/{jogo_id}/capa", f"/api/jogos/{jogo_id}/capa?v=antiga"):
+        assert "no-cache" in cliente.get(url).headers["Cache-Control"]
+
+    # Outro jogo no catálogo não muda a URL desta capa
+    cliente.post("/api/jogos", json={"nome_jogo": "Outro", "image_url": "https://exemplo.org/o.jpg"})
+    assert cliente.get(f"/api/jogos/{jogo_id}?fields=capa_url").get_json()["capa_url"] == capa_url
+
+    # Mesma image_url, imagem nova: a capa_url muda
+    Image.new("RGB", (60, 90), (200, 0, 0)).save(pasta / "c.jpg")
+    with app.app_context():
+        capas.processar(jogo_id, "https://exemplo.org/c.jpg")
+    assert cliente.get(f"/api/jogos/{jogo_id}?fields=capa_url").get_json()["capa_url"] != capa_url
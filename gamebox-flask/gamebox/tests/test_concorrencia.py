@@ -0,0 +1,109 @@
+# tests/test_concorrencia.py
+# Escritores simultâneos no SQLite (WAL + pool do config.py), direto e com a
+# escrita agrupada: nenhuma requisição pode falhar com "database is locked" e
+# biblioteca e contadores têm de terminar consistentes.
+import threading
+
+import pytest
+from sqlalchemy import select
+
+import estatisticas
+from conftest import criar_jogos, criar_usuarios, logar
+from db import db
+from models import Biblioteca
+
+ESCRITORES = 6  # cada um na própria conta
+NO_MESMO_USUARIO = 4  # disputando os mesmos jogos de uma conta só
+LEITORES = 2
+JOGOS_POR_ESCRITOR = 15
+
+
+def _rodar(escritores, leitores):
+    """Roda os escritores até o fim, com os leitores em paralelo enquanto isso."""
+    erros = []
+    fim = threading.Event()
+
+    def envolver(alvo, *args):
+        try:
+            alvo(*args)
+        except Exception as e:  # falha de asserção também conta
+            erros.append(repr(e))
+
+    de_leitura = [threading.Thread(target=envolver, args=a + (fim,)) for a in leitores]
+    de_escrita = [threading.Thread(target=envolver, args=a) for a in escritores]
+    for t in de_leitura + de_escrita:
+        t.start()
+    for t in de_escrita:
+        t.join()
+    fim.set()
+    for t in de_leitura:
+        t.join()
+    return erros
+
+
+def _conferir(resposta, aceitos):
+    assert resposta.status_code in aceitos, (resposta.status_code, resposta.get_data(as_text=True))
+
+
+def _escritor(app, email, jogos):
+    cliente = logar(app, email)
+    for j in jogos:
+        _conferir(cliente.post("/api/biblioteca/adicionar", json={"jogo_id": j}), (201,))
+    for j in jogos[::2]:
+        _conferir(cliente.put(f"/api/biblioteca/status/{j}", json={"status": "jogando"}), (200,))
+    for j in jogos[::3]:
+        _conferir(cliente.delete(f"/api/biblioteca/remover/{j}"), (200,))
+    _conferir(cliente.post("/api/biblioteca/batch", json={"operacoes": [
+        {"op": "adicionar", "jogo_id": jogos[0]}, {"op": "atualizar", "jogo_id": jogos[1], "status": "completado"},
+    ]}), (200,))
+
+
+def _disputa(app, email, jogos):
+    cliente = logar(app, email)
+    for rodada in range(3):
+        for j in jogos:
+            _conferir(cliente.post("/api/biblioteca/adicionar", json={"jogo_id": j}), (200, 201))
+            _conferir(cliente.delete(f"/api/biblioteca/remover/{j}"), (200, 404))
+
+
+def _leitor(app, email, fim):
+    cliente = logar(app, email)
+    while not fim.is_set():
+        _conferir(cliente.get("/api/biblioteca"), (200,))
+        _conferir(cliente.get("/api/user_profile/stats"), (200,))
+
+
+def _esperado(jogos):
+    final = {j: "na fila" for j in jogos}
+    for j in jogos[::2]:
+        final[j] = "jogando"
+    for j in jogos[::3]:
+        del final[j]
+    final[jogos[0]] = "na fila"  # adicionado de novo no lote
+    final[jogos[1]] = "completado"
+    return final
+
+
+@pytest.mark.parametrize("agrupada", [False, True], ids=["direta", "agrupada"])
+def test_escritores_simultaneos(app, agrupada):
+    app.config["ESCRITA_AGRUPADA"] = agrupada
+    usuarios = criar_usuarios(app, ESCRITORES + 1)
+    jogos = criar_jogos(app, ESCRITORES * JOGOS_POR_ESCRITOR)
+    fatias = [jogos[i * JOGOS_POR_ESCRITOR:(i + 1) * JOGOS_POR_ESCRITOR] for i in range(ESCRITORES)]
+    disputados = jogos[:5]
+    compartilhado = f"usuario{ESCRITORES}@teste.com"
+
+    erros = _rodar(
+        [(_escritor, app, f"usuario{i}@teste.com", fatias[i]) for i in range(ESCRITORES)]
+        + [(_disputa, app, compartilhado, disputados) for _ in range(NO_MESMO_USUARIO)],
+        [(_leitor, app, compartilhado)] * LEITORES,
+    )
+    assert erros == []
+
+    with app.app_context():
+        for i in range(ESCRITORES):
+            final = dict(db.session.execute(
+                select(Biblioteca.jogo_id, Biblioteca.status).where(Biblioteca.usuario_id == usuarios[i])
+            ).all())
+            assert final == _esperado(fatias[i])
+        assert estatisticas.verificar() == []
@@ -0,0 +1,29 @@
+# tests/test_identidade.py
+import identidade
+from conftest import criar_usuarios, logar
+
+
+def test_claims_so_vao_para_a_sessao_quando_ativas(app):
+    criar_usuarios(app, 1)
+    cliente = logar(app, "usuario0@teste.com")
+    with cliente.session_transaction() as sessao:
+        assert identidade.CHAVE_CLAIMS not in sessao
+
+    app.config["IDENTIDADE_CLAIMS"] = True
+    identidade.init_identidade(app)
+    try:
+        cliente = logar(app, "usuario0@teste.com")
+        with cliente.session_transaction() as sessao:
+            claims = sessao[identidade.CHAVE_CLAIMS]
+        assert (claims["username"], claims["email"]) == ("usuario0", "usuario0@teste.com")
+
+        # Com as claims, rotas de leitura não vão ao banco nem ao cache
+        identidade.identidades.entradas.clear()
+        antes = identidade.identidades.estatisticas()
+        assert cliente.get("/api/biblioteca").status_code == 200
+        depois = identidade.identidades.estatisticas()
+        assert depois["claims_sessao"] == antes["claims_sessao"] + 1
+        assert depois["consultas"] == antes["consultas"]
+    finally:
+        app.config["IDENTIDADE_CLAIMS"] = False
+        identidade.init_identidade(app)
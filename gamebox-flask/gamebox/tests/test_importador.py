@@ -0,0 +1,98 @@
+# tests/test_importador.py
+import io
+
+from sqlalchemy import select, text
+
+import importador
+from conftest import criar_usuarios, logar
+from db import db
+from models import Jogos
+
+
+def _importar(app, conteudo, formato="csv", **kwargs):
+    with app.app_context():
+        return importador.importar_stream(io.BytesIO(conteudo), formato, **kwargs)
+
+
+def _jogos(app):
+    with app.app_context():
+        return dict(db.session.execute(select(Jogos.nome_jogo, Jogos.ano_lancamento)).all())
+
+
+def test_inserir_mantem_existentes_e_upsert_atualiza(app):
+    _importar(app, b"nome_jogo,ano_lancamento\nHades,2018\n")
+
+    relatorio = _importar(app, b"nome_jogo,ano_lancamento\nHades,2020\nCeleste,2018\n", modo="inserir")
+    assert (relatorio.lidas, relatorio.gravadas) == (2, 1)
+    assert _jogos(app) == {"Hades": 2018, "Celeste": 2018}
+
+    relatorio = _importar(app, b'{"nome_jogo": "Hades", "ano_lancamento": 2020}\n', "jsonl")
+    assert relatorio.gravadas == 1
+    assert _jogos(app) == {"Hades": 2020, "Celeste": 2018}
+
+
+def test_linhas_rejeitadas_nao_impedem_as_validas(app):
+    conteudo = (
+        b"nome_jogo,ano_lancamento,avaliacao_media\n"
+        b"Hades,2018,9.5\n"
+        b",2019,\n"
+        b"Celeste,dois mil,\n"
+        b"Inside,2016,\n"
+    )
+    relatorio = _importar(app, conteudo, tamanho_lote=2)
+    assert relatorio.completa
+    assert (relatorio.lidas, relatorio.gravadas, relatorio.rejeitadas) == (4, 2, 2)
+    assert [e["linha"] for e in relatorio.erros] == [2, 3]
+    assert "obrigatório" in relatorio.erros[0]["erro"]
+    assert set(_jogos(app)) == {"Hades", "Inside"}
+
+
+def test_byte_invalido_rejeita_so_a_linha_dele(app):
+    linhas = [f"Jogo {i},2000\n".encode() for i in range(200)]
+    linhas[150] = b"Jogo \xff,2000\n"
+    relatorio = _importar(app, b"nome_jogo,ano_lancamento\n" + b"".join(linhas))
+    assert relatorio.completa and relatorio.interrompida is None
+    assert (relatorio.gravadas, relatorio.rejeitadas) == (199, 1)
+    assert relatorio.erros == [{"linha": 151, "erro": "texto com bytes que não são UTF-8"}]
+    assert len(_jogos(app)) == 199
+
+
+def _recusar(app, nome):
+    with app.app_context():
+        db.session.execute(text(
+            f"CREATE TRIGGER recusa_jogo BEFORE INSERT ON jogos WHEN NEW.nome_jogo = '{nome}' "
+            "BEGIN SELECT RAISE(ABORT, 'jogo recusado'); END"
+        ))
+        db.session.commit()
+
+
+def test_lote_com_erro_mantem_os_demais_e_relatorio_parcial(app):
+    _recusar(app, "Recusado")
+    relatorio = _importar(app, b"nome_jogo\nA\nB\nRecusado\nC\nD\n", tamanho_lote=2)
+    assert not relatorio.completa
+    assert (relatorio.lotes, relatorio.gravadas) == (2, 3)  # C caiu junto com Recusado
+    assert relatorio.lotes_com_erro == [{"linhas": [3, 4], "erro": "jogo recusado"}]
+    assert set(_jogos(app)) == {"A", "B", "D"}
+
+
+def test_arquivo_ilegivel_interrompe_com_os_lotes_anteriores_gravados(app):
+    conteudo = b"nome_jogo\nA\nB\n" + b'"' + b"x" * 200_000 + b'"\nC\n'
+    relatorio = _importar(app, conteudo, tamanho_lote=2)
+    assert relatorio.interrompida.startswith("após a linha 2:")
+    assert set(_jogos(app)) == {"A", "B"}
+
+
+def test_rota_de_importacao(app):
+    _recusar(app, "Recusado")
+    criar_usuarios(app, 1)
+    cliente = logar(app, "usuario0@teste.com")
+
+    resposta = cliente.post("/api/jogos/importar", data=b"nome_jogo\nA\n", content_type="text/csv")
+    assert resposta.status_code == 200 and resposta.get_json()["gravadas"] == 1
+
+    resposta = cliente.post("/api/jogos/importar", data=b"nome_jogo\nRecusado\n", content_type="text/csv")
+    assert resposta.status_code == 500
+    assert resposta.get_json()["lotes_com_erro"][0]["linhas"] == [1, 1]
+
+    assert cliente.post("/api/jogos/importar?modo=upsert", data=b"nome_jogo\nA\n").status_code == 403
+    assert app.test_client().post("/api/jogos/importar", data=b"nome_jogo\nA\n").status_code == 401
@@ -0,0 +1,78 @@
+# tests/test_metricas.py
+import pytest
+from sqlalchemy import text
+
+from cache import incrementar_versao
+from db import db
+from inicializacao import iniciar_banco
+from main import create_app
+from metricas import metricas
+
+
+@pytest.fixture
+def app_medido(tmp_path):
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path}/teste.db",
+        "METRICAS_MODO": "completo",
+    })
+
+    @app.route("/api/teste/quebra")
+    def quebra():
+        db.session.execute(text("SELECT * FROM tabela_que_nao_existe"))
+
+    with app.app_context():
+        iniciar_banco()
+    metricas.zerar()
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+
+@pytest.mark.parametrize("propagar", [False, True], ids=["500", "debug"])
+def test_excecao_sem_handler_conta_como_500(app_medido, propagar):
+    # Com PROPAGATE_EXCEPTIONS (debug/testes) o Flask não roda os after_request
+    app_medido.config["PROPAGATE_EXCEPTIONS"] = propagar
+    cliente = app_medido.test_client()
+    if propagar:
+        with pytest.raises(Exception):
+            cliente.get("/api/teste/quebra")
+    else:
+        assert cliente.get("/api/teste/quebra").status_code == 500
+    assert cliente.get("/api/home").status_code == 200
+    assert metricas.requisicoes[("/api/teste/quebra", "GET", 500)] == 1
+    assert metricas.requisicoes[("/api/home", "GET", 200)] == 1
+
+
+def test_sql_com_erro_nao_deixa_inicio_na_conexao(app_medido):
+    with app_medido.app_context():
+        for _ in range(3):
+            with pytest.raises(Exception):
+                db.session.execute(text("SELECT * FROM tabela_que_nao_existe"))
+            db.session.rollback()
+        conexao = db.session.connection()
+        assert not conexao.info.get("metricas_inicio")
+
+
+def test_lote_registra_so_a_requisicao_externa(app_medido):
+    cliente = app_medido.test_client()
+    resposta = cliente.post("/api/batch", json={"requisicoes": ["/api/home", "/api/jogos/recentes"]})
+    assert [r["status"] for r in resposta.get_json()["respostas"]] == [200, 200]
+    assert metricas.requisicoes[("/api/batch", "POST", 200)] == 1
+    assert metricas.requisicoes[("/api/home", "GET", 200)] == 0
+
+
+def test_lote_paralelo_soma_as_queries_das_threads(app_medido):
+    cliente = app_medido.test_client()
+    urls = ["/api/home", "/api/jogos/recentes", "/api/jogos?limit=5"]
+    rotulos = (("rota", "/api/batch"), ("metodo", "POST"))
+    totais = []
+    for paralelo in (False, True):
+        with app_medido.app_context():
+            incrementar_versao()  # nada vem do cache do catálogo
+        metricas.zerar()
+        resposta = cliente.post("/api/batch", json={"requisicoes": urls, "paralelo": paralelo})
+        assert [r["status"] for r in resposta.get_json()["respostas"]] == [200, 200, 200]
+        assert metricas.queries_fora == 0
+        totais.append(metricas.queries.series[rotulos][-2])
+    assert totais[0] > 0
+    assert totais[1] == totais[0]
@@ -0,0 +1,14 @@
+# tests/test_recomendacoes.py
+from collections import Counter
+
+import recomendacoes
+
+
+def test_top_k_com_grau_atrasado_ou_ausente():
+    # Jogo 3 ainda sem linha em popularidade_jogos (grau 0) e jogo 2 com o
+    # contador atrás das coocorrências
+    grau = Counter({1: 4, 2: 1})
+    co = Counter({1: 9, 2: 2, 3: 2})
+    similares = recomendacoes._top_k(co, 1, grau, k=5, minimo=1)
+    assert [j for j, _ in similares] == [3, 2]
+    assert similares[0][1] == similares[1][1] == round(2 / (4 * 2) ** 0.5, 6)
@@ -0,0 +1,103 @@
+# tests/test_sincronizacao.py
+from sqlalchemy import select
+
+import sincronizacao
+from conftest import criar_jogos, criar_usuarios, logar
+from db import db
+from models import AlteracaoBiblioteca
+
+
+def _lote(cliente, *operacoes):
+    resposta = cliente.post("/api/biblioteca/batch", json={"operacoes": list(operacoes)})
+    assert resposta.status_code == 200, resposta.get_json()
+    return resposta.get_json()
+
+
+def _sync(cliente, cursor=None):
+    resposta = cliente.get("/api/biblioteca/sync", query_string={"since": cursor} if cursor else {})
+    assert resposta.status_code == 200, resposta.get_json()
+    return resposta.get_json()
+
+
+def test_delta_depois_do_cursor_com_remocoes(app):
+    criar_usuarios(app, 1)
+    a, b, c = criar_jogos(app, 3)
+    cliente = logar(app, "usuario0@teste.com")
+    _lote(cliente, {"op": "adicionar", "jogo_id": a}, {"op": "adicionar", "jogo_id": b})
+
+    inicial = _sync(cliente)
+    assert inicial["completo"] is True
+    assert {j["id"] for j in inicial["jogos"]} == {a, b}
+
+    _lote(
+        cliente,
+        {"op": "atualizar", "jogo_id": a, "status": "completado"},
+        {"op": "remover", "jogo_id": b},
+        {"op": "adicionar", "jogo_id": c},
+    )
+    delta = _sync(cliente, inicial["cursor"])
+    assert delta["completo"] is False
+    assert {j["id"]: j["status"] for j in delta["jogos"]} == {a: "completado", c: "na fila"}
+    assert delta["removidos"] == [b]
+
+    vazio = _sync(cliente, delta["cursor"])
+    assert vazio == {"completo": False, "cursor": delta["cursor"], "jogos": [], "removidos": []}
+
+
+def test_cursor_de_outro_usuario_recebe_biblioteca_inteira(app):
+    criar_usuarios(app, 2)
+    a, b = criar_jogos(app, 2)
+    primeiro = logar(app, "usuario0@teste.com")
+    segundo = logar(app, "usuario1@teste.com")
+    _lote(primeiro, {"op": "adicionar", "jogo_id": a})
+    _lote(segundo, {"op": "adicionar", "jogo_id": b})
+
+    cursor_alheio = _sync(primeiro)["cursor"]
+    resposta = _sync(segundo, cursor_alheio)
+    assert resposta["completo"] is True
+    assert [j["id"] for j in resposta["jogos"]] == [b]
+
+
+def test_cursor_anterior_ao_horizonte_recebe_biblioteca_inteira(app):
+    criar_usuarios(app, 1)
+    a, b = criar_jogos(app, 2)
+    cliente = logar(app, "usuario0@teste.com")
+    _lote(cliente, {"op": "adicionar", "jogo_id": a})
+    cursor = _sync(cliente)["cursor"]
+    _lote(cliente, {"op": "adicionar", "jogo_id": b})
+
+    with app.app_context():
+        assert sincronizacao.compactar(dias=0)["expiradas"] == 2  # tudo é "antigo"
+
+    resposta = _sync(cliente, cursor)
+    assert resposta["completo"] is True
+    assert {j["id"] for j in resposta["jogos"]} == {a, b}
+    # O cursor novo já está no horizonte: a próxima sincronização é incremental
+    assert _sync(cliente, resposta["cursor"])["completo"] is False
+
+
+def test_compactacao_mantem_so_a_alteracao_mais_nova(app):
+    criar_usuarios(app, 1)
+    a, b = criar_jogos(app, 2)
+    cliente = logar(app, "usuario0@teste.com")
+    cursor = _sync(cliente)["cursor"]
+    _lote(cliente, {"op": "adicionar", "jogo_id": a})
+    _lote(cliente, {"op": "atualizar", "jogo_id": a, "status": "jogando"})
+    _lote(cliente, {"op": "atualizar", "jogo_id": a, "status": "completado"})
+    _lote(cliente, {"op": "adicionar", "jogo_id": b}, {"op": "remover", "jogo_id": b})
+
+    with app.app_context():
+        antes = db.session.execute(
+            select(AlteracaoBiblioteca.jogo_id, AlteracaoBiblioteca.status)
+            .order_by(AlteracaoBiblioteca.id)
+        ).all()
+        assert antes[-1] == (a, "completado")  # b entrou e saiu no mesmo lote: sem alteração
+        assert sincronizacao.compactar(dias=30) == {"substituidas": 2, "expiradas": 0, "usuarios": 0}
+        depois = db.session.execute(
+            select(AlteracaoBiblioteca.jogo_id, AlteracaoBiblioteca.status)
+        ).all()
+    assert depois == [(a, "completado")]
+
+    delta = _sync(cliente, cursor)
+    assert delta["completo"] is False
+    assert [(j["id"], j["status"]) for j in delta["jogos"]] == [(a, "completado")]